@@ -0,0 +1,166 @@
+"""
+JWT authentication without a database query per request.
+
+``ClaimsJWTAuthentication`` builds ``request.user`` from the id, username and
+email claims of the access token (see authentication.tokens) instead of
+loading the row, and keeps recently verified tokens in a bounded LRU so a
+token's signature is checked once per process rather than on every request.
+
+The token user is a ``User`` instance with only those fields loaded: foreign
+keys to it and ``user.pk`` filters work as usual, and any other field is
+loaded from the database on first access. A user deactivated or deleted
+after login keeps access until the access token expires, unless
+``AUTH_VERIFY_USER_ACTIVE`` is on; then the ``is_active`` flags are re-read,
+in one query for all users due a check, every ``AUTH_ACTIVE_CHECK_INTERVAL``
+seconds.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_CLAIMS
+
+# Most users the active check refreshes in one query
+ACTIVE_CHECK_BATCH_SIZE = 500
+
+
+def token_cache_size():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 1024)
+
+
+def verify_user_active():
+    return getattr(settings, 'AUTH_VERIFY_USER_ACTIVE', False)
+
+
+def active_check_interval():
+    return getattr(settings, 'AUTH_ACTIVE_CHECK_INTERVAL', 60)
+
+
+class VerifiedTokenCache:
+    """
+    The last ``AUTH_TOKEN_CACHE_SIZE`` access tokens that passed validation,
+    by their encoded form. A hit skips the signature and claim checks the
+    token already passed; its expiry is still checked.
+    """
+
+    def __init__(self):
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, raw_token):
+        with self.lock:
+            token = self.tokens.get(raw_token)
+            if token is None:
+                return None
+            if token['exp'] <= time.time():
+                del self.tokens[raw_token]
+                return None
+            self.tokens.move_to_end(raw_token)
+            return token
+
+    def add(self, raw_token, token):
+        size = token_cache_size()
+        if size <= 0:
+            return
+        with self.lock:
+            self.tokens[raw_token] = token
+            self.tokens.move_to_end(raw_token)
+            while len(self.tokens) > size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+class ActiveUserCheck:
+    """
+    ``is_active`` of the users seen by this process, each re-read once it is
+    ``AUTH_ACTIVE_CHECK_INTERVAL`` seconds old. The first stale lookup
+    refreshes every stale user with it, so a busy process checks its users
+    in a query per interval rather than one per user.
+    """
+
+    def __init__(self):
+        self.checked = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_active(self, user_id):
+        now = time.monotonic()
+        interval = active_check_interval()
+        with self.lock:
+            entry = self.checked.get(user_id)
+            if entry is not None and now - entry[1] < interval:
+                self.checked.move_to_end(user_id)
+                return entry[0]
+            stale = [user_id] + [
+                other for other, (_active, checked_at) in self.checked.items()
+                if now - checked_at >= interval and other != user_id
+            ][:ACTIVE_CHECK_BATCH_SIZE - 1]
+
+        user_model = get_user_model()
+        active = dict(
+            user_model.objects.filter(pk__in=stale).values_list('pk', 'is_active')
+        )
+        with self.lock:
+            for other in stale:
+                # Deleted users count as inactive
+                self.checked[other] = (active.get(other, False), now)
+                self.checked.move_to_end(other)
+            while len(self.checked) > max(token_cache_size(), ACTIVE_CHECK_BATCH_SIZE):
+                self.checked.popitem(last=False)
+        return active.get(user_id, False)
+
+    def clear(self):
+        with self.lock:
+            self.checked.clear()
+
+
+verified_tokens = VerifiedTokenCache()
+active_users = ActiveUserCheck()
+
+
+def token_user(validated_token):
+    """
+    A ``User`` with the id, username and email from the token and the other
+    fields deferred, or None when the token predates the user claims.
+    """
+    if any(claim not in validated_token for claim in USER_CLAIMS):
+        return None
+    user_model = get_user_model()
+    fields = [user_model._meta.pk.attname, *USER_CLAIMS.values(), 'is_active']
+    values = [
+        validated_token[api_settings.USER_ID_CLAIM],
+        *(validated_token[claim] for claim in USER_CLAIMS),
+        # Tokens are only issued to active users
+        True,
+    ]
+    return user_model.from_db(DEFAULT_DB_ALIAS, fields, values)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.add(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        user = None if api_settings.CHECK_REVOKE_TOKEN else token_user(validated_token)
+        if user is None:
+            # Loads the user and checks is_active itself
+            return super().get_user(validated_token)
+        if verify_user_active() and not active_users.is_active(user.pk):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from authentication.backends import active_users, verified_tokens
+from authentication.tokens import UserClaimsAccessToken
+from tasks.models import Task
+
+
+class ClaimsAuthenticationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='claimed', email='claimed@example.com', password='12345')
+        cls.other = User.objects.create_user(username='second', email='second@example.com', password='12345')
+
+    def setUp(self):
+        verified_tokens.clear()
+        active_users.clear()
+        self.client = APIClient()
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_login_and_register_tokens_carry_the_claims(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'claimed', 'password': '12345'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        access = AccessToken(response.data['access'])
+        self.assertEqual(
+            (access['user_id'], access['username'], access['email']),
+            (self.user.pk, 'claimed', 'claimed@example.com'),
+        )
+        # Refreshing copies them
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']})
+        self.assertEqual(AccessToken(response.data['access'])['username'], 'claimed')
+
+        response = self.client.post(
+            reverse('register'), {'username': 'fresh', 'email': 'fresh@example.com', 'password': 'pw'}, format='json'
+        )
+        self.assertEqual(AccessToken(response.data['tokens']['access'])['email'], 'fresh@example.com')
+
+    def test_current_user_without_queries(self):
+        self.authorize(UserClaimsAccessToken.for_user(self.user))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_user'))
+        self.assertEqual(response.data, {'id': self.user.pk, 'username': 'claimed', 'email': 'claimed@example.com'})
+        self.assertEqual(len(queries), 0)
+
+    def test_older_tokens_load_the_user(self):
+        self.authorize(AccessToken.for_user(self.user))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_user'))
+        self.assertEqual(response.data['username'], 'claimed')
+        self.assertEqual(len(queries), 1)
+
+    def test_token_user_works_as_a_user(self):
+        self.authorize(UserClaimsAccessToken.for_user(self.user))
+        response = self.client.post(reverse('task-list'), {
+            'title': 'Owned', 'due_date': '2030-01-01T00:00:00Z', 'owner': self.user.pk, 'assigned_to': self.user.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.get(title='Owned').assigned_to, self.user)
+        # Fields outside the claims load on first access
+        response = self.client.get(reverse('task-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_signature_is_checked_once_per_token(self):
+        token = UserClaimsAccessToken.for_user(self.user)
+        self.authorize(token)
+        decode = TokenBackend.decode
+        with mock.patch.object(TokenBackend, 'decode', autospec=True, side_effect=decode) as decoded:
+            for _ in range(3):
+                self.assertEqual(self.client.get(reverse('get_user')).status_code, status.HTTP_200_OK)
+        self.assertEqual(decoded.call_count, 1)
+
+        # Expiry is still enforced for cached tokens
+        expired = datetime_from_epoch(token['exp'] + 1)
+        with mock.patch('authentication.backends.time.time', return_value=token['exp'] + 1), \
+                mock.patch('rest_framework_simplejwt.tokens.aware_utcnow', return_value=expired):
+            response = self.client.get(reverse('get_user'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cache_is_bounded(self):
+        with self.settings(AUTH_TOKEN_CACHE_SIZE=2):
+            for _ in range(3):
+                self.authorize(UserClaimsAccessToken.for_user(self.user))
+                self.client.get(reverse('get_user'))
+        self.assertEqual(len(verified_tokens.tokens), 2)
+
+    @override_settings(AUTH_VERIFY_USER_ACTIVE=True, AUTH_ACTIVE_CHECK_INTERVAL=60)
+    def test_opt_in_active_check(self):
+        second = APIClient()
+        second.credentials(HTTP_AUTHORIZATION=f'Bearer {UserClaimsAccessToken.for_user(self.other)}')
+        self.authorize(UserClaimsAccessToken.for_user(self.user))
+        with mock.patch('authentication.backends.time.monotonic', return_value=1000):
+            self.assertEqual(second.get(reverse('get_user')).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(reverse('get_user')).status_code, status.HTTP_200_OK)
+            User.objects.filter(pk__in=[self.user.pk, self.other.pk]).update(is_active=False)
+            # Trusted until the interval passes
+            self.assertEqual(self.client.get(reverse('get_user')).status_code, status.HTTP_200_OK)
+
+        with mock.patch('authentication.backends.time.monotonic', return_value=1061):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(reverse('get_user')).status_code, status.HTTP_401_UNAUTHORIZED)
+                self.assertEqual(second.get(reverse('get_user')).status_code, status.HTTP_401_UNAUTHORIZED)
+        # Both users were re-read in the first check
+        self.assertEqual(len(queries), 1)
@@ -0,0 +1,38 @@
+"""
+JWTs that carry the user's username and email next to the id, so requests
+can be authenticated without loading the user (see authentication.backends).
+
+The claims are a snapshot taken at login or registration. Refreshing copies
+them into the new access token, so a username or email change shows in
+the tokens after the next login.
+"""
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+# Claim name -> User field, next to simplejwt's own user_id claim
+USER_CLAIMS = {
+    'username': 'username',
+    'email': 'email',
+}
+
+
+class UserClaimsMixin:
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, field in USER_CLAIMS.items():
+            token[claim] = getattr(user, field)
+        return token
+
+
+class UserClaimsRefreshToken(UserClaimsMixin, RefreshToken):
+    pass
+
+
+class UserClaimsAccessToken(UserClaimsMixin, AccessToken):
+    pass
+
+
+class UserClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """``POST /api/auth/login/``, issuing tokens with the user claims."""
+    token_class = UserClaimsRefreshToken
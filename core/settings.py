@@ -134,6 +134,42 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Files in the project directory, shared by every worker process of this
+# checkout so a write invalidates the cached responses (tasks/cache.py) of
+# all of them. Point this at Redis/Memcached when the workers span several
+# hosts, and keep the prefix so the keys stay apart from other projects'.
+# The tests run against their own in-memory cache (see core.test_runner).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'KEY_PREFIX': 'taski',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
+# Seconds a cached task list stays valid; writes invalidate it sooner
+TASK_LIST_CACHE_TIMEOUT = 300
+
+# Delta sync (tasks/sync.py): seconds each sync looks back before its token,
+# and days deletion tombstones (and so sync tokens) are kept
+TASK_SYNC_OVERLAP = 5
+TASK_SYNC_RETENTION_DAYS = 30
+
+# Live events (tasks/events.py): how events reach the other worker processes,
+# and how many a slow connection may fall behind before it is told to resync.
+# With several ASGI workers, use 'tasks.events.SQLiteBackend' (its file is
+# set by TASK_EVENTS_SQLITE_PATH, in the temp directory by default).
+TASK_EVENTS_BACKEND = 'tasks.events.LocalBackend'
+TASK_EVENTS_QUEUE_SIZE = 100
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -142,7 +178,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -159,6 +195,8 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    # Opt-in: list endpoints only paginate when ?page_size= or ?cursor= is sent
+    'DEFAULT_PAGINATION_CLASS': 'tasks.pagination.KeysetPagination',
     'UNICODE_JSON': True,
     'COMPACT_JSON': False,
 }
@@ -169,8 +207,17 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'authentication.tokens.UserClaimsTokenObtainPairSerializer',
 }
 
+# Token authentication (authentication/backends.py): how many verified access
+# tokens each process remembers, and whether to re-read the users' is_active
+# flag (every AUTH_ACTIVE_CHECK_INTERVAL seconds) rather than trust the token
+# until it expires
+AUTH_TOKEN_CACHE_SIZE = 1024
+AUTH_VERIFY_USER_ACTIVE = False
+AUTH_ACTIVE_CHECK_INTERVAL = 60
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -18,7 +18,7 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
-from tasks.views import TaskViewSet, TaskCommentViewSet, ChecklistItemViewSet, TaskDependencyViewSet
+from tasks.views import TaskViewSet, TaskCommentViewSet, ChecklistItemViewSet, TaskDependencyViewSet, SyncView, BatchView, event_stream
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from authentication.views import register, get_user
 from django.conf import settings
@@ -43,6 +43,9 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/', include(task_router.urls)),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/events/', event_stream, name='events'),
     path('api/auth/register/', register, name='register'),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
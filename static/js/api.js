@@ -12,6 +12,10 @@ const API = {
     REFRESH_TOKEN_KEY: 'taski_refresh_token',
     USER_KEY: 'taski_user',
     
+    // Last body and ETag of GET responses by URL, revalidated with If-None-Match
+    ETAG_CACHE_SIZE: 100,
+    etagCache: new Map(),
+    
     /**
      * Initialize API - Check for tokens and user data
      */
@@ -55,6 +59,13 @@ const API = {
             options.headers = this.getHeaders();
         }
         
+        // Revalidate GETs we already hold a copy of; the server answers 304 if unchanged
+        const isGet = !options.method || options.method.toUpperCase() === 'GET';
+        const cached = isGet ? this.etagCache.get(url) : null;
+        if (cached) {
+            options.headers = { ...options.headers, 'If-None-Match': cached.etag };
+        }
+        
         try {
             const response = await fetch(url, options);
             
@@ -65,7 +76,8 @@ const API = {
                 if (refreshed) {
                     // Retry with new token
                     options.headers = this.getHeaders();
-                    return fetch(url, options);
+                    const retried = await fetch(url, options);
+                    return isGet ? this.applyEtagCache(url, retried) : retried;
                 } else {
                     // Refresh failed, logout
                     this.logout();
@@ -73,13 +85,47 @@ const API = {
                 }
             }
             
-            return response;
+            return isGet ? this.applyEtagCache(url, response) : response;
         } catch (error) {
             console.error('API request failed:', error);
             throw error;
         }
     },
     
+    /**
+     * Turn a 304 back into the cached 200 response, and remember the body of
+     * fresh responses that carry an ETag
+     */
+    async applyEtagCache(url, response) {
+        const cached = this.etagCache.get(url);
+        
+        if (response.status === 304 && cached) {
+            // Re-insert so the least recently used entry is evicted first
+            this.etagCache.delete(url);
+            this.etagCache.set(url, cached);
+            return new Response(cached.body, {
+                status: 200,
+                headers: { 'Content-Type': cached.contentType, 'ETag': cached.etag }
+            });
+        }
+        
+        const etag = response.headers.get('ETag');
+        if (response.ok && etag) {
+            const body = await response.clone().text();
+            this.etagCache.delete(url);
+            this.etagCache.set(url, {
+                etag,
+                body,
+                contentType: response.headers.get('Content-Type') || 'application/json'
+            });
+            if (this.etagCache.size > this.ETAG_CACHE_SIZE) {
+                this.etagCache.delete(this.etagCache.keys().next().value);
+            }
+        }
+        
+        return response;
+    },
+    
     /**
      * Refresh access token
      */
@@ -223,26 +269,38 @@ const API = {
         this.accessToken = null;
         this.refreshToken = null;
         this.user = null;
+        this.etagCache.clear();
         
         localStorage.removeItem(this.TOKEN_KEY);
         localStorage.removeItem(this.REFRESH_TOKEN_KEY);
         localStorage.removeItem(this.USER_KEY);
     },
     
+    // Number of tasks requested per page by getTasksPage
+    TASK_PAGE_SIZE: 50,
+    
+    /**
+     * Build the query string for the task list filters
+     */
+    buildTaskQuery(filters = {}) {
+        const queryParams = new URLSearchParams();
+        
+        // Add filters if provided
+        if (filters.status) queryParams.append('status', filters.status);
+        if (filters.priority) queryParams.append('priority', filters.priority);
+        if (filters.search) queryParams.append('search', filters.search);
+        if (filters.tag) queryParams.append('tag', filters.tag);
+        if (filters.ordering) queryParams.append('ordering', filters.ordering);
+        
+        return queryParams;
+    },
+    
     /**
      * Get all tasks
      */
     async getTasks(filters = {}) {
         try {
-            // Build query params
-            const queryParams = new URLSearchParams();
-            
-            // Add filters if provided
-            if (filters.status) queryParams.append('status', filters.status);
-            if (filters.priority) queryParams.append('priority', filters.priority);
-            if (filters.search) queryParams.append('search', filters.search);
-            if (filters.tag) queryParams.append('tag', filters.tag);
-            
+            const queryParams = this.buildTaskQuery(filters);
             const url = `${this.BASE_URL}/tasks/${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
             const response = await this.fetchWithAuth(url);
             
@@ -257,6 +315,31 @@ const API = {
         }
     },
     
+    /**
+     * Get one page of tasks.
+     * Pass the `next` URL of the previous page to continue; returns { results, next }.
+     */
+    async getTasksPage(filters = {}, nextUrl = null) {
+        try {
+            let url = nextUrl;
+            if (!url) {
+                const queryParams = this.buildTaskQuery(filters);
+                queryParams.append('page_size', this.TASK_PAGE_SIZE);
+                url = `${this.BASE_URL}/tasks/?${queryParams.toString()}`;
+            }
+            const response = await this.fetchWithAuth(url);
+            
+            if (response.ok) {
+                return await response.json();
+            } else {
+                throw new Error('Failed to fetch tasks');
+            }
+        } catch (error) {
+            console.error('Get tasks page error:', error);
+            throw error;
+        }
+    },
+    
     /**
      * Get single task by ID
      */
@@ -275,6 +358,26 @@ const API = {
         }
     },
     
+    /**
+     * Get a task with everything its detail view shows, in one request:
+     * { task, checklist_items, comments, dependencies, blockers, blocked },
+     * each as returned by its own endpoint
+     */
+    async getTaskBundle(taskId) {
+        try {
+            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/bundle/`);
+            
+            if (response.ok) {
+                return await response.json();
+            } else {
+                throw new Error('Failed to fetch task details');
+            }
+        } catch (error) {
+            console.error(`Get bundle for task ${taskId} error:`, error);
+            throw error;
+        }
+    },
+    
     /**
      * Create new task
      */
@@ -467,6 +570,29 @@ const API = {
         }
     },
     
+    /**
+     * Move a checklist item to just after another one (null moves it first)
+     */
+    async moveChecklistItem(taskId, itemId, afterId) {
+        try {
+            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/checklist/${itemId}/move/`, {
+                method: 'POST',
+                body: JSON.stringify({
+                    after: afterId
+                })
+            });
+            
+            if (response.ok) {
+                return await response.json();
+            } else {
+                throw new Error('Failed to move checklist item');
+            }
+        } catch (error) {
+            console.error(`Move checklist item ${itemId} error:`, error);
+            throw error;
+        }
+    },
+    
     /**
      * Delete a checklist item
      */
@@ -675,11 +801,13 @@ const API = {
     },
     
     /**
-     * Get tasks that are blocking a task
+     * Get tasks that are blocking a task; pass a depth (a number of levels
+     * or 'all') to include the tasks blocking those, transitively
      */
-    async getTaskBlockers(taskId) {
+    async getTaskBlockers(taskId, depth = null) {
         try {
-            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/blockers/`);
+            const query = depth ? `?depth=${depth}` : '';
+            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/blockers/${query}`);
             
             if (response.ok) {
                 return await response.json();
@@ -693,11 +821,13 @@ const API = {
     },
     
     /**
-     * Get tasks that are blocked by a task
+     * Get tasks that are blocked by a task; pass a depth (a number of levels
+     * or 'all') to include the tasks blocked by those, transitively
      */
-    async getTaskBlocked(taskId) {
+    async getTaskBlocked(taskId, depth = null) {
         try {
-            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/blocked/`);
+            const query = depth ? `?depth=${depth}` : '';
+            const response = await this.fetchWithAuth(`${this.BASE_URL}/tasks/${taskId}/blocked/${query}`);
             
             if (response.ok) {
                 return await response.json();
@@ -36,7 +36,8 @@ const Tasks = {
         dependenciesList: document.getElementById('dependencies-list'),
         blockingTasksList: document.getElementById('blocking-tasks-list'),
         blockedTasksList: document.getElementById('blocked-tasks-list'),
-        dependencyForm: document.getElementById('dependency-form')
+        dependencyForm: document.getElementById('dependency-form'),
+        dependencySearch: document.getElementById('dependency-search')
     },
     
     // Current filters
@@ -49,6 +50,9 @@ const Tasks = {
     
     // Current tasks, comments, and checklist items
     tasks: [],
+    nextTasksUrl: null,
+    loadingMoreTasks: false,
+    scrollObserver: null,
     comments: [],
     currentTaskId: null,
     editingCommentId: null,
@@ -67,6 +71,27 @@ const Tasks = {
     init() {
         this.addEventListeners();
         this.initDragAndDrop();
+        this.initInfiniteScroll();
+    },
+    
+    /**
+     * Load the next page of tasks when the end of the list scrolls into view
+     */
+    initInfiniteScroll() {
+        this.elements.scrollSentinel = document.createElement('div');
+        this.elements.scrollSentinel.className = 'task-list-sentinel';
+        this.elements.taskList.after(this.elements.scrollSentinel);
+        
+        if (!('IntersectionObserver' in window)) {
+            return;
+        }
+        
+        this.scrollObserver = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                this.loadMoreTasks();
+            }
+        }, { rootMargin: '200px' });
+        this.scrollObserver.observe(this.elements.scrollSentinel);
     },
     
     /**
@@ -136,6 +161,14 @@ const Tasks = {
         
         // Dependency form submission
         this.elements.dependencyForm.addEventListener('submit', this.handleDependencySubmit.bind(this));
+        
+        // Search the dependency options as the user types
+        this.elements.dependencySearch.addEventListener('input', () => {
+            clearTimeout(this.dependencySearchTimer);
+            this.dependencySearchTimer = setTimeout(() => {
+                this.populateDependencyTaskDropdown(this.currentTaskId);
+            }, 250);
+        });
     },
     
     /**
@@ -169,8 +202,10 @@ const Tasks = {
                 await this.loadUsers();
             }
             
-            // Load tasks with current filters
-            this.tasks = await API.getTasks(this.filters);
+            // Load the first page of tasks with current filters
+            const page = await API.getTasksPage(this.filters);
+            this.tasks = page.results;
+            this.nextTasksUrl = page.next;
             
             // Render tasks
             this.renderTasks();
@@ -182,6 +217,32 @@ const Tasks = {
         }
     },
     
+    /**
+     * Append the next page of tasks, if there is one
+     */
+    async loadMoreTasks() {
+        if (!this.nextTasksUrl || this.loadingMoreTasks) {
+            return;
+        }
+        
+        this.loadingMoreTasks = true;
+        try {
+            const page = await API.getTasksPage(this.filters, this.nextTasksUrl);
+            this.tasks = this.tasks.concat(page.results);
+            this.nextTasksUrl = page.next;
+            
+            page.results.forEach((task, index) => {
+                const taskElement = this.createTaskElement(task);
+                taskElement.style.animationDelay = `${index * 0.05}s`;
+                this.elements.taskList.appendChild(taskElement);
+            });
+        } catch (error) {
+            console.error('Error loading more tasks:', error);
+        } finally {
+            this.loadingMoreTasks = false;
+        }
+    },
+    
     /**
      * Render tasks to the UI
      */
@@ -414,12 +475,11 @@ const Tasks = {
             document.getElementById('task-tags').value = task.tags || '';
             document.getElementById('task-assigned-to').value = task.assigned_to;
             
-            // Load comments, checklist, and dependencies
-            this.loadComments(task.id);
-            this.loadChecklist(task.id);
-            this.loadDependencies(task.id);
+            // Load comments, checklist, and dependencies in one request
+            this.loadTaskBundle(task.id);
             
             // Populate dependency task dropdown with available tasks
+            this.elements.dependencySearch.value = '';
             this.populateDependencyTaskDropdown(task.id);
             
             // Make all tabs visible for existing tasks
@@ -458,16 +518,32 @@ const Tasks = {
     },
     
     /**
-     * Populate dependency task dropdown with available tasks
+     * Populate dependency task dropdown with the tasks matching the dependency search.
+     * The options come from the server, so tasks on pages not loaded yet are included.
      */
-    populateDependencyTaskDropdown(currentTaskId) {
+    async populateDependencyTaskDropdown(currentTaskId) {
         const dependencyTaskSelect = document.getElementById('dependency-task');
+        const search = this.elements.dependencySearch.value.trim();
+        
+        // Ignore responses to searches typed over since
+        const request = this.dependencySearchRequest = (this.dependencySearchRequest || 0) + 1;
+        
+        let page;
+        try {
+            page = await API.getTasksPage({ search });
+        } catch (error) {
+            console.error('Error loading dependency options:', error);
+            return;
+        }
+        if (request !== this.dependencySearchRequest) {
+            return;
+        }
         
         // Clear existing options
         dependencyTaskSelect.innerHTML = '<option value="">Select a task</option>';
         
-        // Add options for all tasks except the current one
-        this.tasks.forEach(task => {
+        // Add options for the matching tasks except the current one
+        page.results.forEach(task => {
             if (task.id !== parseInt(currentTaskId)) {
                 const option = document.createElement('option');
                 option.value = task.id;
@@ -665,6 +741,47 @@ const Tasks = {
         submitBtn.textContent = 'Save Task';
     },
     
+    /**
+     * Load the comments, checklist and dependencies of a task from its bundle
+     */
+    async loadTaskBundle(taskId) {
+        // Clear what the previous task left behind and show loading indicators
+        this.comments = [];
+        this.checklistItems = [];
+        this.dependencies = [];
+        this.blockingTasks = [];
+        this.blockedTasks = [];
+        this.elements.commentsList.innerHTML = '<div class="loader"></div>';
+        this.elements.checklistItems.innerHTML = '<div class="loader"></div>';
+        
+        try {
+            const bundle = await API.getTaskBundle(taskId);
+            
+            // The modal may have moved on to another task meanwhile
+            if (this.currentTaskId !== taskId) return;
+            
+            this.comments = bundle.comments;
+            this.checklistItems = bundle.checklist_items;
+            this.dependencies = bundle.dependencies;
+            this.blockingTasks = bundle.blockers;
+            this.blockedTasks = bundle.blocked;
+            
+            this.renderComments();
+            this.renderChecklist();
+            this.updateChecklistProgress();
+            this.initChecklistDragAndDrop();
+            this.renderDependencies();
+            this.renderBlockingTasks();
+            this.renderBlockedTasks();
+        } catch (error) {
+            console.error('Error loading task details:', error);
+            if (this.currentTaskId !== taskId) return;
+            this.elements.commentsList.innerHTML = '<div class="error-message">Failed to load comments</div>';
+            this.elements.checklistItems.innerHTML = '<div class="error-message">Failed to load checklist</div>';
+            this.showError('Failed to load dependencies. Please try again.');
+        }
+    },
+    
     /**
      * Load comments for a task
      */
@@ -1076,12 +1193,12 @@ const Tasks = {
                     document.removeEventListener('mousemove', onMouseMove);
                     document.removeEventListener('mouseup', onMouseUp);
                     
-                    // Save the new order
-                    const newOrder = Array.from(container.children)
-                        .map(el => parseInt(el.dataset.id))
-                        .filter(id => !isNaN(id));
+                    if (Array.from(container.children).indexOf(item) === itemInitialIndex) return;
                     
-                    this.reorderChecklistItems(newOrder);
+                    // Only the dragged item changes position on the server
+                    const previous = item.previousElementSibling;
+                    const afterId = previous ? parseInt(previous.dataset.id) : null;
+                    this.moveChecklistItem(parseInt(item.dataset.id), isNaN(afterId) ? null : afterId);
                 };
                 
                 document.addEventListener('mousemove', onMouseMove);
@@ -1259,6 +1376,26 @@ const Tasks = {
         }
     },
     
+    /**
+     * Move a checklist item to just after another one
+     */
+    async moveChecklistItem(itemId, afterId) {
+        if (!this.currentTaskId) return;
+        
+        try {
+            const movedItem = await API.moveChecklistItem(this.currentTaskId, itemId, afterId);
+            
+            // Update local array; the DOM is already in the new order
+            const items = this.checklistItems.filter(item => item.id !== movedItem.id);
+            items.splice(items.findIndex(item => item.id === afterId) + 1, 0, movedItem);
+            this.checklistItems = items;
+        } catch (error) {
+            console.error('Error moving checklist item:', error);
+            // Re-render to restore original order
+            this.renderChecklist();
+        }
+    },
+    
     /**
      * Delete a checklist item
      */
@@ -1443,11 +1580,8 @@ const Tasks = {
                 // Close current modal
                 this.elements.taskModal.classList.add('hidden');
                 
-                // Show the blocking task
-                const blockingTask = this.tasks.find(t => t.id === task.id);
-                if (blockingTask) {
-                    this.showTaskModal(blockingTask);
-                }
+                // Show the blocking task; its row is a full task, whether or not its page is loaded
+                this.showTaskModal(task);
             });
             
             blockingTasksList.appendChild(element);
@@ -1498,11 +1632,8 @@ const Tasks = {
                 // Close current modal
                 this.elements.taskModal.classList.add('hidden');
                 
-                // Show the blocked task
-                const blockedTask = this.tasks.find(t => t.id === task.id);
-                if (blockedTask) {
-                    this.showTaskModal(blockedTask);
-                }
+                // Show the blocked task; its row is a full task, whether or not its page is loaded
+                this.showTaskModal(task);
             });
             
             blockedTasksList.appendChild(element);
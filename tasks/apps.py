@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def install_search_triggers(using, **kwargs):
+    from django.db import connections
+    from .search import install_task_triggers
+    install_task_triggers(connections[using])
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(install_search_triggers, sender=self)
@@ -0,0 +1,126 @@
+"""
+Async read paths for the task API viewsets under ASGI.
+
+DRF views are synchronous, so under ``core.asgi.application`` Django runs
+each request to them in a worker thread. ``AsyncReadMixin`` gives a viewset
+async implementations of chosen read actions instead: their handlers run on
+the event loop, load their rows with the async ORM and issue independent
+queries together with ``gather()``. Authentication, permission and
+conditional GET checks (``initial()``) still run once in a thread before
+the handler, exactly as in the sync path.
+
+Requests arriving through WSGI, and every other action, keep going through
+the regular synchronous ``dispatch()``, so both servers return identical
+responses.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404
+
+
+def not_found(model):
+    """The Http404 get_object_or_404() raises for a missing ``model`` row."""
+    return Http404(f'No {model._meta.object_name} matches the given query.')
+
+
+class AsyncReadMixin:
+    """
+    Serves the actions named in ``async_actions`` (mapped to the names of
+    their ``async def`` handlers, e.g. ``{'list': 'alist'}``) asynchronously
+    for ASGI requests.
+    """
+    async_actions = {}
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not any(action in cls.async_actions for action in view.actions.values()):
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            if cls.runs_async(request, view.actions):
+                # dispatch() hands back the adispatch() coroutine
+                return await view(request, *args, **kwargs)
+            return await sync_to_async(view)(request, *args, **kwargs)
+
+        async_view.__dict__.update(view.__dict__)
+        async_view.__name__, async_view.__doc__ = view.__name__, view.__doc__
+        # For in-process callers that are already on a sync thread (see tasks.batch)
+        async_view.sync_view = view
+        return async_view
+
+    @classmethod
+    def runs_async(cls, request, actions):
+        method = request.method.lower()
+        action = actions.get(method, actions.get('get') if method == 'head' else None)
+        return isinstance(request, ASGIRequest) and action in cls.async_actions
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.runs_async(request, self.action_map):
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """APIView.dispatch() for an async handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Authenticating reads the user row, and initial() may run the
+            # conditional GET query too
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, self.async_actions[self.action])
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def afilter_queryset(self, queryset):
+        # Filter backends may query while validating their parameters
+        return await sync_to_async(self.filter_queryset)(queryset)
+
+    async def aget_object(self):
+        """get_object() through the async ORM."""
+        queryset = await self.afilter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except ObjectDoesNotExist:
+            raise not_found(queryset.model)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def apaginate(self, queryset):
+        """
+        The rows of ``queryset`` for a list response, as ``(rows, paginated)``:
+        one page when the request asks for pagination, otherwise all of them.
+        """
+        # Plain lists skip the thread hop
+        if self.paginator is not None and self.paginator.is_requested(self.request):
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+            if page is not None:
+                return page, True
+        return [row async for row in queryset], False
+
+    @staticmethod
+    async def gather(*awaitables):
+        """
+        Await ``awaitables`` concurrently, like ``asyncio.gather()``, but
+        raise the first failure in argument order, so e.g. a permission
+        check's 404 wins over an error from a query running beside it.
+        """
+        results = await asyncio.gather(*awaitables, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
@@ -0,0 +1,153 @@
+"""
+Multiplexed API calls behind ``POST /api/batch/``.
+
+The batch request is authenticated once. Each sub-request is then built as a
+plain Django request for the same user and handed, in order and in-process,
+to the view the URL resolver picks for its path, so it is validated,
+permission-checked and rendered exactly as if it had come over HTTP. Only
+the middleware and the per-request JWT decode and user lookup are skipped.
+
+With ``atomic`` the sub-requests share one transaction: the first one that
+fails rolls back everything before it and the rest are not run. The users
+whose cached responses the rolled back writes invalidated are invalidated
+again afterwards, since a GET in the batch may have cached the discarded rows.
+"""
+import json
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from .cache import bump_generations, recording_bumps
+
+MAX_BATCH_REQUESTS = 50
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+# Routes that can't answer inside a batch: the batch itself and the event stream
+UNBATCHABLE = ('batch', 'events')
+
+# Headers of the batch request that would mean something else on a sub-request
+DROPPED_HEADERS = (
+    'HTTP_AUTHORIZATION', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH',
+    'HTTP_IF_UNMODIFIED_SINCE', 'CONTENT_TYPE', 'CONTENT_LENGTH', 'QUERY_STRING', 'HTTP_ACCEPT',
+)
+
+
+def parse_requests(raw_requests):
+    """Check the shape of every sub-request; returns ``[(method, path, body)]``."""
+    if not isinstance(raw_requests, list) or not raw_requests:
+        raise ValidationError({'requests': 'Expected a non-empty list of requests.'})
+    if len(raw_requests) > MAX_BATCH_REQUESTS:
+        raise ValidationError({'requests': f'At most {MAX_BATCH_REQUESTS} requests per batch.'})
+
+    parsed = []
+    errors = {}
+    for index, raw in enumerate(raw_requests):
+        if not isinstance(raw, dict):
+            errors[index] = 'Expected an object.'
+            continue
+        method = str(raw.get('method', 'GET')).upper()
+        path = raw.get('path')
+        if method not in METHODS:
+            errors[index] = f"method must be one of: {', '.join(METHODS)}."
+        elif not isinstance(path, str) or not path.startswith('/api/'):
+            errors[index] = 'path must be an API path starting with /api/.'
+        else:
+            parsed.append((method, path, raw.get('body')))
+    if errors:
+        raise ValidationError({'requests': errors})
+    return parsed
+
+
+def build_request(batch_request, method, path, body):
+    """A Django request for one sub-request, carrying the batch's user."""
+    url = urlsplit(path)
+    payload = b'' if body is None else json.dumps(body).encode('utf-8')
+    environ = {
+        name: value for name, value in batch_request.META.items()
+        if name not in DROPPED_HEADERS and not name.startswith('wsgi.')
+    }
+    environ.update({
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        # JSON unless the path picks another format, e.g. with ?format=
+        'HTTP_ACCEPT': 'application/json, */*',
+        'wsgi.input': BytesIO(payload),
+        'wsgi.url_scheme': batch_request.scheme,
+    })
+    request = WSGIRequest(environ)
+    # DRF's Request authenticates these instead of running the authenticators again
+    request._force_auth_user = batch_request.user
+    request._force_auth_token = batch_request.auth
+    return request
+
+
+def _result(status_code, body):
+    return {'status': status_code, 'body': body}
+
+
+def dispatch(batch_request, method, path, body):
+    """Run one sub-request; returns its ``{"status", "body"}``."""
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        match = None
+    # Unnamed routes are the SPA catch-all, which would answer any path
+    if match is None or match.url_name is None:
+        return _result(status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'})
+
+    view = getattr(match.func, 'sync_view', match.func)
+    if match.url_name in UNBATCHABLE or iscoroutinefunction(view):
+        return _result(status.HTTP_400_BAD_REQUEST, {'detail': 'This endpoint cannot be batched.'})
+
+    response = view(build_request(batch_request, method, path, body), *match.args, **match.kwargs)
+    if response.streaming:
+        return _result(status.HTTP_400_BAD_REQUEST, {'detail': 'Streamed responses cannot be batched.'})
+    if hasattr(response, 'render'):
+        response.render()
+    content = response.content
+    if not content:
+        return _result(response.status_code, None)
+    if response.get('Content-Type', '').startswith('application/json'):
+        return _result(response.status_code, json.loads(content))
+    return _result(response.status_code, content.decode(response.charset))
+
+
+def run_batch(batch_request, requests, atomic=False):
+    """
+    Dispatch the parsed ``requests`` in order for the batch's user. Returns
+    ``(ok, results)`` with one ``{"status", "body"}`` per sub-request.
+
+    Without ``atomic`` every sub-request runs and commits on its own. With
+    it they share a transaction; on the first failure (any 4xx/5xx status)
+    it is rolled back, ``ok`` is False and the sub-requests after it report
+    ``424 Failed Dependency`` without running.
+    """
+    if not atomic:
+        return True, [dispatch(batch_request, *request) for request in requests]
+
+    results = []
+    with recording_bumps() as bumped:
+        with transaction.atomic():
+            for request in requests:
+                result = dispatch(batch_request, *request)
+                results.append(result)
+                if result['status'] >= 400:
+                    transaction.set_rollback(True)
+                    break
+    if results[-1]['status'] < 400:
+        return True, results
+    bump_generations(bumped)
+    skipped = _result(status.HTTP_424_FAILED_DEPENDENCY, None)
+    results.extend(dict(skipped) for _ in requests[len(results):])
+    return False, results
@@ -0,0 +1,229 @@
+"""
+Batched task writes behind ``POST /api/tasks/bulk/``.
+
+Every operation is validated before anything is written, with a single
+ownership query for the referenced tasks and a single lookup for the users
+named in the payloads. If all operations are valid they are applied in one
+transaction using ``bulk_create``, ``bulk_update`` and one ``delete()``;
+otherwise nothing is written and the per-item results point at the failures.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from .cache import bump_generations
+from .events import publish_change
+from .fast_serializers import render_task_rows, task_rows
+from .models import Tag, Task, Tombstone
+from .serializers import TaskSerializer
+
+OPERATIONS = ('create', 'update', 'delete')
+
+MAX_OPERATIONS = 1000
+
+# User foreign keys accepted in create/update payloads
+USER_FIELDS = ('owner', 'assigned_to')
+
+
+class BulkOperation:
+    """One parsed entry of the ``operations`` list and its outcome."""
+
+    def __init__(self, index, raw):
+        self.index = index
+        self.raw = raw
+        self.op = None
+        self.task_id = None
+        self.data = {}
+        self.task = None
+        self.validated_data = None
+        self.status = None
+        self.errors = None
+
+    def fail(self, code, errors):
+        self.status = code
+        self.errors = errors
+
+    def result(self):
+        result = {'op': self.op}
+        if self.task_id is not None:
+            result['id'] = self.task_id
+        result['status'] = self.status
+        if self.errors is not None:
+            result['errors'] = self.errors
+        return result
+
+
+def parse_operations(raw_operations):
+    """Check the shape of every operation; returns the list of BulkOperation."""
+    operations = [BulkOperation(index, raw) for index, raw in enumerate(raw_operations)]
+    seen = set()
+    for operation in operations:
+        raw = operation.raw
+        if not isinstance(raw, dict):
+            operation.fail(status.HTTP_400_BAD_REQUEST, {'non_field_errors': ['Expected an object.']})
+            continue
+        operation.op = raw.get('op')
+        if operation.op not in OPERATIONS:
+            operation.fail(status.HTTP_400_BAD_REQUEST, {'op': [f"Must be one of: {', '.join(OPERATIONS)}."]})
+            continue
+
+        data = raw.get('data', {})
+        if operation.op != 'delete':
+            if not isinstance(data, dict):
+                operation.fail(status.HTTP_400_BAD_REQUEST, {'data': ['Expected an object.']})
+                continue
+            operation.data = data
+        if operation.op == 'create':
+            continue
+
+        try:
+            operation.task_id = int(raw.get('id'))
+        except (TypeError, ValueError):
+            operation.fail(status.HTTP_400_BAD_REQUEST, {'id': ['A valid integer is required.']})
+            continue
+        if operation.task_id in seen:
+            operation.fail(status.HTTP_400_BAD_REQUEST, {'id': ['Task appears in more than one operation.']})
+        seen.add(operation.task_id)
+    return operations
+
+
+def referenced_user_ids(operations):
+    user_ids = set()
+    for operation in operations:
+        for name in USER_FIELDS:
+            try:
+                user_ids.add(int(operation.data[name]))
+            except (KeyError, TypeError, ValueError):
+                pass
+    return user_ids
+
+
+def validate_operations(operations, user, context):
+    """Resolve tasks and users in batch, then run TaskSerializer on each payload."""
+    pending = [operation for operation in operations if operation.status is None]
+
+    task_ids = [operation.task_id for operation in pending if operation.task_id is not None]
+    tasks = Task.objects.visible_to(user).in_bulk(task_ids) if task_ids else {}
+
+    users = User.objects.in_bulk(referenced_user_ids(pending) - {user.pk})
+    users[user.pk] = user
+    context = {**context, 'prefetched': {User: users}}
+
+    for operation in pending:
+        if operation.task_id is not None:
+            operation.task = tasks.get(operation.task_id)
+            if operation.task is None:
+                operation.fail(status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'})
+                continue
+        if operation.op == 'delete':
+            continue
+
+        if operation.op == 'create':
+            # Like TaskViewSet.perform_create, the caller always owns new tasks
+            serializer = TaskSerializer(data={**operation.data, 'owner': user.pk}, context=context)
+        else:
+            serializer = TaskSerializer(operation.task, data=operation.data, partial=True, context=context)
+        if serializer.is_valid():
+            operation.validated_data = serializer.validated_data
+        else:
+            operation.fail(status.HTTP_400_BAD_REQUEST, serializer.errors)
+
+
+@transaction.atomic
+def apply_operations(operations):
+    """Write validated operations; returns the created and updated tasks."""
+    created = []
+    updated = []
+    update_fields = {'updated_at'}
+    delete_ids = []
+    users = set()
+
+    for operation in operations:
+        if operation.op == 'delete':
+            delete_ids.append(operation.task_id)
+            continue
+        validated_data = dict(operation.validated_data)
+        tags_list = validated_data.pop('get_tags_list', None)
+        if operation.op == 'create':
+            task = Task(**validated_data)
+            created.append(task)
+        else:
+            task = operation.task
+            for attr, value in validated_data.items():
+                setattr(task, attr, value)
+                update_fields.add(attr)
+            users.update(task._stored_users)
+            updated.append(task)
+        if tags_list is not None:
+            task.set_tags_list(tags_list)
+            update_fields.add('tags')
+        operation.task = task
+
+    if created:
+        Task.objects.bulk_create(created)
+    if updated:
+        now = timezone.now()
+        for task in updated:
+            task.updated_at = now
+        Task.objects.bulk_update(updated, sorted(update_fields))
+    retagged = [task for task in created + updated if (task.tags or '') != (task._synced_tags or '')]
+    if retagged:
+        Tag.objects.sync_tasks(retagged)
+    if delete_ids:
+        # Deleting goes through the collector, so model signals fire as usual
+        Task.objects.filter(pk__in=delete_ids).delete()
+
+    # bulk_create/bulk_update skip model signals
+    for event_type, tasks in (('task.created', created), ('task.updated', updated)):
+        for task in tasks:
+            current = (task.owner_id, task.assigned_to_id)
+            users.update(current)
+            lost = set(task._stored_users) - set(current)
+            if lost:
+                Tombstone.objects.record_hidden_tasks([task.pk], lost)
+                publish_change('task.deleted', task.pk, task.pk, lost)
+            publish_change(event_type, task.pk, task.pk, current)
+            task._stored_users = current
+    bump_generations(users)
+    return created + updated
+
+
+def run_bulk(raw_operations, user, context):
+    """
+    Validate and apply ``raw_operations`` for ``user``.
+
+    Returns ``(status_code, results)`` with one result per operation. When
+    any operation fails, nothing is written: the failures carry their own
+    status and errors and every other operation reports ``424 Failed
+    Dependency``.
+    """
+    operations = parse_operations(raw_operations)
+    validate_operations(operations, user, context)
+
+    if any(operation.status is not None for operation in operations):
+        for operation in operations:
+            if operation.status is None:
+                operation.status = status.HTTP_424_FAILED_DEPENDENCY
+        return status.HTTP_400_BAD_REQUEST, [operation.result() for operation in operations]
+
+    written = apply_operations(operations)
+    rendered = {}
+    if written:
+        rows = render_task_rows(task_rows(Task.objects.filter(pk__in=[task.pk for task in written])))
+        rendered = {row['id']: row for row in rows}
+
+    results = []
+    for operation in operations:
+        if operation.op == 'create':
+            operation.task_id = operation.task.pk
+            operation.status = status.HTTP_201_CREATED
+        elif operation.op == 'update':
+            operation.status = status.HTTP_200_OK
+        else:
+            operation.status = status.HTTP_204_NO_CONTENT
+        result = operation.result()
+        if operation.op != 'delete':
+            result['data'] = rendered[operation.task_id]
+        results.append(result)
+    return status.HTTP_200_OK, results
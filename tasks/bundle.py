@@ -0,0 +1,60 @@
+"""
+The task detail bundle behind ``GET /api/tasks/{id}/bundle/``.
+
+Opening a task shows the task, its checklist, comments and dependencies and
+the tasks it is blocked by and blocks. Each has its own endpoint; the bundle
+renders all of them in the same formats through the values() fast path, in
+five queries however many related tasks there are:
+
+1. the task's dependencies, with their creators;
+2. the ids of the tasks actively depending on it;
+3. the task and every task named by 1 and 2 that the user can see;
+4. the checklist items of those tasks;
+5. the task's comments.
+
+The blockers are the targets of the task's active dependencies, so they come
+out of 1 and 3 without a query of their own. Like the separate endpoints, the
+bundle leaves out the tasks the user can't see, and renders the
+``depends_on_details`` of a dependency on one as null.
+"""
+from .fast_serializers import render_comment_rows, render_dependency_rows, render_task_rows, task_rows
+from .models import Task, TaskDependency
+
+
+def task_bundle(task_id, user):
+    """
+    Everything the task detail shows for ``task_id``, or None when the task
+    doesn't exist or ``user`` can't see it.
+    """
+    dependencies = render_dependency_rows(
+        TaskDependency.objects.filter(task_id=task_id).order_by('-created_at'), creator_details=True
+    )
+    blocked_ids = set(
+        TaskDependency.objects.filter(depends_on_id=task_id, active=True).values_list('task_id', flat=True)
+    )
+    blocker_ids = {dependency['depends_on'] for dependency in dependencies if dependency['active']}
+    related_ids = {dependency['depends_on'] for dependency in dependencies} | blocked_ids
+
+    # In the blockers/blocked endpoints' order
+    rows = task_rows(
+        Task.objects.visible_to(user).filter(pk__in=related_ids | {task_id}).order_by('-created_at')
+    )
+    tasks = {row['id']: row for row in render_task_rows(rows)}
+    task = tasks.get(task_id)
+    if task is None:
+        return None
+
+    for dependency in dependencies:
+        # Keep TaskDependencySerializer's key order
+        creator = dependency.pop('created_by_details')
+        dependency['task_details'] = task
+        dependency['depends_on_details'] = tasks.get(dependency['depends_on'])
+        dependency['created_by_details'] = creator
+    return {
+        'task': task,
+        'checklist_items': task['checklist_items'],
+        'comments': render_comment_rows([task_id])[task_id],
+        'dependencies': dependencies,
+        'blockers': [row for pk, row in tasks.items() if pk in blocker_ids],
+        'blocked': [row for pk, row in tasks.items() if pk in blocked_ids],
+    }
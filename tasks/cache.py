@@ -0,0 +1,177 @@
+"""
+Per-user response caching for the task API.
+
+Every user has a generation number stored in the cache. Cached responses are
+keyed by ``(user, generation, request)``, so bumping a user's generation
+(done by the model signal receivers in tasks/signals.py whenever a task they
+own or are assigned to changes) invalidates all of their cached responses at
+once, without tracking individual keys. Stale entries simply age out.
+
+Writes that bypass model signals (``QuerySet.update()``, ``bulk_create()``,
+``bulk_update()``, raw SQL) must call ``invalidate_tasks()`` or
+``invalidate_all()`` themselves.
+"""
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+GENERATION_KEY = 'tasks:generation:%s'
+
+# Generation shared by every user, bumped by invalidate_all()
+ALL_USERS = 'all'
+
+# Sets collecting the users bumped inside recording_bumps() blocks
+_recorders = threading.local()
+
+
+def _new_generation():
+    # Time-based rather than starting at 1, so a counter that was evicted
+    # never comes back with a value that old entries were stored under
+    return time.time_ns()
+
+
+def get_generation(user_id):
+    """Current generation of ``user_id``, starting a new one if none is stored."""
+    key = GENERATION_KEY % user_id
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(user_ids):
+    for user_id in user_ids:
+        key = GENERATION_KEY % user_id
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), timeout=None)
+
+
+def bump_generations(user_ids):
+    """
+    Invalidate every cached response of the given users.
+
+    The bump is repeated once the surrounding transaction commits, so a
+    concurrent request that read the old rows before the commit can't leave
+    them cached under the new generation.
+    """
+    user_ids = set(user_ids) - {None}
+    if not user_ids:
+        return
+    for recorded in getattr(_recorders, 'stack', ()):
+        recorded.update(user_ids)
+    _bump(user_ids)
+    transaction.on_commit(lambda: _bump(user_ids))
+
+
+@contextmanager
+def recording_bumps():
+    """
+    Collect the users whose generation is bumped inside the block. A caller
+    that rolls the block back must bump them again: the repeat on commit is
+    discarded with the transaction, and a response read inside it may have
+    been cached under the new generation.
+    """
+    stack = _recorders.__dict__.setdefault('stack', [])
+    user_ids = set()
+    stack.append(user_ids)
+    try:
+        yield user_ids
+    finally:
+        stack.remove(user_ids)
+
+
+def invalidate_all():
+    """Invalidate every user's cached responses, e.g. after a raw SQL rebuild."""
+    _bump([ALL_USERS])
+
+
+def reset_generation(user_id):
+    """Start a fresh generation, e.g. for a new user reusing a deleted user's id."""
+    cache.set(GENERATION_KEY % user_id, _new_generation(), timeout=None)
+
+
+def invalidate_tasks(task_ids):
+    """Bump the generation of everyone who owns or is assigned to these tasks."""
+    from .models import Task
+
+    user_ids = set()
+    for owner_id, assigned_to_id in Task.objects.filter(pk__in=list(task_ids)).values_list('owner_id', 'assigned_to_id'):
+        user_ids.update((owner_id, assigned_to_id))
+    bump_generations(user_ids)
+
+
+class ResponseCache:
+    """
+    Caches response data per user and normalized query string, and counts
+    hits and misses. Instances register themselves by name so the metrics
+    can be listed with ``ResponseCache.all_stats()``.
+    """
+    registry = {}
+
+    def __init__(self, name, timeout=None):
+        self.name = name
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.registry[name] = self
+
+    def get_timeout(self):
+        if self.timeout is not None:
+            return self.timeout
+        return getattr(settings, 'TASK_LIST_CACHE_TIMEOUT', 300)
+
+    def make_key(self, request):
+        """
+        Key for the request's user, their current generation and the query
+        parameters (order-insensitive, so ?a=1&b=2 and ?b=2&a=1 share an entry).
+        The host is included because paginated responses carry absolute links.
+        """
+        params = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+        digest = hashlib.sha1(repr((request.get_host(), request.path, params)).encode('utf-8')).hexdigest()
+        user_id = request.user.pk
+        generation = f'{get_generation(ALL_USERS)}.{get_generation(user_id)}'
+        return f'tasks:{self.name}:{user_id}:{generation}:{digest}'
+
+    def get(self, key):
+        data = cache.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data):
+        cache.set(key, data, self.get_timeout())
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    @classmethod
+    def all_stats(cls):
+        return {name: instance.stats() for name, instance in cls.registry.items()}
+
+
+task_list_cache = ResponseCache('task_list')
+schedule_cache = ResponseCache('task_schedule')
+stats_cache = ResponseCache('task_stats')
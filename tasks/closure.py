@@ -0,0 +1,119 @@
+"""
+Transitive closure of the active task dependency graph.
+
+``tasks_dependencypath`` (the DependencyPath model) holds one row per
+(ancestor, descendant) pair: ``descendant`` transitively depends on
+``ancestor``. tasks.signals updates it whenever a TaskDependency is created,
+toggled or deleted, in the same transaction.
+
+Adding the dependency ``blocker -> task`` inserts a row for every ancestor
+of ``blocker`` (or ``blocker`` itself) and every descendant of ``task`` (or
+``task`` itself). Removing it deletes those same pairs, the only ones whose
+chains can have gone through it, and then re-derives the ones another chain
+still connects. In an acyclic graph such a chain enters the task's side
+through some remaining dependency, and the closure rows on either side of
+that dependency are unaffected by the removal, so one join finds them all.
+No chain counts are kept, so nothing grows with the number of chains.
+
+A task's blockers are then the rows with it as descendant, and a cycle check
+is one lookup on the unique (ancestor, descendant) index.
+"""
+from django.db import connection
+
+CLOSURE_TABLE = 'tasks_dependencypath'
+
+# The blocker and its ancestors, and the task and its descendants.
+# Parameters: blocker, blocker, task, task
+_ENDS_SQL = f"""
+    up(task_id) AS (
+        SELECT %s
+        UNION
+        SELECT ancestor_id FROM {CLOSURE_TABLE} WHERE descendant_id = %s
+    ), down(task_id) AS (
+        SELECT %s
+        UNION
+        SELECT descendant_id FROM {CLOSURE_TABLE} WHERE ancestor_id = %s
+    )
+"""
+
+# Parameters: blocker, blocker, task, task
+ADD_SQL = f"""
+    WITH {_ENDS_SQL}
+    INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id)
+    SELECT up.task_id, down.task_id
+    FROM up CROSS JOIN down
+    WHERE true
+    ON CONFLICT (ancestor_id, descendant_id) DO NOTHING
+"""
+
+# Parameters: blocker, blocker, task, task
+FORGET_SQL = f"""
+    DELETE FROM {CLOSURE_TABLE}
+    WHERE (ancestor_id = %s OR ancestor_id IN (SELECT ancestor_id FROM {CLOSURE_TABLE} WHERE descendant_id = %s))
+    AND (descendant_id = %s OR descendant_id IN (SELECT descendant_id FROM {CLOSURE_TABLE} WHERE ancestor_id = %s))
+"""
+
+# Pairs still connected through a remaining active dependency ``x -> y``
+# crossing into the task's side (``y`` in ``down``, ``x`` not). Run after
+# FORGET_SQL, whose deleted rows all have an ancestor in ``up`` and a
+# descendant in ``down``, so the rows reaching ``x`` and leaving ``y`` are
+# intact. Parameters: blocker, blocker, task, task
+REDERIVE_SQL = f"""
+    WITH {_ENDS_SQL}, bridge(x, y) AS (
+        SELECT depends_on_id, task_id FROM tasks_taskdependency
+        WHERE active AND task_id IN (SELECT task_id FROM down) AND depends_on_id NOT IN (SELECT task_id FROM down)
+    ), from_up(ancestor_id, x) AS (
+        SELECT x, x FROM bridge WHERE x IN (SELECT task_id FROM up)
+        UNION
+        SELECT c.ancestor_id, bridge.x FROM bridge JOIN {CLOSURE_TABLE} c ON c.descendant_id = bridge.x
+        WHERE c.ancestor_id IN (SELECT task_id FROM up)
+    ), to_down(y, descendant_id) AS (
+        SELECT y, y FROM bridge
+        UNION
+        SELECT bridge.y, c.descendant_id FROM bridge JOIN {CLOSURE_TABLE} c ON c.ancestor_id = bridge.y
+    )
+    INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id)
+    SELECT DISTINCT from_up.ancestor_id, to_down.descendant_id
+    FROM bridge
+    JOIN from_up ON from_up.x = bridge.x
+    JOIN to_down ON to_down.y = bridge.y
+    WHERE true
+    ON CONFLICT (ancestor_id, descendant_id) DO NOTHING
+"""
+
+REBUILD_SQL = f"""
+    WITH RECURSIVE reach(ancestor_id, descendant_id) AS (
+        SELECT depends_on_id, task_id FROM tasks_taskdependency WHERE active
+        UNION
+        SELECT reach.ancestor_id, d.task_id
+        FROM reach JOIN tasks_taskdependency d ON d.depends_on_id = reach.descendant_id AND d.active
+    )
+    INSERT INTO {CLOSURE_TABLE} (ancestor_id, descendant_id)
+    SELECT ancestor_id, descendant_id FROM reach
+"""
+
+
+def add_edge(blocker_id, task_id, using=connection):
+    """Record that ``task_id`` now depends on ``blocker_id``."""
+    with using.cursor() as cursor:
+        cursor.execute(ADD_SQL, [blocker_id, blocker_id, task_id, task_id])
+
+
+def remove_edge(blocker_id, task_id, using=connection):
+    """
+    Forget the dependency of ``task_id`` on ``blocker_id``, added earlier with
+    add_edge() and no longer active in ``tasks_taskdependency``.
+    """
+    params = [blocker_id, blocker_id, task_id, task_id]
+    with using.cursor() as cursor:
+        cursor.execute(FORGET_SQL, params)
+        cursor.execute(REDERIVE_SQL, params)
+
+
+def rebuild_closure(using=connection):
+    """Recompute the whole closure from the active dependencies; returns its row count."""
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {CLOSURE_TABLE}')
+        cursor.execute(REBUILD_SQL)
+        cursor.execute(f'SELECT count(*) FROM {CLOSURE_TABLE}')
+        return cursor.fetchone()[0]
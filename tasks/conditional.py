@@ -0,0 +1,101 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the task API.
+
+Validators are computed from a single aggregate query, e.g. the row count and
+latest ``updated_at`` of the list being requested, before anything is
+serialized. A client that repeats a request with ``If-None-Match`` (or
+``If-Modified-Since``) gets an empty ``304 Not Modified`` when nothing changed.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class ConditionalResponse(Exception):
+    """Carries a 304 (or 412) out of ``initial()`` so the handler is skipped."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Adds strong ETags and Last-Modified headers to a viewset's read actions.
+
+    ``get_conditional_state()`` returns ``(last_modified, *extra)`` for the
+    current request, or None to skip the check (for example when the object
+    doesn't exist and the handler should 404 as usual); a None
+    ``last_modified`` sends no Last-Modified header. By default that is the
+    latest ``conditional_timestamp`` and the row count of
+    ``get_conditional_queryset()``, with the timestamp only sent for a
+    single object. The ETag hashes the state together with
+    the full request path, the user and the response format.
+    """
+    conditional_actions = ('list', 'retrieve')
+    conditional_timestamp = 'updated_at'
+
+    def get_conditional_queryset(self):
+        """The rows the response is built from: the filtered list, or the requested object."""
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_state(self):
+        state = self.get_conditional_queryset().order_by().aggregate(
+            last_modified=Max(self.conditional_timestamp), count=Count('pk')
+        )
+        if self.action == 'retrieve':
+            if not state['count']:
+                return None
+            return state['last_modified'], state['count']
+        # A row leaving the list (deleted, or no longer matching its filters)
+        # doesn't move the newest timestamp, so lists only get an ETag
+        return None, state['last_modified'], state['count']
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ('GET', 'HEAD') or self.action not in self.conditional_actions:
+            return
+
+        state = self.get_conditional_state()
+        if state is None:
+            return
+        last_modified = state[0]
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        self.validators = (self.make_etag(request, state), timestamp)
+
+        response = get_conditional_response(request, etag=self.validators[0], last_modified=timestamp)
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def make_etag(self, request, state):
+        key = repr((
+            request.get_full_path(),
+            request.user.pk,
+            request.accepted_renderer.format,
+            *[value.isoformat() if hasattr(value, 'isoformat') else value for value in state],
+        ))
+        return '"%s"' % hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'validators', None)
+        if validators and (response.status_code == 200 or isinstance(response, HttpResponseNotModified)):
+            etag, timestamp = validators
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Cached per user, and always revalidated
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
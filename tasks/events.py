@@ -0,0 +1,240 @@
+"""
+Live change events behind ``GET /api/events/`` (Server-Sent Events).
+
+The model signal receivers in tasks/signals.py call ``publish_change()`` for
+every task, comment, checklist item and dependency write. Once the
+transaction commits, the event goes to the configured backend, which hands
+it to the ``broker`` of every worker process. The broker fans it out to the
+open connections of the users who own or are assigned to the task.
+
+Every connection has a bounded queue. A client that falls
+``TASK_EVENTS_QUEUE_SIZE`` events behind has its backlog replaced by a
+single ``resync`` event, so one slow reader can't hold memory or slow down
+publishers.
+
+Backends (``TASK_EVENTS_BACKEND``):
+
+* ``tasks.events.LocalBackend`` (default) only reaches connections in the
+  publishing process, which is enough for a single ASGI worker.
+* ``tasks.events.SQLiteBackend`` appends events to a small SQLite file
+  (``TASK_EVENTS_SQLITE_PATH``) that every worker on the host polls, as a
+  stand-in for a real message bus when running several workers.
+"""
+import asyncio
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+# Milliseconds a client waits before reconnecting a dropped stream
+RETRY_MILLISECONDS = 5000
+
+
+def get_queue_size():
+    return getattr(settings, 'TASK_EVENTS_QUEUE_SIZE', 100)
+
+
+class Subscription:
+    """One open event stream: the user it belongs to and its bounded queue."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        """Queue ``event``; must run in the subscription's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind to catch up event by event
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """In-process fan-out from published events to the subscriptions of their users."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id):
+        """Open a subscription for ``user_id``; call from the event loop that will read it."""
+        subscription = Subscription(user_id, get_queue_size())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def dispatch(self, event):
+        """Deliver ``event`` to its users' subscriptions; safe to call from any thread."""
+        payload = {key: value for key, value in event.items() if key != 'users'}
+        with self._lock:
+            targets = [
+                subscription
+                for user_id in event['users']
+                for subscription in self._subscriptions.get(user_id, ())
+            ]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, payload)
+            except RuntimeError:
+                # The connection's loop has shut down; it unsubscribes on its own
+                pass
+
+
+broker = Broker()
+
+
+class LocalBackend:
+    """Delivers events to the connections of the publishing process only."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def publish(self, event):
+        self.broker.dispatch(event)
+
+    def ensure_listening(self):
+        """Called by every new connection; nothing to start for local delivery."""
+
+
+class SQLiteBackend:
+    """
+    Shares events between the worker processes of one host through an
+    append-only SQLite table. Each process polls for rows newer than the last
+    one it saw while it has open connections; rows older than a minute are
+    pruned by the publishers.
+    """
+    poll_interval = 0.5
+    keep_seconds = 60
+
+    def __init__(self, broker, path=None):
+        self.broker = broker
+        self.path = str(path or getattr(settings, 'TASK_EVENTS_SQLITE_PATH', None)
+                        or Path(tempfile.gettempdir()) / 'taski-events.sqlite3')
+        self._local = threading.local()
+        self._poller = None
+        self._last_id = None
+
+    def connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS events '
+                '(id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, payload TEXT NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def publish(self, event):
+        connection = self.connect()
+        now = time.time()
+        connection.execute('INSERT INTO events (created, payload) VALUES (?, ?)', (now, json.dumps(event)))
+        connection.execute('DELETE FROM events WHERE created < ?', (now - self.keep_seconds,))
+
+    def read_since(self, last_id):
+        """Events stored after ``last_id`` (or none, just the current position, when it is None)."""
+        connection = self.connect()
+        if last_id is None:
+            return connection.execute('SELECT coalesce(max(id), 0) FROM events').fetchone()[0], []
+        rows = connection.execute('SELECT id, payload FROM events WHERE id > ? ORDER BY id', (last_id,)).fetchall()
+        return (rows[-1][0] if rows else last_id), [json.loads(payload) for _, payload in rows]
+
+    def ensure_listening(self):
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self.poll())
+
+    async def poll(self):
+        read = sync_to_async(self.read_since, thread_sensitive=False)
+        while self.broker.subscriber_count():
+            self._last_id, events = await read(self._last_id)
+            for event in events:
+                self.broker.dispatch(event)
+            await asyncio.sleep(self.poll_interval)
+        # Resume from the current end once someone connects again
+        self._last_id = None
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        backend_class = import_string(getattr(settings, 'TASK_EVENTS_BACKEND', 'tasks.events.LocalBackend'))
+        _backend = backend_class(broker)
+    return _backend
+
+
+def publish_change(event_type, task_id, object_id, user_ids):
+    """
+    Publish ``event_type`` (e.g. ``"checklist_item.updated"``) about
+    ``object_id`` under task ``task_id`` to ``user_ids``, once the current
+    transaction commits.
+    """
+    user_ids = sorted(set(user_ids) - {None})
+    if not user_ids:
+        return
+    event = {'type': event_type, 'task': task_id, 'id': object_id, 'users': user_ids}
+    transaction.on_commit(lambda: get_backend().publish(event))
+
+
+def format_event(event):
+    """Encode ``event`` as one Server-Sent Events message."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(user_id, until=None):
+    """
+    Yield Server-Sent Events text for ``user_id`` until the client goes away
+    or, if given, the ``until`` timestamp passes (when its token expires).
+    """
+    subscription = broker.subscribe(user_id)
+    try:
+        get_backend().ensure_listening()
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            timeout = HEARTBEAT_SECONDS
+            if until is not None:
+                timeout = min(timeout, until - time.time())
+                if timeout <= 0:
+                    return
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+            else:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,100 @@
+"""
+Streamed task exports behind ``GET /api/tasks/export/``.
+
+Tasks are read with ``iterator(chunk_size=EXPORT_CHUNK_SIZE)`` through the
+values() fast path and rendered one chunk at a time, so memory stays flat
+however many tasks are exported. Requested children (checklist items,
+comments) are loaded with one batched query per chunk.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from rest_framework.renderers import BaseRenderer
+
+from .fast_serializers import render_checklist_rows, render_comment_rows, render_task_rows, task_rows
+from .serializers import TaskSerializer
+
+# Tasks read from the database and rendered per chunk
+EXPORT_CHUNK_SIZE = 2000
+
+# Plain task fields; the nested details and checklist are left out
+EXPORT_FIELDS = tuple(
+    name for name, field in TaskSerializer().fields.items()
+    if not field.write_only and name not in TaskSerializer.EXPANDABLE_FIELDS
+)
+
+# ?include= values and the loaders of their rows, grouped by task id
+CHILDREN = {
+    'checklist_items': render_checklist_rows,
+    'comments': render_comment_rows,
+}
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets ``?format=csv|ndjson`` pass DRF's content negotiation. Exports are
+    streamed by the view itself; this only renders error responses, as JSON.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode('utf-8')
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def export_chunks(queryset, include=()):
+    """
+    Yield the tasks of ``queryset`` as lists of rendered dicts, one list per
+    chunk, each with the children named in ``include`` nested under their
+    own key.
+    """
+    rows = task_rows(queryset, EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        tasks = render_task_rows(chunk, EXPORT_FIELDS)
+        task_ids = [task['id'] for task in tasks]
+        for name in include:
+            children = CHILDREN[name](task_ids)
+            for task in tasks:
+                task[name] = children[task['id']]
+        yield tasks
+
+
+def stream_ndjson(queryset, include=()):
+    """One JSON object per line, chunk by chunk."""
+    for tasks in export_chunks(queryset, include):
+        yield ''.join(json.dumps(task, ensure_ascii=False, separators=(',', ':')) + '\n' for task in tasks)
+
+
+def stream_csv(queryset, include=()):
+    """
+    A header row, then one row per task. Children don't fit in a cell, so
+    each included relation is one column holding its rows as JSON.
+    """
+    columns = [*EXPORT_FIELDS, *include]
+    buffer = io.StringIO()
+    # Search results carry a snippet the CSV has no column for
+    writer = csv.DictWriter(buffer, columns, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    for tasks in export_chunks(queryset, include):
+        buffer.seek(0)
+        buffer.truncate()
+        for task in tasks:
+            for name in include:
+                task[name] = json.dumps(task[name], ensure_ascii=False, separators=(',', ':'))
+            writer.writerow(task)
+        yield buffer.getvalue()
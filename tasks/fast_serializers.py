@@ -0,0 +1,281 @@
+"""
+Read-only fast path for rendering tasks.
+
+Builds the same output as TaskSerializer from ``values()`` rows instead of
+model instances, using a row-mapping function compiled once per field
+selection. Used by the list-style endpoints where ModelSerializer overhead
+dominates, and by the async task detail (see tasks.async_views); writes and
+sync single-object reads keep going through TaskSerializer.
+"""
+import asyncio
+import datetime
+from functools import lru_cache
+
+from django.utils import timezone
+
+from .models import ChecklistItem, TaskComment
+from .search import render_snippet
+from .serializers import TaskSerializer
+
+
+def _datetime_formatter(tz):
+    """
+    Format datetimes like DRF's DateTimeField (ISO 8601, UTC as ``Z``), with
+    the active timezone resolved once per render instead of once per value.
+    """
+    def format_datetime(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return format_datetime
+
+
+def _float(value):
+    return float(value)
+
+
+def _completion(total, completed):
+    if not total:
+        return 0
+    return int((completed / total) * 100)
+
+
+# field name -> (values() columns it reads, function building the output value)
+_TASK_FIELDS = {
+    'id': (('id',), None),
+    'title': (('title',), None),
+    'description': (('description',), None),
+    'created_at': (('created_at',), 'datetime'),
+    'due_date': (('due_date',), 'datetime'),
+    'status': (('status',), None),
+    'priority': (('priority',), None),
+    'owner': (('owner_id',), None),
+    'assigned_to': (('assigned_to_id',), None),
+    'owner_details': (('owner_id', 'owner__username', 'owner__email'), 'user'),
+    'assigned_to_details': (('assigned_to_id', 'assigned_to__username', 'assigned_to__email'), 'user'),
+    'tags': (('tags',), None),
+    'duration': (('duration',), _float),
+    'checklist_items': (('id',), 'checklist'),
+    'checklist_completion': (('checklist_total', 'checklist_completed'), _completion),
+    'blocked_by_count': (('active_blockers',), None),
+    'blocks_count': (('active_dependents',), None),
+}
+
+# Output order follows TaskSerializer so both paths render byte-identical JSON
+_TASK_FIELD_ORDER = tuple(
+    name for name, field in TaskSerializer().fields.items() if not field.write_only
+)
+
+
+def _user_builder(id_column, username_column, email_column):
+    def build(row):
+        return {'id': row[id_column], 'username': row[username_column], 'email': row[email_column]}
+    return build
+
+
+def _single(column, convert):
+    if convert is None:
+        return lambda row: row[column]
+
+    def build(row):
+        value = row[column]
+        return None if value is None else convert(value)
+    return build
+
+
+def _multi(columns, convert):
+    return lambda row: convert(*[row[column] for column in columns])
+
+
+@lru_cache(maxsize=None)
+def _compile(fields, tz=datetime.timezone.utc):
+    """
+    Compile the row builder for a field selection.
+
+    Returns ``(columns, builders, needs_checklist)`` where ``builders`` is a
+    tuple of ``(output_key, function(row))`` pairs in serializer order.
+    """
+    format_datetime = _datetime_formatter(tz)
+    columns = []
+    builders = []
+    needs_checklist = False
+    for name in _TASK_FIELD_ORDER:
+        if fields is not None and name not in fields:
+            continue
+        source, convert = _TASK_FIELDS[name]
+        columns.extend(column for column in source if column not in columns)
+        if convert == 'user':
+            builders.append((name, _user_builder(*source)))
+        elif convert == 'checklist':
+            needs_checklist = True
+            builders.append((name, None))
+        elif convert == 'datetime':
+            builders.append((name, _single(source[0], format_datetime)))
+        elif len(source) == 1:
+            builders.append((name, _single(source[0], convert)))
+        else:
+            builders.append((name, _multi(source, convert)))
+    if 'id' not in columns:
+        columns.append('id')
+    return tuple(columns), tuple(builders), needs_checklist
+
+
+def _normalize(fields):
+    return None if fields is None else frozenset(fields)
+
+
+def task_rows(queryset, fields=None):
+    """
+    Return a ``values()`` queryset with every column the selected fields read.
+
+    The result can be paginated like any queryset before being handed to
+    ``render_task_rows``.
+    """
+    columns, _, _ = _compile(_normalize(fields))
+    # Full-text search annotations (see tasks.search) ride along when present
+    extra = [name for name in ('search_rank', 'search_snippet') if name in queryset.query.annotations]
+    return queryset.values(*columns, *extra)
+
+
+# Keeps the IN (...) list below SQLite's bound-parameter limit on huge pages
+CHECKLIST_BATCH_SIZE = 900
+
+
+def _checklist_batches(task_ids):
+    """The checklist item rows of ``task_ids``, as one values_list() queryset per batch."""
+    for start in range(0, len(task_ids), CHECKLIST_BATCH_SIZE):
+        yield ChecklistItem.objects.filter(
+            task_id__in=task_ids[start:start + CHECKLIST_BATCH_SIZE]
+        ).values_list('id', 'task_id', 'text', 'is_completed', 'position', 'created_at', 'updated_at')
+
+
+def _checklist_item(format_datetime, item_id, task_id, text, is_completed, position, created_at, updated_at):
+    return {
+        'id': item_id,
+        'task': task_id,
+        'text': text,
+        'is_completed': is_completed,
+        'position': position,
+        'created_at': format_datetime(created_at),
+        'updated_at': format_datetime(updated_at),
+    }
+
+
+def render_checklist_rows(task_ids):
+    """Rendered checklist items for the given tasks, grouped by task id."""
+    format_datetime = _datetime_formatter(timezone.get_current_timezone())
+    task_ids = list(task_ids)
+    grouped = {task_id: [] for task_id in task_ids}
+    for items in _checklist_batches(task_ids):
+        for item in items:
+            grouped[item[1]].append(_checklist_item(format_datetime, *item))
+    return grouped
+
+
+async def arender_checklist_rows(task_ids):
+    """``render_checklist_rows()`` through the async ORM."""
+    format_datetime = _datetime_formatter(timezone.get_current_timezone())
+    task_ids = list(task_ids)
+    grouped = {task_id: [] for task_id in task_ids}
+    for items in _checklist_batches(task_ids):
+        async for item in items:
+            grouped[item[1]].append(_checklist_item(format_datetime, *item))
+    return grouped
+
+
+def render_comment_rows(task_ids):
+    """Rendered comments (as TaskCommentSerializer) for the given tasks, grouped by task id."""
+    format_datetime = _datetime_formatter(timezone.get_current_timezone())
+    task_ids = list(task_ids)
+    grouped = {task_id: [] for task_id in task_ids}
+    for start in range(0, len(task_ids), CHECKLIST_BATCH_SIZE):
+        comments = TaskComment.objects.filter(
+            task_id__in=task_ids[start:start + CHECKLIST_BATCH_SIZE]
+        ).values_list(
+            'id', 'task_id', 'author_id', 'content', 'created_at', 'updated_at', 'author__username', 'author__email'
+        )
+        for comment_id, task_id, author_id, content, created_at, updated_at, username, email in comments:
+            grouped[task_id].append({
+                'id': comment_id,
+                'task': task_id,
+                'author': author_id,
+                'content': content,
+                'created_at': format_datetime(created_at),
+                'updated_at': format_datetime(updated_at),
+                'author_details': {'id': author_id, 'username': username, 'email': email},
+            })
+    return grouped
+
+
+def render_dependency_rows(queryset, creator_details=False):
+    """
+    Render a TaskDependency queryset as flat dicts: the plain fields of
+    TaskDependencySerializer, without the nested task and user details.
+    ``creator_details`` adds ``created_by_details``, joined in the same query.
+    """
+    format_datetime = _datetime_formatter(timezone.get_current_timezone())
+    columns = ['id', 'task_id', 'depends_on_id', 'created_at', 'updated_at', 'created_by_id', 'notes', 'active']
+    if creator_details:
+        columns += ['created_by__username', 'created_by__email']
+    rendered = []
+    for dependency_id, task_id, depends_on_id, created_at, updated_at, created_by_id, notes, active, *creator in (
+        queryset.values_list(*columns)
+    ):
+        data = {
+            'id': dependency_id,
+            'task': task_id,
+            'depends_on': depends_on_id,
+            'created_at': format_datetime(created_at),
+            'updated_at': format_datetime(updated_at),
+            'created_by': created_by_id,
+            'notes': notes,
+            'active': active,
+        }
+        if creator_details:
+            data['created_by_details'] = {'id': created_by_id, 'username': creator[0], 'email': creator[1]}
+        rendered.append(data)
+    return rendered
+
+
+def render_task_rows(rows, fields=None, checklists=None):
+    """
+    Render rows produced by ``task_rows`` into TaskSerializer-compatible dicts.
+
+    ``checklists`` may supply pre-fetched ``render_checklist_rows`` output;
+    otherwise the checklist items are loaded in one query when selected.
+    """
+    _, builders, needs_checklist = _compile(_normalize(fields), timezone.get_current_timezone())
+    rows = list(rows)
+    if needs_checklist and checklists is None:
+        checklists = render_checklist_rows([row['id'] for row in rows])
+
+    rendered = []
+    for row in rows:
+        data = {}
+        for name, build in builders:
+            data[name] = checklists[row['id']] if build is None else build(row)
+        if 'search_snippet' in row:
+            data['search_snippet'] = render_snippet(row['search_snippet'])
+        rendered.append(data)
+    return rendered
+
+
+async def arender_task_rows(rows, fields=None, task_ids=None):
+    """
+    ``render_task_rows()`` through the async ORM; ``rows`` is a ``task_rows``
+    queryset or an already loaded list of its rows. When the ids of every
+    task the rows can hold are known up front as ``task_ids``, their
+    checklist items are loaded concurrently with the rows.
+    """
+    async def load_rows():
+        return rows if isinstance(rows, list) else [row async for row in rows]
+
+    if not _compile(_normalize(fields))[2]:
+        return render_task_rows(await load_rows(), fields)
+    if task_ids is not None:
+        loaded, checklists = await asyncio.gather(load_rows(), arender_checklist_rows(task_ids))
+    else:
+        loaded = await load_rows()
+        checklists = await arender_checklist_rows([row['id'] for row in loaded])
+    return render_task_rows(loaded, fields, checklists)
@@ -0,0 +1,194 @@
+"""
+Queries walking the active task dependency graph in the database.
+
+``walk_dependencies`` follows active dependencies from one task, upstream
+(the tasks it transitively depends on) or downstream (the tasks
+transitively depending on it), from a single query instead of one request
+or query per level.
+
+``schedule`` runs the critical path method over a whole dependency graph
+loaded into memory, and ``stream_graph`` renders one as streamed JSON.
+"""
+import json
+from collections import defaultdict, deque
+
+from django.db.models import Q
+
+UPSTREAM = 'upstream'
+DOWNSTREAM = 'downstream'
+
+# (column the walk starts from, column it moves to) for each direction
+_DIRECTION_COLUMNS = {
+    UPSTREAM: ('task_id', 'depends_on_id'),
+    DOWNSTREAM: ('depends_on_id', 'task_id'),
+}
+
+
+def walk_dependencies(task_id, direction=UPSTREAM, max_depth=None, visible=None):
+    """
+    Every task reachable from ``task_id`` through active dependencies in
+    ``direction``, within ``max_depth`` levels (None for no limit), as
+    ``{task id: (depth, path)}`` in walk order. Tasks reached along several
+    chains are reported once, with their shortest ``depth`` and the
+    lowest-ordered such chain as ``path`` (a list of ids starting at
+    ``task_id``). With a ``visible`` task queryset, the walk stops at tasks
+    outside it.
+
+    The dependency closure (tasks.closure) gives the reachable tasks, so a
+    single query loads every edge the walk can follow; the breadth-first
+    walk over them visits each task once, however many chains lead to it.
+    """
+    from .models import DependencyPath, TaskDependency
+
+    source, target = _DIRECTION_COLUMNS[direction]
+    if direction == UPSTREAM:
+        reachable = DependencyPath.objects.filter(descendant_id=task_id).values('ancestor_id')
+    else:
+        reachable = DependencyPath.objects.filter(ancestor_id=task_id).values('descendant_id')
+    edges = TaskDependency.objects.filter(
+        Q(**{source: task_id}) | Q(**{f'{source}__in': reachable}), active=True,
+    )
+    if visible is not None:
+        edges = edges.filter(**{f'{target}__in': visible.values('pk')})
+    successors = defaultdict(set)
+    for start, end in edges.values_list(source, target):
+        successors[start].add(end)
+
+    walk = {}
+    frontier = [[task_id]]
+    depth = 0
+    # Expanding each level's paths in order, lowest ids first, reaches every
+    # task first along its lowest-ordered shortest chain
+    while frontier and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_frontier = []
+        for path in frontier:
+            for reached in sorted(successors[path[-1]]):
+                if reached != task_id and reached not in walk:
+                    walk[reached] = (depth, path + [reached])
+                    next_frontier.append(path + [reached])
+        frontier = next_frontier
+    return walk
+
+
+class DependencyCycleError(Exception):
+    """The dependencies handed to ``schedule`` or ``topological_order`` contain a cycle through ``task_ids``."""
+
+    def __init__(self, task_ids):
+        super().__init__(f'Dependency cycle through tasks {sorted(task_ids)}')
+        self.task_ids = task_ids
+
+
+def topological_order(task_ids, edges):
+    """
+    Kahn's algorithm over ``(blocker id, task id)`` edges between
+    ``task_ids``. Returns ``(order, successors)``: the ids with every blocker
+    ahead of its tasks, ties kept in the order of ``task_ids``, and each id's
+    list of dependent ids. Raises DependencyCycleError if the graph isn't
+    acyclic.
+    """
+    successors = {task_id: [] for task_id in task_ids}
+    blockers_left = dict.fromkeys(task_ids, 0)
+    for blocker_id, task_id in edges:
+        successors[blocker_id].append(task_id)
+        blockers_left[task_id] += 1
+    
+    ready = deque(task_id for task_id, count in blockers_left.items() if not count)
+    order = []
+    while ready:
+        task_id = ready.popleft()
+        order.append(task_id)
+        for successor in successors[task_id]:
+            blockers_left[successor] -= 1
+            if not blockers_left[successor]:
+                ready.append(successor)
+    if len(order) < len(blockers_left):
+        raise DependencyCycleError([task_id for task_id, count in blockers_left.items() if count])
+    return order, successors
+
+
+# Tolerance for comparing float hours
+_EPSILON = 1e-9
+
+
+def schedule(durations, edges):
+    """
+    Critical path method over a dependency graph, in linear time.
+
+    ``durations`` maps task ids to hours, in the order ties are broken in;
+    ``edges`` are ``(blocker id, task id)`` pairs between those tasks. Every
+    task starts as soon as all its blockers have finished. Returns
+    ``(timings, critical_path, total)``: ``{task id: (earliest start,
+    earliest finish, latest start, latest finish, slack)}`` in topological
+    order, one chain of zero-slack tasks from start to finish, and the
+    length of the whole schedule. Raises DependencyCycleError if the graph
+    isn't acyclic.
+    """
+    order, successors = topological_order(durations, edges)
+    earliest_start = dict.fromkeys(durations, 0.0)
+    for task_id in order:
+        finish = earliest_start[task_id] + durations[task_id]
+        for successor in successors[task_id]:
+            earliest_start[successor] = max(earliest_start[successor], finish)
+    
+    total = max((earliest_start[task_id] + durations[task_id] for task_id in order), default=0.0)
+    latest_start = {}
+    for task_id in reversed(order):
+        latest_finish = min((latest_start[successor] for successor in successors[task_id]), default=total)
+        latest_start[task_id] = latest_finish - durations[task_id]
+    
+    timings = {}
+    for task_id in order:
+        start, late = earliest_start[task_id], latest_start[task_id]
+        duration = durations[task_id]
+        timings[task_id] = (start, start + duration, late, late + duration, late - start)
+    
+    def critical(task_id):
+        return timings[task_id][4] < _EPSILON
+    
+    # A zero-slack task that doesn't end the schedule has a zero-slack
+    # successor starting the moment it finishes
+    path = []
+    current = next((task_id for task_id in order if critical(task_id) and timings[task_id][0] < _EPSILON), None)
+    while current is not None:
+        path.append(current)
+        finish = timings[current][1]
+        current = next(
+            (successor for successor in successors[current]
+             if critical(successor) and abs(timings[successor][0] - finish) < _EPSILON),
+            None,
+        )
+    return timings, path, total
+
+
+# Rows joined into each chunk of a streamed graph
+GRAPH_CHUNK_SIZE = 1000
+
+
+def _json_rows(rows, render):
+    """Comma-separated JSON for ``rows``, in byte chunks of GRAPH_CHUNK_SIZE rows."""
+    batch = []
+    first = True
+    for row in rows:
+        batch.append(json.dumps(render(row), ensure_ascii=False, separators=(',', ':')))
+        if len(batch) == GRAPH_CHUNK_SIZE:
+            yield ('' if first else ',') + ','.join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield ('' if first else ',') + ','.join(batch)
+
+
+def stream_graph(nodes, edges):
+    """
+    Yield ``{"nodes": [...], "edges": [...]}`` as JSON text, chunk by chunk.
+
+    ``nodes`` are ``(id, title, status)`` rows and ``edges`` are ``(task id,
+    depends on id, active)`` rows; both are consumed lazily, so a queryset
+    ``iterator()`` keeps memory flat however large the graph is.
+    """
+    yield '{"nodes":['
+    yield from _json_rows(nodes, lambda row: {'id': row[0], 'title': row[1], 'status': row[2]})
+    yield '],"edges":['
+    yield from _json_rows(edges, list)
+    yield ']}'
@@ -0,0 +1,366 @@
+"""
+Batched task imports behind ``POST /api/tasks/import/`` and the import_tasks
+command.
+
+The upload is read line by line, as NDJSON (one task object per line) or
+CSV (a header row, then one task per row), and handled IMPORT_CHUNK_SIZE
+tasks at a time: one lookup for the users the chunk names, TaskSerializer
+validation of every line, then ``bulk_create`` for the chunk's tasks and
+checklist items. Each line holds the writable TaskSerializer fields plus:
+
+* ``ref``: a name other lines can depend on;
+* ``checklist_items``: a list of texts or ``{"text", "is_completed"}`` objects;
+* ``depends_on``: a list of refs from the same upload, or ids of tasks the
+  importing user can already see.
+
+In CSV these three and ``tags_list`` are cells holding JSON, and empty cells
+are left out. Dependencies may point further down the file, so they are
+collected as the lines go by and written once every task exists. Existing
+tasks never depend on imported ones, so a new cycle can only run through
+the imported dependencies, and one in-memory topological sort over them is
+the whole cycle check.
+
+The import is one transaction: if any line fails, nothing is written and
+the errors name the failing lines.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework import serializers
+
+from .bulk import referenced_user_ids
+from .cache import bump_generations
+from .closure import add_edge
+from .events import publish_change
+from .graph import DependencyCycleError, topological_order
+from .models import ChecklistItem, Tag, Task, TaskDependency
+from .serializers import TaskSerializer
+
+# Lines validated and written together
+IMPORT_CHUNK_SIZE = 1000
+
+# Reading stops once this many lines have failed
+MAX_IMPORT_ERRORS = 100
+
+# Columns of a CSV upload that hold JSON
+JSON_COLUMNS = ('tags_list', 'checklist_items', 'depends_on')
+
+FORMATS = ('csv', 'ndjson')
+
+CHECKLIST_TEXT_LENGTH = ChecklistItem._meta.get_field('text').max_length
+
+
+class ImportLine:
+    """One task of the upload, from its raw record to its written row."""
+
+    def __init__(self, number, data=None, errors=None):
+        self.number = number
+        self.data = data
+        self.errors = errors
+        self.ref = None
+        self.checklist = []
+        self.depends_on = []
+        self.validated_data = None
+        self.task_id = None
+
+    def error(self):
+        return {'line': self.number, 'errors': self.errors}
+
+
+def ndjson_lines(lines):
+    """ImportLine for every non-blank line of an NDJSON upload."""
+    for number, raw in enumerate(lines, 1):
+        try:
+            text = raw.decode('utf-8-sig' if number == 1 else 'utf-8') if isinstance(raw, bytes) else raw
+        except UnicodeDecodeError:
+            yield ImportLine(number, errors={'non_field_errors': ['Line is not valid UTF-8.']})
+            continue
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError:
+            yield ImportLine(number, errors={'non_field_errors': ['Line is not valid JSON.']})
+            continue
+        if not isinstance(data, dict):
+            yield ImportLine(number, errors={'non_field_errors': ['Expected an object.']})
+            continue
+        yield ImportLine(number, data)
+
+
+def _decoded(lines):
+    for number, raw in enumerate(lines, 1):
+        yield raw.decode('utf-8-sig' if number == 1 else 'utf-8') if isinstance(raw, bytes) else raw
+
+
+def csv_lines(lines):
+    """
+    ImportLine for every row of a CSV upload, numbered by the line the row
+    starts on (quoted values may span lines).
+    """
+    reader = csv.DictReader(_decoded(lines))
+    while True:
+        number = reader.line_num + 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as exc:
+            message = 'Line is not valid UTF-8.' if isinstance(exc, UnicodeDecodeError) else str(exc)
+            # The reader can't resynchronize after a broken row
+            yield ImportLine(number, errors={'non_field_errors': [message]})
+            return
+        if None in row:
+            yield ImportLine(number, errors={'non_field_errors': ['More values than columns.']})
+            continue
+
+        data = {}
+        errors = {}
+        for name, value in row.items():
+            if value is None or value == '':
+                continue
+            if name in JSON_COLUMNS:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    errors[name] = ['Invalid JSON.']
+                    continue
+            data[name] = value
+        yield ImportLine(number, data, errors or None)
+
+
+def _checklist(value):
+    """``(items, errors)`` for a ``checklist_items`` value."""
+    if not isinstance(value, list):
+        return [], ['Expected a list.']
+    items = []
+    for item in value:
+        if isinstance(item, str):
+            item = {'text': item}
+        if not isinstance(item, dict):
+            return [], ['Expected texts or objects with a text.']
+        text = item.get('text')
+        is_completed = item.get('is_completed', False)
+        if not isinstance(text, str) or not text.strip():
+            return [], ['Every item needs a non-empty text.']
+        if len(text) > CHECKLIST_TEXT_LENGTH:
+            return [], [f'Item texts have at most {CHECKLIST_TEXT_LENGTH} characters.']
+        if not isinstance(is_completed, bool):
+            return [], ['is_completed must be true or false.']
+        items.append((text, is_completed))
+    return items, None
+
+
+def _depends_on(value):
+    """``(targets, errors)`` for a ``depends_on`` value: ref strings and task ids."""
+    if not isinstance(value, list):
+        return [], ['Expected a list.']
+    targets = []
+    for target in value:
+        if isinstance(target, bool) or not isinstance(target, (str, int)):
+            return [], ['Expected refs (strings) or task ids (integers).']
+        if target not in targets:
+            targets.append(target)
+    return targets, None
+
+
+def parse_line(line, refs):
+    """Split the import-only keys off ``line.data`` and check their shape."""
+    data = line.data
+    errors = line.errors or {}
+    ref = data.pop('ref', None)
+    if ref is not None:
+        if isinstance(ref, bool) or not isinstance(ref, (str, int)):
+            errors['ref'] = ['Expected a string.']
+        elif str(ref) in refs:
+            errors['ref'] = [f'Already used on line {refs[str(ref)].number}.']
+        else:
+            line.ref = str(ref)
+    if 'checklist_items' in data:
+        line.checklist, errors['checklist_items'] = _checklist(data.pop('checklist_items'))
+    if 'depends_on' in data:
+        line.depends_on, errors['depends_on'] = _depends_on(data.pop('depends_on'))
+    line.errors = {name: messages for name, messages in errors.items() if messages} or None
+
+
+def validate_chunk(lines, user):
+    """
+    Run TaskSerializer over the chunk's lines, with the users they name
+    looked up in one query. One serializer is reused for every line, so its
+    fields are only built once per chunk.
+    """
+    users = User.objects.in_bulk(referenced_user_ids(lines) - {user.pk})
+    users[user.pk] = user
+    serializer = TaskSerializer(context={'prefetched': {User: users}})
+    for line in lines:
+        try:
+            # Like TaskViewSet.perform_create, the importing user owns every task
+            line.validated_data = serializer.run_validation({**line.data, 'owner': user.pk})
+        except serializers.ValidationError as exc:
+            line.errors = {**serializers.as_serializer_error(exc), **(line.errors or {})}
+
+
+def write_chunk(lines):
+    """``bulk_create`` the chunk's tasks and checklist items; returns the item count."""
+    tasks = []
+    for line in lines:
+        validated_data = dict(line.validated_data)
+        tags_list = validated_data.pop('get_tags_list', None)
+        task = Task(**validated_data)
+        if tags_list:
+            task.set_tags_list(tags_list)
+        # bulk_create skips the signals that keep the counters
+        task.checklist_total = len(line.checklist)
+        task.checklist_completed = sum(is_completed for _, is_completed in line.checklist)
+        tasks.append(task)
+    Task.objects.bulk_create(tasks)
+    tagged = [task for task in tasks if task.tags]
+    if tagged:
+        Tag.objects.sync_tasks(tagged)
+
+    items = []
+    for line, task in zip(lines, tasks):
+        line.task_id = task.pk
+        for index, (text, is_completed) in enumerate(line.checklist, 1):
+            items.append(ChecklistItem(
+                task=task, text=text, is_completed=is_completed, position=index * ChecklistItem.POSITION_GAP,
+            ))
+        # Only the ref and the dependencies are needed from here on
+        line.data = line.validated_data = line.checklist = None
+    ChecklistItem.objects.bulk_create(items)
+    return len(items)
+
+
+def _cycle_members(stuck, edges):
+    """
+    The lines of ``stuck`` (those left over by the topological sort) that sit
+    on a cycle, leaving out the ones merely downstream of it.
+    """
+    stuck = set(stuck)
+    while True:
+        blockers = {blocker for blocker, task in edges if blocker in stuck and task in stuck}
+        if blockers == stuck:
+            return stuck
+        stuck = blockers
+
+
+def resolve_dependencies(pending, refs, user):
+    """
+    Check the dependencies of the ``pending`` lines; returns the ids, owners
+    and assignees of the existing tasks they name, as
+    ``{task id: (owner id, assignee id)}``. Unknown targets and cycles are
+    recorded on the lines.
+    """
+    wanted = {target for line in pending for target in line.depends_on if isinstance(target, int)}
+    existing = {}
+    wanted = sorted(wanted)
+    for start in range(0, len(wanted), IMPORT_CHUNK_SIZE):
+        rows = Task.objects.visible_to(user).filter(pk__in=wanted[start:start + IMPORT_CHUNK_SIZE])
+        existing.update((pk, users) for pk, *users in rows.values_list('pk', 'owner_id', 'assigned_to_id'))
+
+    # Graph between the imported tasks, by line number
+    edges = []
+    for line in pending:
+        for target in line.depends_on:
+            if isinstance(target, int):
+                if target not in existing:
+                    line.errors = {'depends_on': [f'Task {target} not found.']}
+            elif target not in refs:
+                line.errors = {'depends_on': [f'Unknown ref "{target}".']}
+            else:
+                edges.append((refs[target].number, line.number))
+
+    try:
+        topological_order({number for edge in edges for number in edge}, edges)
+    except DependencyCycleError as exc:
+        members = _cycle_members(exc.task_ids, edges)
+        for line in pending:
+            if line.number in members:
+                line.errors = {'depends_on': ['Creates a dependency cycle.']}
+    return existing
+
+
+def write_dependencies(pending, refs, user):
+    """
+    ``bulk_create`` the dependencies, then add them to the closure and
+    recount both ends, which the model signals would otherwise do. Returns
+    the number written.
+    """
+    dependencies = []
+    for line in pending:
+        for target in line.depends_on:
+            blocker_id = target if isinstance(target, int) else refs[target].task_id
+            dependencies.append(TaskDependency(task_id=line.task_id, depends_on_id=blocker_id, created_by=user))
+    TaskDependency.objects.bulk_create(dependencies, batch_size=IMPORT_CHUNK_SIZE)
+    for dependency in dependencies:
+        add_edge(dependency.depends_on_id, dependency.task_id)
+
+    task_ids = sorted({task_id for dependency in dependencies for task_id in dependency.closure_edge()})
+    for start in range(0, len(task_ids), IMPORT_CHUNK_SIZE):
+        Task.objects.filter(pk__in=task_ids[start:start + IMPORT_CHUNK_SIZE]).recount()
+    return len(dependencies)
+
+
+def run_import(lines, fmt, user, dry_run=False):
+    """
+    Import the tasks in ``lines`` (an iterable of bytes or str lines in
+    ``fmt``, ``"csv"`` or ``"ndjson"``) for ``user``.
+
+    Returns ``{"created", "checklist_items", "dependencies", "errors"}``;
+    ``errors`` holds up to MAX_IMPORT_ERRORS ``{"line", "errors"}`` entries,
+    and when it isn't empty nothing was written. With ``dry_run`` every line
+    is checked and nothing is written either way.
+    """
+    records = csv_lines(lines) if fmt == 'csv' else ndjson_lines(lines)
+    refs = {}
+    pending = []
+    failed = []
+    summary = {'created': 0, 'checklist_items': 0, 'dependencies': 0}
+    users = {user.pk}
+
+    with transaction.atomic():
+        while len(failed) < MAX_IMPORT_ERRORS:
+            chunk = list(islice(records, IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            parseable = [line for line in chunk if line.data is not None]
+            for line in parseable:
+                parse_line(line, refs)
+                if line.ref is not None:
+                    refs[line.ref] = line
+            validate_chunk(parseable, user)
+
+            valid = [line for line in chunk if line.errors is None]
+            failed.extend(line for line in chunk if line.errors is not None)
+            pending.extend(line for line in valid if line.depends_on)
+            summary['created'] += len(valid)
+            summary['checklist_items'] += sum(len(line.checklist) for line in valid)
+            users.update(line.validated_data['assigned_to'].pk for line in valid)
+            if failed or dry_run:
+                # Still checked, never written
+                for line in valid:
+                    line.data = line.validated_data = line.checklist = None
+            else:
+                write_chunk(valid)
+
+        if len(failed) < MAX_IMPORT_ERRORS and pending:
+            existing = resolve_dependencies(pending, refs, user)
+            failed.extend(line for line in pending if line.errors is not None)
+            summary['dependencies'] = sum(len(line.depends_on) for line in pending)
+            if not failed and not dry_run:
+                write_dependencies(pending, refs, user)
+                users.update(user_id for task_users in existing.values() for user_id in task_users)
+
+        if failed or dry_run:
+            transaction.set_rollback(True)
+            failed.sort(key=lambda line: line.number)
+            return {**summary, 'errors': [line.error() for line in failed[:MAX_IMPORT_ERRORS]]}
+
+        if summary['created']:
+            bump_generations(users)
+            # One event rather than one per task; clients refetch on resync
+            publish_change('resync', None, None, users)
+    return {**summary, 'errors': []}
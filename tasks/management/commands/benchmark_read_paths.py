@@ -0,0 +1,192 @@
+import asyncio
+import io
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.urls import reverse
+from authentication.tokens import UserClaimsAccessToken
+
+from tasks.models import Task
+
+HOST = 'localhost'
+
+
+def read_paths(task):
+    """The hot read endpoints served asynchronously under ASGI (see tasks.async_views)."""
+    return [
+        reverse('task-list'),
+        reverse('task-detail', args=[task.pk]),
+        reverse('task-blockers', args=[task.pk]),
+        reverse('task-blocked', args=[task.pk]),
+        reverse('task-comment-list', args=[task.pk]),
+        reverse('task-checklist-list', args=[task.pk]),
+    ]
+
+
+def wsgi_get(handler, path, authorization):
+    """One GET through the WSGI handler; returns the status code."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST,
+        'HTTP_AUTHORIZATION': authorization,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    result = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(result)
+    finally:
+        # Fires request_finished, which closes the thread's DB connection
+        result.close()
+    return int(statuses[0].split()[0])
+
+
+async def asgi_get(handler, path, authorization):
+    """One GET through the ASGI handler; returns the status code."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', HOST.encode()), (b'authorization', authorization.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': (HOST, 80),
+    }
+    body_sent = False
+    statuses = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; the handler cancels this wait
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await handler(scope, receive, send)
+    return statuses[0]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the throughput of the hot read endpoints served by the WSGI '
+        'handler (sync views in a thread pool) and the ASGI handler (async '
+        'views), with many concurrent in-process clients'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to send the requests as (default: first user with tasks)')
+        parser.add_argument('--clients', type=int, default=200, help='Concurrent clients (default: 200)')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per server (default: 2000)')
+
+    def handle(self, *args, **options):
+        user, task = self.get_user_and_task(options['user'])
+        authorization = f'Bearer {UserClaimsAccessToken.for_user(user)}'
+        paths = read_paths(task)
+        total = options['requests']
+        clients = options['clients']
+        if total < 1 or clients < 1:
+            raise CommandError('--requests and --clients must be positive')
+        requests = [paths[index % len(paths)] for index in range(total)]
+
+        self.stdout.write(
+            f'{total} GETs over {len(paths)} endpoints as {user.username}, {clients} concurrent clients'
+        )
+        # DEBUG would log every query in memory
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=[HOST]):
+            wsgi = self.run_wsgi(requests, clients, authorization)
+            asgi = self.run_asgi(requests, clients, authorization)
+        self.report('WSGI', *wsgi)
+        self.report('ASGI', *asgi)
+        self.stdout.write(f'ASGI/WSGI throughput: {(total / asgi[0]) / (total / wsgi[0]):.2f}x')
+
+    def get_user_and_task(self, username):
+        users = User.objects.order_by('id')
+        if username:
+            users = users.filter(username=username)
+        for user in users:
+            task = Task.objects.visible_to(user).order_by('pk').first()
+            if task is not None:
+                return user, task
+        raise CommandError('No matching user with tasks; pass --user or create some tasks first')
+
+    def run_wsgi(self, requests, clients, authorization):
+        handler = WSGIHandler()
+        latencies = []
+        statuses = []
+        lock = threading.Lock()
+
+        def timed(path):
+            start = time.perf_counter()
+            status = wsgi_get(handler, path, authorization)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                statuses.append(status)
+
+        wsgi_get(handler, requests[0], authorization)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            list(pool.map(timed, requests))
+        return time.perf_counter() - start, latencies, statuses
+
+    def run_asgi(self, requests, clients, authorization):
+        handler = ASGIHandler()
+        latencies = []
+        statuses = []
+
+        async def client(queue):
+            while queue:
+                path = queue.pop()
+                start = time.perf_counter()
+                statuses.append(await asgi_get(handler, path, authorization))
+                latencies.append(time.perf_counter() - start)
+
+        async def run():
+            await asgi_get(handler, requests[0], authorization)
+            queue = list(reversed(requests))
+            start = time.perf_counter()
+            await asyncio.gather(*[client(queue) for _ in range(clients)])
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(run())
+        return elapsed, latencies, statuses
+
+    def report(self, label, elapsed, latencies, statuses):
+        errors = sum(1 for status in statuses if status >= 400)
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(
+            f'  {len(latencies) / elapsed:.1f} req/s over {elapsed:.2f}s, '
+            f'latency p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms, '
+            f'p99 {quantiles[98] * 1000:.1f} ms'
+        )
+        if errors:
+            self.stdout.write(self.style.ERROR(f'  {errors} error responses'))
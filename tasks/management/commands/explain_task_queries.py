@@ -0,0 +1,131 @@
+import datetime
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+
+from tasks.fast_serializers import task_rows
+from tasks.models import Task, Tombstone
+from tasks.sync import TASK_FIELDS
+from tasks.views import TaskViewSet, TaskCommentViewSet, ChecklistItemViewSet, TaskDependencyViewSet
+
+# Query strings exercising the TaskViewSet list filters the SPA uses
+LIST_SCENARIOS = [
+    '',
+    'status=TODO',
+    'priority=HIGH',
+    'status=IN_PROGRESS&ordering=due_date',
+    'ordering=-duration',
+    'tag=backend',
+    'search=release',
+    'fields=id,title,status,priority,due_date',
+]
+
+# "SCAN t" / "SCAN t USING COVERING INDEX i" read every row; virtual tables
+# (the FTS index) and SQLite's internal temp tables are fine
+FULL_SCAN = re.compile(r'\bSCAN (?!.*VIRTUAL TABLE)(?!CONSTANT)')
+
+
+def build_view(viewset_class, action, user, query='', **kwargs):
+    """Instantiate a viewset the way the router would for a GET request."""
+    request = Request(RequestFactory().get('/', data=dict(pair.split('=', 1) for pair in query.split('&') if pair)))
+    request.user = user
+    view = viewset_class()
+    view.request = request
+    view.args = ()
+    view.kwargs = kwargs
+    view.action = action
+    view.format_kwarg = None
+    return view
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN QUERY PLAN over the querysets the task API really issues '
+        'and flag full table scans'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username to build the querysets for (default: first user)')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if a full scan is found')
+        parser.add_argument(
+            '--union', action='store_true',
+            help='Also explain the UNION rewrite of the owner/assignee visibility filter',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN output is only interpreted for SQLite')
+        user = self.get_user(options['user'])
+        task = Task.objects.visible_to(user).first()
+
+        scans = 0
+        for label, queryset in self.scenarios(user, task, options['union']):
+            scans += self.explain(label, queryset)
+
+        if scans:
+            message = f'{scans} full scan(s) found'
+            if options['strict']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans'))
+
+    def get_user(self, username):
+        users = User.objects.all()
+        user = users.filter(username=username).first() if username else users.order_by('id').first()
+        if user is None:
+            raise CommandError('No matching user; pass --user or create one first')
+        return user
+
+    def scenarios(self, user, task, union):
+        for query in LIST_SCENARIOS:
+            view = build_view(TaskViewSet, 'list', user, query)
+            queryset = view.filter_queryset(view.get_queryset())
+            yield f'tasks list ?{query}', task_rows(queryset, view.get_requested_fields())
+
+        if union:
+            owned = Task.objects.filter(owner=user).order_by().values('id')
+            assigned = Task.objects.filter(assigned_to=user).order_by().values('id')
+            yield 'tasks list (UNION rewrite)', task_rows(
+                Task.objects.filter(pk__in=owned.union(assigned)).order_by('-created_at')
+            )
+
+        since = timezone.now() - datetime.timedelta(hours=1)
+        yield 'sync tasks changed since', task_rows(
+            Task.objects.visible_to(user).filter(updated_at__gt=since).order_by('pk'), TASK_FIELDS
+        )
+        yield 'sync tombstones', Tombstone.objects.filter(user=user, deleted_at__gt=since).order_by('pk')
+
+        if task is None:
+            self.stdout.write(self.style.WARNING('User has no tasks; skipping nested endpoints'))
+            return
+        yield 'task blockers', task_rows(Task.objects.filter(
+            dependent_tasks__task=task, dependent_tasks__active=True
+        ))
+        yield 'task blocked', task_rows(Task.objects.filter(
+            dependencies__depends_on=task, dependencies__active=True
+        ))
+        for viewset_class, label in [
+            (TaskCommentViewSet, 'comments'),
+            (ChecklistItemViewSet, 'checklist'),
+            (TaskDependencyViewSet, 'dependencies'),
+        ]:
+            view = build_view(viewset_class, 'list', user, task_pk=task.pk)
+            yield f'{label} list', view.get_queryset()
+
+    def explain(self, label, queryset):
+        """Print the plan for one queryset and return the number of full scans."""
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        scans = 0
+        for line in queryset.explain().splitlines():
+            if FULL_SCAN.search(line):
+                scans += 1
+                self.stdout.write(self.style.ERROR(f'  {line}   <-- full scan'))
+            else:
+                self.stdout.write(f'  {line}')
+        return scans
@@ -0,0 +1,46 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.imports import FORMATS, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks for a user from a CSV or NDJSON file, in chunks of bulk '
+        'inserts; nothing is written if any line fails'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--user', required=True, help='Username that will own the imported tasks')
+        parser.add_argument('--format', choices=FORMATS, help='File format (default: from the file extension)')
+        parser.add_argument('--dry-run', action='store_true', help='Check every line without writing anything')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['user']!r}")
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt == 'jsonl':
+            fmt = 'ndjson'
+        if fmt not in FORMATS:
+            raise CommandError('Cannot tell the format from the file name; pass --format')
+
+        try:
+            with open(options['path'], 'rb') as upload:
+                result = run_import(upload, fmt, user, dry_run=options['dry_run'])
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in result['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        if result['errors']:
+            raise CommandError(f"{len(result['errors'])} lines failed; nothing was imported")
+        verb = 'Checked' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['created']} tasks, {result['checklist_items']} checklist items "
+            f"and {result['dependencies']} dependencies"
+        ))
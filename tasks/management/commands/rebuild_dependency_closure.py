@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.closure import rebuild_closure
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the transitive closure of active task dependencies from scratch'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_closure()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} dependency paths'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for tasks and their comments'
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError('The full-text index is only available on SQLite; run migrate first.')
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} tasks'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tasks.cache import invalidate_tasks
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the denormalized checklist and dependency counters on every '
+        'task with the real counts, and optionally repair the ones that drifted'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Rewrite the counters of drifted tasks')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if drift is found and not repaired')
+
+    def handle(self, *args, **options):
+        columns = [*Task.COUNTER_FIELDS, *(f'live_{name}' for name in Task.COUNTER_FIELDS)]
+        drifted = []
+        rows = Task.objects.with_live_counts().order_by('pk').values_list('pk', *columns)
+        for pk, *values in rows.iterator():
+            stored = dict(zip(Task.COUNTER_FIELDS, values))
+            live = dict(zip(Task.COUNTER_FIELDS, values[len(Task.COUNTER_FIELDS):]))
+            changes = [f'{name} {stored[name]} -> {live[name]}' for name in Task.COUNTER_FIELDS if stored[name] != live[name]]
+            if changes:
+                drifted.append(pk)
+                self.stdout.write(f'Task {pk}: ' + ', '.join(changes))
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('All task counters are consistent'))
+            return
+        if options['repair']:
+            with transaction.atomic():
+                # Recomputed in the UPDATE itself, so writes since the check are counted
+                Task.objects.filter(pk__in=drifted).recount()
+                invalidate_tasks(drifted)
+            self.stdout.write(self.style.SUCCESS(f'Repaired the counters of {len(drifted)} tasks'))
+        elif options['strict']:
+            raise CommandError(f'{len(drifted)} tasks have drifted counters; run with --repair')
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drifted)} tasks have drifted counters; run with --repair'))
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.7 on 2026-10-17 15:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_tags(apps, schema_editor):
+    """Populate Tag/TaskTag from the comma-separated Task.tags column."""
+    Task = apps.get_model('tasks', 'Task')
+    Tag = apps.get_model('tasks', 'Tag')
+    TaskTag = apps.get_model('tasks', 'TaskTag')
+
+    links = set()
+    for task_id, tags in Task.objects.exclude(tags__isnull=True).exclude(tags='').values_list('id', 'tags').iterator():
+        for name in tags.split(','):
+            name = name.strip().lower()
+            if name:
+                links.add((task_id, name))
+
+    names = {name for _, name in links}
+    Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+    tag_ids = dict(Tag.objects.values_list('name', 'id'))
+    TaskTag.objects.bulk_create(
+        [TaskTag(task_id=task_id, tag_id=tag_ids[name]) for task_id, name in links],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_taskdependency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_links', to='tasks.tag')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='tasks.task')),
+            ],
+            options={
+                'unique_together': {('tag', 'task')},
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='tasks', through='tasks.TaskTag', to='tasks.tag'),
+        ),
+        migrations.RunPython(copy_tags, migrations.RunPython.noop),
+    ]
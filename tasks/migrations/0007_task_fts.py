@@ -0,0 +1,87 @@
+from django.db import migrations
+
+FTS_TABLE = 'tasks_task_fts'
+
+COMMENTS_OF = "coalesce((SELECT group_concat(content, ' ') FROM tasks_taskcomment WHERE task_id = {task}), '')"
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, description, tags, comments,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+        VALUES (new.id, new.title, new.description, coalesce(new.tags, ''), '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description, tags ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.tags IS NOT new.tags
+    BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = new.description, tags = coalesce(new.tags, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_taskcomment_fts_insert AFTER INSERT ON tasks_taskcomment BEGIN
+        UPDATE {FTS_TABLE} SET comments = {COMMENTS_OF.format(task='new.task_id')} WHERE rowid = new.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_taskcomment_fts_update AFTER UPDATE OF content, task_id ON tasks_taskcomment
+    WHEN old.content IS NOT new.content OR old.task_id IS NOT new.task_id
+    BEGIN
+        UPDATE {FTS_TABLE} SET comments = {COMMENTS_OF.format(task='old.task_id')} WHERE rowid = old.task_id;
+        UPDATE {FTS_TABLE} SET comments = {COMMENTS_OF.format(task='new.task_id')} WHERE rowid = new.task_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER tasks_taskcomment_fts_delete AFTER DELETE ON tasks_taskcomment BEGIN
+        UPDATE {FTS_TABLE} SET comments = {COMMENTS_OF.format(task='old.task_id')} WHERE rowid = old.task_id;
+    END
+    """,
+    f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+    SELECT id, title, description, coalesce(tags, ''), {COMMENTS_OF.format(task='tasks_task.id')}
+    FROM tasks_task
+    """,
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tasks_taskcomment_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_taskcomment_fts_update',
+    'DROP TRIGGER IF EXISTS tasks_taskcomment_fts_insert',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_delete',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_update',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def run_on_sqlite(statements):
+    """FTS5 is SQLite-only; other backends keep the LIKE-based search."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_tag_tasktag'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
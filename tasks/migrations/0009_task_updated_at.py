@@ -0,0 +1,61 @@
+# Generated by Django 5.1.7 on 2026-10-17 15:51
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.update(updated_at=models.F('created_at'))
+
+
+FTS_TABLE = 'tasks_task_fts'
+
+# The tasks_task triggers from 0007_task_fts, as they stood when this
+# migration was written
+TASK_TRIGGER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+        VALUES (new.id, new.title, new.description, coalesce(new.tags, ''), '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title, description, tags ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.tags IS NOT new.tags
+    BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = new.description, tags = coalesce(new.tags, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+
+def reinstall_fts_triggers(apps, schema_editor):
+    """Adding the column rebuilds tasks_task on SQLite, dropping its triggers."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    for statement in TASK_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(reinstall_fts_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
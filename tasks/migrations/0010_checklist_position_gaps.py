@@ -0,0 +1,38 @@
+from django.db import migrations
+
+POSITION_GAP = 1024
+
+
+def renumber(apps, step):
+    """Renumber each task's checklist as step, 2 * step, ... keeping the current order."""
+    ChecklistItem = apps.get_model('tasks', 'ChecklistItem')
+    changed = []
+    task_id, index = None, 0
+    items = ChecklistItem.objects.order_by('task_id', 'position', 'created_at', 'id').only('id', 'task_id', 'position')
+    for item in items.iterator():
+        if item.task_id != task_id:
+            task_id, index = item.task_id, 0
+        index += 1
+        if item.position != index * step:
+            item.position = index * step
+            changed.append(item)
+    ChecklistItem.objects.bulk_update(changed, ['position'], batch_size=500)
+
+
+def space_positions(apps, schema_editor):
+    renumber(apps, POSITION_GAP)
+
+
+def compact_positions(apps, schema_editor):
+    renumber(apps, 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(space_positions, compact_positions),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.1.7 on 2026-10-17 16:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_of(queryset, outer_field):
+    return Coalesce(
+        Subquery(queryset.order_by().values(outer_field).annotate(total=Count('pk')).values('total')[:1]),
+        0,
+    )
+
+
+def backfill_counters(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    ChecklistItem = apps.get_model('tasks', 'ChecklistItem')
+    TaskDependency = apps.get_model('tasks', 'TaskDependency')
+    items = ChecklistItem.objects.filter(task=OuterRef('pk'))
+    Task.objects.update(
+        checklist_total=count_of(items, 'task'),
+        checklist_completed=count_of(items.filter(is_completed=True), 'task'),
+        active_blockers=count_of(TaskDependency.objects.filter(task=OuterRef('pk'), active=True), 'task'),
+        active_dependents=count_of(
+            TaskDependency.objects.filter(depends_on=OuterRef('pk'), active=True), 'depends_on'
+        ),
+    )
+
+
+FTS_TABLE = 'tasks_task_fts'
+
+# The tasks_task triggers from 0007_task_fts, as they stood when this
+# migration was written
+TASK_TRIGGER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+        VALUES (new.id, new.title, new.description, coalesce(new.tags, ''), '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title, description, tags ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.tags IS NOT new.tags
+    BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = new.description, tags = coalesce(new.tags, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+
+def reinstall_fts_triggers(apps, schema_editor):
+    """Adding the columns rebuilds tasks_task on SQLite, dropping its triggers."""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return
+    for statement in TASK_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_checklist_position_gaps'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='active_blockers',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='active_dependents',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='checklist_completed',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='checklist_total',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(reinstall_fts_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.7 on 2026-10-17 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DependencyPath',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('paths', models.BigIntegerField(default=1)),
+                ('ancestor', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task')),
+                ('descendant', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='tasks.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='dependencypath_descendant_idx')],
+                'unique_together': {('ancestor', 'descendant', 'depth')},
+            },
+        ),
+        # The rows are filled in by 0014_dependency_closure_pairs
+    ]
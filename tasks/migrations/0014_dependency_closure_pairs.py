@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-17 18:09
+
+from django.db import migrations
+
+# Frozen copy of tasks.closure.REBUILD_SQL as of this migration
+REBUILD_SQL = """
+    WITH RECURSIVE reach(ancestor_id, descendant_id) AS (
+        SELECT depends_on_id, task_id FROM tasks_taskdependency WHERE active
+        UNION
+        SELECT reach.ancestor_id, d.task_id
+        FROM reach JOIN tasks_taskdependency d ON d.depends_on_id = reach.descendant_id AND d.active
+    )
+    INSERT INTO tasks_dependencypath (ancestor_id, descendant_id)
+    SELECT ancestor_id, descendant_id FROM reach
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_sync_tombstones'),
+    ]
+
+    operations = [
+        # One row per pair from now on; the per-depth rows would clash
+        migrations.RunSQL('DELETE FROM tasks_dependencypath', migrations.RunSQL.noop),
+        migrations.AlterUniqueTogether(
+            name='dependencypath',
+            unique_together={('ancestor', 'descendant')},
+        ),
+        migrations.RemoveField(
+            model_name='dependencypath',
+            name='depth',
+        ),
+        migrations.RemoveField(
+            model_name='dependencypath',
+            name='paths',
+        ),
+        migrations.RunSQL(REBUILD_SQL, migrations.RunSQL.noop),
+    ]
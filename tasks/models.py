@@ -1,7 +1,132 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+
+def normalize_tag(name):
+    """Canonical form used for tag storage and matching."""
+    return name.strip().lower()
+
+
+def _count_subquery(queryset, outer_field):
+    """Correlated COUNT(*) over ``queryset`` grouped by ``outer_field``."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values(outer_field)
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        ),
+        0,
+    )
+
+
+def _live_counts():
+    """Correlated COUNT subqueries for each Task counter column."""
+    items = ChecklistItem.objects.filter(task=OuterRef('pk'))
+    return {
+        'checklist_total': _count_subquery(items, 'task'),
+        'checklist_completed': _count_subquery(items.filter(is_completed=True), 'task'),
+        'active_blockers': _count_subquery(
+            TaskDependency.objects.filter(task=OuterRef('pk'), active=True), 'task'
+        ),
+        'active_dependents': _count_subquery(
+            TaskDependency.objects.filter(depends_on=OuterRef('pk'), active=True), 'depends_on'
+        ),
+    }
+
+
+class TaskQuerySet(models.QuerySet):
+    """Query helpers shared by every endpoint that returns tasks."""
+
+    def visible_to(self, user):
+        """Tasks the user owns or is assigned to."""
+        return self.filter(Q(owner=user) | Q(assigned_to=user))
+
+    def touch(self, counters=None):
+        """
+        Bump ``updated_at`` without loading the tasks or firing save signals.
+
+        ``counters`` maps task ids to ``{counter field: delta}``; the deltas are
+        applied with F() expressions in the same UPDATE, so concurrent writers
+        never overwrite each other's counts.
+        """
+        changes = {'updated_at': timezone.now()}
+        cases = defaultdict(list)
+        for task_id, deltas in (counters or {}).items():
+            for name, delta in deltas.items():
+                if delta:
+                    cases[name].append(When(pk=task_id, then=Value(delta)))
+        for name, whens in cases.items():
+            changes[name] = F(name) + Case(*whens, default=Value(0))
+        return self.update(**changes)
+
+    def with_related(self, owner=True, assigned_to=True, checklist=True):
+        """Join the owner/assignee and prefetch checklist items in one extra query."""
+        related = [name for name, wanted in (('owner', owner), ('assigned_to', assigned_to)) if wanted]
+        queryset = self.select_related(*related) if related else self
+        if checklist:
+            queryset = queryset.prefetch_related(
+                Prefetch('checklist_items', queryset=ChecklistItem.objects.all())
+            )
+        return queryset
+
+    def with_live_counts(self):
+        """
+        Annotate ``live_<counter>`` with each counter column recomputed from
+        the checklist and dependency tables, to check the stored values
+        against (see the repair_task_counters command).
+        """
+        return self.annotate(**{f'live_{name}': count for name, count in _live_counts().items()})
+
+    def recount(self):
+        """Overwrite the counter columns with freshly computed counts in one UPDATE."""
+        return self.update(updated_at=timezone.now(), **_live_counts())
+
+    def with_tags(self, names, match_all=False):
+        """
+        Tasks tagged with any (or, with ``match_all``, every one) of ``names``.
+        Matching is exact and case-insensitive and goes through the indexed
+        TaskTag table rather than the comma-separated ``tags`` text.
+        """
+        names = {normalize_tag(name) for name in names} - {''}
+        if not names:
+            return self
+        links = TaskTag.objects.filter(tag__name__in=names).values('task_id')
+        if match_all:
+            links = links.annotate(matched=Count('tag_id', distinct=True)).filter(matched=len(names))
+        return self.filter(pk__in=links.values('task_id'))
+
+    def upstream_of(self, task):
+        """Tasks that ``task`` transitively depends on through active dependencies."""
+        return self.filter(pk__in=DependencyPath.objects.filter(descendant=task).values('ancestor_id'))
+
+    def downstream_of(self, task):
+        """Tasks that transitively depend on ``task`` through active dependencies."""
+        return self.filter(pk__in=DependencyPath.objects.filter(ancestor=task).values('descendant_id'))
+
+    def for_serializer(self, fields=None):
+        """
+        Everything TaskSerializer reads, in a constant number of queries.
+
+        ``fields`` is the set of serializer fields that will be rendered (None
+        for all of them); relations outside it are not loaded.
+        """
+        def wants(name):
+            return fields is None or name in fields
+
+        return self.with_related(
+            owner=wants('owner_details'),
+            assigned_to=wants('assigned_to_details'),
+            checklist=wants('checklist_items'),
+        )
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('TODO', 'Todo'),
@@ -18,22 +143,80 @@ class Task(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also bumped when the task's checklist, comments or dependencies change
+    updated_at = models.DateTimeField(auto_now=True)
     due_date = models.DateTimeField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='TODO')
     priority = models.CharField(max_length=20, choices=PRIORITY_CHOICES, default='MEDIUM')
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_tasks')
-    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assigned_tasks')
+    # Indexed through the composite indexes in Meta, which lead with these columns
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='owned_tasks', db_index=False)
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assigned_tasks', db_index=False)
     
     # New fields
     tags = models.TextField(blank=True, null=True, help_text="Comma-separated tags")
     duration = models.FloatField(null=True, blank=True, help_text="Estimated duration in hours")
     
+    # Denormalized counters rendered by TaskSerializer. They are only ever
+    # changed with F() deltas by tasks.signals, in the same transaction as the
+    # checklist item or dependency write, and never saved from an instance.
+    checklist_total = models.IntegerField(default=0, editable=False)
+    checklist_completed = models.IntegerField(default=0, editable=False)
+    active_blockers = models.IntegerField(default=0, editable=False)
+    active_dependents = models.IntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('checklist_total', 'checklist_completed', 'active_blockers', 'active_dependents')
+    
+    tag_set = models.ManyToManyField('Tag', through='TaskTag', related_name='tasks', blank=True)
+    
+    objects = TaskQuerySet.as_manager()
+    
+    # Value of ``tags`` last mirrored into TaskTag rows
+    _synced_tags = None
+    # (owner_id, assigned_to_id) as stored, so a reassignment can invalidate
+    # the previous users' cached lists too (see tasks.signals)
+    _stored_users = ()
+    
     class Meta:
         ordering = ['-created_at']
+        # Every task query is "owner = u OR assigned_to = u"; SQLite answers it
+        # with one index per branch (MULTI-INDEX OR), so each index leads with
+        # the user column followed by the usual filter/sort columns.
+        indexes = [
+            models.Index(fields=['owner', '-created_at'], name='task_owner_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at'], name='task_assignee_created_idx'),
+            models.Index(fields=['owner', 'status', 'due_date'], name='task_owner_status_idx'),
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='task_assignee_status_idx'),
+            # Delta sync (see tasks.sync) asks for a user's tasks changed since a moment
+            models.Index(fields=['owner', 'updated_at'], name='task_owner_updated_idx'),
+            models.Index(fields=['assigned_to', 'updated_at'], name='task_assignee_updated_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._synced_tags = instance.__dict__.get('tags')
+        instance._stored_users = (instance.__dict__.get('owner_id'), instance.__dict__.get('assigned_to_id'))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            # The in-memory counters may be stale; leave the stored ones alone
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        tags_changed = (self.tags or '') != (self._synced_tags or '')
+        if tags_changed and (update_fields is None or 'tags' in update_fields):
+            Tag.objects.sync_tasks([self])
+    
+    def is_visible_to(self, user):
+        """Return True if the user owns or is assigned to this task."""
+        return user.id in (self.owner_id, self.assigned_to_id)
+    
     def get_tags_list(self):
         """Return tags as a list."""
         if not self.tags:
@@ -65,6 +248,10 @@ class TaskComment(models.Model):
 
 class ChecklistItem(models.Model):
     """Model for checklist items within a task."""
+    # Positions are spaced this far apart, so an item can be moved between two
+    # others by writing only its own row (see ChecklistItemViewSet.move)
+    POSITION_GAP = 1024
+    
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='checklist_items')
     text = models.CharField(max_length=255)
     is_completed = models.BooleanField(default=False)
@@ -72,12 +259,31 @@ class ChecklistItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # task_counters() as last stored, see tasks.signals.counter_deltas
+    _stored_counters = {}
+    
     class Meta:
         ordering = ['position', 'created_at']
         
     def __str__(self):
         status = "✓" if self.is_completed else "○"
         return f"{status} {self.text} ({self.task.title})"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = 'task_id' in instance.__dict__ and 'is_completed' in instance.__dict__
+        instance._stored_counters = instance.task_counters() if loaded else None
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # The post_save receiver updating the task counters joins this transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+    
+    def task_counters(self):
+        """What this item adds to the Task counter columns, as ``{task_id: {field: n}}``."""
+        return {self.task_id: {'checklist_total': 1, 'checklist_completed': int(self.is_completed)}}
 
 
 class TaskDependency(models.Model):
@@ -90,10 +296,16 @@ class TaskDependency(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependencies')
     depends_on = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependent_tasks')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_dependencies')
     notes = models.TextField(blank=True, null=True, help_text="Optional notes about this dependency")
     active = models.BooleanField(default=True, help_text="Whether this dependency is active")
     
+    # task_counters() as last stored, see tasks.signals.counter_deltas
+    _stored_counters = {}
+    # closure_edge() as last stored, see tasks.signals.update_closure
+    _stored_edge = ()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "Task Dependencies"
@@ -103,6 +315,26 @@ class TaskDependency(models.Model):
     def __str__(self):
         return f"{self.task.title} → depends on → {self.depends_on.title}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = all(name in instance.__dict__ for name in ('task_id', 'depends_on_id', 'active'))
+        instance._stored_counters = instance.task_counters() if loaded else None
+        instance._stored_edge = instance.closure_edge() if loaded else None
+        return instance
+    
+    @staticmethod
+    def creates_cycle(task, depends_on):
+        """
+        Whether making ``task`` depend on ``depends_on`` would close a cycle of
+        active dependencies, i.e. ``depends_on`` already depends on ``task``.
+        """
+        task_id = getattr(task, 'pk', task)
+        depends_on_id = getattr(depends_on, 'pk', depends_on)
+        if task_id == depends_on_id:
+            return True
+        return DependencyPath.objects.filter(ancestor_id=task_id, descendant_id=depends_on_id).exists()
+    
     def clean(self):
         """Validate that a task cannot depend on itself."""
         if self.task == self.depends_on:
@@ -110,4 +342,156 @@ class TaskDependency(models.Model):
     
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        # The post_save receiver updating the task counters joins this transaction
+        with transaction.atomic(using=kwargs.get('using'), savepoint=False):
+            super().save(*args, **kwargs)
+    
+    def task_counters(self):
+        """What this dependency adds to the Task counter columns, as ``{task_id: {field: n}}``."""
+        if not self.active:
+            return {}
+        return {self.task_id: {'active_blockers': 1}, self.depends_on_id: {'active_dependents': 1}}
+    
+    def closure_edge(self):
+        """This dependency as a ``(blocker id, task id)`` edge of the closure; empty when inactive."""
+        return (self.depends_on_id, self.task_id) if self.active else ()
+
+
+class DependencyPath(models.Model):
+    """
+    One row of the transitive closure of active dependencies (see
+    tasks.closure): ``descendant`` depends on ``ancestor``, directly or
+    through other tasks. Only ever written by tasks.signals, in the same
+    transaction as the TaskDependency change.
+    """
+    # No database constraint or cascade: deleting a task removes its
+    # dependencies one by one, and each of those removes its own paths
+    ancestor = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    descendant = models.ForeignKey(
+        Task, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    
+    class Meta:
+        # The unique index answers cycle checks and downstream lookups
+        unique_together = ['ancestor', 'descendant']
+        indexes = [
+            models.Index(fields=['descendant', 'ancestor'], name='dependencypath_descendant_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.descendant_id} → {self.ancestor_id}"
+
+
+class TagQuerySet(models.QuerySet):
+    def sync_tasks(self, tasks):
+        """
+        Mirror each task's comma-separated ``tags`` into TaskTag rows, in a
+        fixed number of queries regardless of how many tasks are passed.
+        """
+        wanted = {
+            task.pk: {normalize_tag(name) for name in task.get_tags_list()} - {''}
+            for task in tasks
+        }
+        names = set().union(*wanted.values())
+        if names:
+            self.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        tag_ids = dict(self.filter(name__in=names).values_list('name', 'id')) if names else {}
+        
+        existing = set(TaskTag.objects.filter(task_id__in=wanted).values_list('task_id', 'tag_id'))
+        desired = {(task_id, tag_ids[name]) for task_id, task_names in wanted.items() for name in task_names}
+        
+        stale = existing - desired
+        if stale:
+            stale_filter = Q()
+            for task_id, tag_id in stale:
+                stale_filter |= Q(task_id=task_id, tag_id=tag_id)
+            TaskTag.objects.filter(stale_filter).delete()
+        TaskTag.objects.bulk_create([TaskTag(task_id=task_id, tag_id=tag_id) for task_id, tag_id in desired - existing])
+        
+        for task in tasks:
+            task._synced_tags = task.tags
+
+
+class Tag(models.Model):
+    """A normalized (stripped, lower-cased) tag name shared between tasks."""
+    name = models.CharField(max_length=100, unique=True)
+    
+    objects = TagQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class TaskTag(models.Model):
+    """Through table linking tasks to their normalized tags."""
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='task_links')
+    
+    class Meta:
+        # The unique index leads with tag so tag filters are index lookups
+        unique_together = ['tag', 'task']
+    
+    def __str__(self):
+        return f"{self.task_id} → {self.tag.name}"
+
+
+class TombstoneQuerySet(models.QuerySet):
+    def record(self, kind, object_ids, user_ids):
+        """Record that each of ``user_ids`` lost sight of the ``kind`` rows ``object_ids``."""
+        now = timezone.now()
+        return self.bulk_create([
+            Tombstone(kind=kind, object_id=object_id, user_id=user_id, deleted_at=now)
+            for object_id in object_ids
+            for user_id in set(user_ids) - {None}
+        ])
+    
+    def record_hidden_tasks(self, task_ids, user_ids):
+        """
+        Record that ``user_ids`` lost sight of the tasks ``task_ids``, and with
+        them of every dependency on either end of those tasks.
+        """
+        dependency_ids = TaskDependency.objects.filter(
+            Q(task__in=task_ids) | Q(depends_on__in=task_ids)
+        ).values_list('pk', flat=True)
+        return self.record(Tombstone.TASK, task_ids, user_ids) + self.record(
+            Tombstone.DEPENDENCY, list(dependency_ids), user_ids
+        )
+
+
+class Tombstone(models.Model):
+    """
+    A row a user could see that was deleted (or, for tasks, stopped being
+    visible to them), kept so delta sync can tell clients to drop it.
+    Written by tasks.signals; old ones are removed by prune_tombstones.
+    """
+    TASK = 'task'
+    CHECKLIST_ITEM = 'checklist_item'
+    DEPENDENCY = 'dependency'
+    KIND_CHOICES = [
+        (TASK, 'Task'),
+        (CHECKLIST_ITEM, 'Checklist item'),
+        (DEPENDENCY, 'Dependency'),
+    ]
+    
+    # No database constraint, so tombstones can still be written while the
+    # user is being deleted; they age out like any other
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    objects = TombstoneQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.object_id} (deleted {self.deleted_at:%Y-%m-%d %H:%M})"
@@ -0,0 +1,178 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination.
+
+    Responses stay plain lists unless the client sends ``page_size`` or
+    ``cursor``. Pages are cut on the queryset's ordering (e.g. the default
+    ``-created_at``, or whatever ``?ordering=`` selected) with the primary key
+    appended as a tie-breaker, so a cursor is an exact position that stays
+    valid while rows are inserted or deleted ahead of it.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        """Whether ``request`` asks for a page rather than the plain list."""
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        params = request.query_params
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        queryset = queryset.order_by(*[self.order_expression(field) for field in self.ordering])
+        encoded = params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.after_position(self.decode_cursor(encoded)))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = self.position_of(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """
+        The ordering already applied to the queryset (by OrderingFilter or the
+        model's Meta), with the primary key appended as a unique tie-breaker.
+        """
+        ordering = [
+            field for field in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(field, str) and field.lstrip('-') not in ('pk', 'id')
+        ]
+        descending = bool(ordering) and ordering[0].startswith('-')
+        return ordering + ['-id' if descending else 'id']
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    @staticmethod
+    def order_expression(field):
+        # Pin NULL placement so the cursor comparison below is unambiguous.
+        if field.startswith('-'):
+            return F(field[1:]).desc(nulls_last=True)
+        return F(field).asc(nulls_first=True)
+
+    def position_of(self, row):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            values.append(row[name] if isinstance(row, dict) else getattr(row, name))
+        return values
+
+    def after_position(self, values):
+        """
+        Build ``(f1, f2, ...) > (v1, v2, ...)`` in the page ordering, spelled
+        out as nested OR/AND terms because SQLite can't compare row values
+        with mixed directions.
+        """
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            if field.startswith('-'):
+                # Descending, NULLs last: anything smaller, then the NULLs.
+                after = Q(pk__in=[]) if value is None else Q(**{f'{name}__lt': value}) | Q(**{f'{name}__isnull': True})
+            else:
+                # Ascending, NULLs first: everything non-NULL follows a NULL.
+                after = Q(**{f'{name}__isnull': False}) if value is None else Q(**{f'{name}__gt': value})
+            condition |= equal_prefix & after
+            equal_prefix &= Q(**{f'{name}__isnull': True}) if value is None else Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, values):
+        payload = {
+            'o': self.ordering,
+            'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, encoded):
+        """Decode a cursor, rejecting ones minted for a different ordering."""
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            if payload['o'] != self.ordering or len(payload['v']) != len(self.ordering):
+                raise ValueError
+            return [
+                None if value is None else self.to_python(field, value)
+                for field, value in zip(self.ordering, payload['v'])
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def to_python(self, field, value):
+        try:
+            model_field = self.model._meta.get_field(field.lstrip('-'))
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are plain JSON numbers/strings
+            return value
+        return model_field.to_python(value)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+        ]
@@ -0,0 +1,171 @@
+"""
+Full-text search over tasks backed by an SQLite FTS5 index.
+
+The ``tasks_task_fts`` virtual table (created in migration 0007) holds one row
+per task, keyed by the task id, with its title, description, tags and the
+concatenated content of its comments. Triggers on ``tasks_task`` and
+``tasks_taskcomment`` keep it in sync, including for bulk writes that bypass
+model signals. On other database backends search falls back to DRF's
+``SearchFilter``.
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models import FloatField, TextField
+from django.utils.html import escape
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+from .cache import invalidate_all
+
+FTS_TABLE = 'tasks_task_fts'
+
+# Columns searched unless comments are requested with ?search_comments=1
+TASK_COLUMNS = ('title', 'description', 'tags')
+
+# bm25() weights for title, description, tags and comments
+COLUMN_WEIGHTS = (10.0, 1.0, 5.0, 0.5)
+
+# snippet() wraps the hits in these; render_snippet() turns them into <mark>
+# once the task text around them is escaped
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+REBUILD_SQL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+    SELECT t.id, t.title, t.description, coalesce(t.tags, ''),
+           coalesce((SELECT group_concat(c.content, ' ') FROM tasks_taskcomment c WHERE c.task_id = t.id), '')
+    FROM tasks_task t
+"""
+
+# SQLite drops a table's triggers when a migration rebuilds it (e.g. to alter
+# a column), so the tasks_task triggers from migration 0007 are re-created
+# idempotently after every migrate (see TasksConfig.ready).
+TASK_TRIGGER_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, description, tags, comments)
+        VALUES (new.id, new.title, new.description, coalesce(new.tags, ''), '');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_update AFTER UPDATE OF title, description, tags ON tasks_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description OR old.tags IS NOT new.tags
+    BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title, description = new.description, tags = coalesce(new.tags, '')
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+]
+
+
+_available = {}
+
+
+def fts_available(using=connection):
+    """Return True when the FTS index exists on this database (checked once per database)."""
+    key = (using.alias, str(using.settings_dict['NAME']))
+    if key not in _available:
+        _available[key] = using.vendor == 'sqlite' and FTS_TABLE in using.introspection.table_names()
+    return _available[key]
+
+
+def install_task_triggers(using=connection):
+    """Re-create any missing tasks_task triggers that keep the index in sync."""
+    if using.vendor != 'sqlite' or FTS_TABLE not in using.introspection.table_names():
+        return
+    with using.cursor() as cursor:
+        for statement in TASK_TRIGGER_SQL:
+            cursor.execute(statement)
+
+
+def rebuild_index(using=connection):
+    """Drop every indexed row and re-index all tasks and comments."""
+    with using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(REBUILD_SQL)
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        count = cursor.fetchone()[0]
+    # Cached search results may predate the rebuild
+    invalidate_all()
+    return count
+
+
+def build_match_query(terms, include_comments=False):
+    """
+    Turn user search terms into an FTS5 MATCH expression.
+
+    Every term becomes a quoted prefix query (``"term"*``) so that operators
+    and punctuation in user input are never interpreted, and all terms must
+    match. Returns None if no term contains anything searchable.
+    """
+    phrases = []
+    for term in terms:
+        if not any(char.isalnum() for char in term):
+            continue
+        phrases.append('"%s"*' % term.replace('"', '""'))
+    if not phrases:
+        return None
+    query = ' '.join(phrases)
+    if include_comments:
+        return query
+    return '{%s} : (%s)' % (' '.join(TASK_COLUMNS), query)
+
+
+def render_snippet(snippet):
+    """
+    A ``search_snippet`` annotation as HTML: the task text escaped, and only
+    the hits wrapped in ``<mark>``, so it can be inserted into a page as is.
+    """
+    if snippet is None:
+        return None
+    return escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text ``?search=`` for TaskViewSet.
+
+    Matching tasks are annotated with ``search_rank`` (bm25, lower is better)
+    and ``search_snippet`` (the best matching fragment, with the hits between
+    SNIPPET_START and SNIPPET_END; see render_snippet()). Unless the client picked an ``?ordering=``, results come back
+    best match first, so this backend must run after OrderingFilter.
+    """
+    comments_param = 'search_comments'
+    snippet_start = SNIPPET_START
+    snippet_end = SNIPPET_END
+    snippet_tokens = 12
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if not fts_available():
+            return super().filter_queryset(request, queryset, view)
+
+        include_comments = request.query_params.get(self.comments_param) in ('1', 'true', 'True')
+        match = build_match_query(terms, include_comments)
+        if match is None:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        correlated = f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id'
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(f'SELECT bm25({FTS_TABLE}, {weights}) {correlated}', [match], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f'SELECT snippet({FTS_TABLE}, -1, %s, %s, %s, %s) {correlated}',
+                [self.snippet_start, self.snippet_end, '…', self.snippet_tokens, match],
+                output_field=TextField(),
+            ),
+        )
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('search_rank', '-created_at')
+        return queryset
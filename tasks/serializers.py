@@ -7,6 +7,26 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email']
 
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that resolves ids from ``context['prefetched']``
+    (a ``{model: {pk: instance}}`` map) when given, so validating a batch of
+    payloads doesn't query once per item. Falls back to the queryset otherwise.
+    """
+    def to_internal_value(self, data):
+        objects = self.context.get('prefetched', {}).get(self.get_queryset().model)
+        if objects is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            instance = objects.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
 class ChecklistItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChecklistItem
@@ -14,6 +34,11 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 class TaskSerializer(serializers.ModelSerializer):
+    # Nested relations left out of sparse responses unless asked for with ?expand=
+    EXPANDABLE_FIELDS = ('owner_details', 'assigned_to_details', 'checklist_items')
+    # owner/assigned_to can be resolved from a batch lookup, see tasks.bulk
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     owner_details = UserSerializer(source='owner', read_only=True)
     assigned_to_details = UserSerializer(source='assigned_to', read_only=True)
     tags_list = serializers.ListField(
@@ -36,28 +61,34 @@ class TaskSerializer(serializers.ModelSerializer):
                  'blocked_by_count', 'blocks_count']
         read_only_fields = ['created_at']
     
+    def __init__(self, *args, **kwargs):
+        # Optional subset of fields to render, see TaskViewSet.get_requested_fields
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+    
     def get_checklist_completion(self, obj):
         """Calculate the completion percentage of checklist items."""
-        items = obj.checklist_items.all()
-        if not items:
+        if not obj.checklist_total:
             return 0
-        completed = items.filter(is_completed=True).count()
-        return int((completed / items.count()) * 100)
+        return int((obj.checklist_completed / obj.checklist_total) * 100)
     
     def get_blocked_by_count(self, obj):
         """Get the count of tasks that this task depends on."""
-        return obj.dependencies.filter(active=True).count()
+        return obj.active_blockers
     
     def get_blocks_count(self, obj):
         """Get the count of tasks that depend on this task."""
-        return obj.dependent_tasks.filter(active=True).count()
+        return obj.active_dependents
         
     def create(self, validated_data):
         tags_list = validated_data.pop('get_tags_list', None)
-        task = Task.objects.create(**validated_data)
+        task = Task(**validated_data)
         if tags_list:
             task.set_tags_list(tags_list)
-            task.save()
+        task.save()
         return task
     
     def update(self, instance, validated_data):
@@ -103,9 +134,9 @@ class TaskDependencySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TaskDependency
-        fields = ['id', 'task', 'depends_on', 'created_at', 'created_by', 'notes', 'active',
+        fields = ['id', 'task', 'depends_on', 'created_at', 'updated_at', 'created_by', 'notes', 'active',
                  'task_details', 'depends_on_details', 'created_by_details']
-        read_only_fields = ['created_at', 'created_by']
+        read_only_fields = ['created_at', 'updated_at', 'created_by']
     
     def validate(self, data):
         """
@@ -120,27 +151,9 @@ class TaskDependencySerializer(serializers.ModelSerializer):
         if task == depends_on:
             raise serializers.ValidationError("A task cannot depend on itself")
         
-        # Check for circular dependencies
-        # If depends_on depends on task (directly or indirectly), it would create a cycle
-        def has_circular_dependency(check_task, target_task, visited=None):
-            if visited is None:
-                visited = set()
-            
-            if check_task.id in visited:
-                return False
-            
-            visited.add(check_task.id)
-            
-            # Check if any of the dependencies of check_task is the target_task
-            for dependency in check_task.dependencies.filter(active=True):
-                if dependency.depends_on == target_task:
-                    return True
-                if has_circular_dependency(dependency.depends_on, target_task, visited):
-                    return True
-            
-            return False
-        
-        if depends_on and has_circular_dependency(depends_on, task):
+        # If depends_on already depends on task (directly or indirectly), it
+        # would create a cycle; the dependency closure answers that in one lookup
+        if task and depends_on and TaskDependency.creates_cycle(task, depends_on):
             raise serializers.ValidationError("This would create a circular dependency chain")
         
         return data 
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+Model signal receivers for the tasks app, connected in TasksConfig.ready().
+
+Changes below a task (checklist items, comments, dependencies) bump the
+task's ``updated_at``, so a task's timestamp covers everything rendered with
+it and can drive conditional GETs. The same UPDATE applies the change to the
+task's denormalized checklist and dependency counters. Every change also
+bumps the cache generation (see tasks.cache) of the users who can see the
+affected tasks. Dependency changes also update the transitive closure (see
+tasks.closure) in the same transaction, and deletions leave tombstones for
+delta sync (see tasks.sync). Once committed, every change is published to
+the live event streams of those users (see tasks.events).
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_generations, reset_generation
+from .closure import add_edge, remove_edge
+from .events import publish_change
+from .models import ChecklistItem, Task, TaskComment, TaskDependency, Tombstone
+
+EVENT_NAMES = {
+    Task: 'task',
+    ChecklistItem: 'checklist_item',
+    TaskComment: 'comment',
+    TaskDependency: 'dependency',
+}
+
+
+def task_users(instance, *fields, task_ids=()):
+    """
+    Owner and assignee ids of the tasks ``instance`` points at through
+    ``fields``, plus those of any other ``task_ids``.
+    """
+    user_ids = set()
+    missing = set(task_ids)
+    for name in fields:
+        field = instance._meta.get_field(name)
+        if field.is_cached(instance):
+            task = getattr(instance, name)
+            user_ids.update((task.owner_id, task.assigned_to_id))
+            missing.discard(task.pk)
+        else:
+            missing.add(getattr(instance, field.attname))
+    if missing:
+        for users in Task.objects.filter(pk__in=missing).values_list('owner_id', 'assigned_to_id'):
+            user_ids.update(users)
+    return user_ids
+
+
+def counter_deltas(instance, deleted=False):
+    """
+    Changes to the Task counter columns caused by saving (or deleting)
+    ``instance``, as ``{task_id: {field: delta}}``, from what its
+    ``task_counters()`` were when last stored.
+    """
+    before = instance._stored_counters
+    if before is None:
+        # Loaded with deferred fields, which therefore weren't changed
+        before = instance.task_counters()
+    after = {} if deleted else instance.task_counters()
+    instance._stored_counters = after
+    
+    deltas = {}
+    for task_id in before.keys() | after.keys():
+        old, new = before.get(task_id, {}), after.get(task_id, {})
+        changes = {name: new.get(name, 0) - old.get(name, 0) for name in old.keys() | new.keys()}
+        changes = {name: delta for name, delta in changes.items() if delta}
+        if changes:
+            deltas[task_id] = changes
+    return deltas
+
+
+def update_closure(instance, deleted=False):
+    """Move ``instance``'s edge in the dependency closure from where it was last stored."""
+    before = instance._stored_edge
+    if before is None:
+        # Loaded with deferred fields, which therefore weren't changed
+        before = instance.closure_edge()
+    after = () if deleted else instance.closure_edge()
+    instance._stored_edge = after
+    if before == after:
+        return
+    if before:
+        remove_edge(*before)
+    if after:
+        add_edge(*after)
+
+
+def apply_counters(instance, deltas, *fields):
+    """Apply ``deltas`` to the tasks cached on ``instance``, so it renders fresh counts."""
+    for name in fields:
+        if instance._meta.get_field(name).is_cached(instance):
+            task = getattr(instance, name)
+            for counter, delta in deltas.get(task.pk, {}).items():
+                setattr(task, counter, getattr(task, counter) + delta)
+
+
+def tasks_changed(tasks):
+    """
+    Touch and invalidate the given Task instances after writes that bypass
+    model signals, such as bulk_update() on their checklist items.
+    """
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).touch()
+    bump_generations({user_id for task in tasks for user_id in (task.owner_id, task.assigned_to_id)})
+    for task in tasks:
+        publish_change('task.updated', task.pk, task.pk, (task.owner_id, task.assigned_to_id))
+
+
+def change_type(sender, signal, created=False):
+    """Event type such as ``"checklist_item.created"`` for a save or delete signal."""
+    action = 'deleted' if signal is post_delete else 'created' if created else 'updated'
+    return f'{EVENT_NAMES[sender]}.{action}'
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_users(sender, instance, signal, created=False, **kwargs):
+    current = (instance.owner_id, instance.assigned_to_id)
+    bump_generations({*current, *instance._stored_users})
+    # Users who could see the task and no longer can must drop it
+    if signal is post_delete:
+        lost = {*current, *instance._stored_users}
+    else:
+        lost = set(instance._stored_users) - set(current)
+        publish_change(change_type(sender, signal, created), instance.pk, instance.pk, current)
+    if lost:
+        Tombstone.objects.record_hidden_tasks([instance.pk], lost)
+        publish_change('task.deleted', instance.pk, instance.pk, lost)
+    instance._stored_users = current
+
+
+@receiver(post_save, sender=ChecklistItem)
+@receiver(post_delete, sender=ChecklistItem)
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+def touch_parent_task(sender, instance, signal, origin=None, created=False, **kwargs):
+    if isinstance(origin, Task) or getattr(origin, 'model', None) is Task:
+        # Cascading from the task's own deletion, which invalidates on its own
+        return
+    counters = counter_deltas(instance, signal is post_delete) if sender is ChecklistItem else {}
+    # An item moved to another task changes the counters of both
+    Task.objects.filter(pk__in={instance.task_id, *counters}).touch(counters)
+    apply_counters(instance, counters, 'task')
+    user_ids = task_users(instance, 'task', task_ids=counters)
+    bump_generations(user_ids)
+    if sender is ChecklistItem and signal is post_delete:
+        Tombstone.objects.record(Tombstone.CHECKLIST_ITEM, [instance.pk], user_ids)
+    publish_change(change_type(sender, signal, created), instance.task_id, instance.pk, user_ids)
+
+
+@receiver(post_save, sender=TaskDependency)
+@receiver(post_delete, sender=TaskDependency)
+def touch_dependency_tasks(sender, instance, signal, created=False, **kwargs):
+    # Both ends count this dependency (blocked_by / blocks). Unlike checklist
+    # items, it still runs when cascading from one end's deletion, since the
+    # other end's counter has to go down.
+    counters = counter_deltas(instance, signal is post_delete)
+    update_closure(instance, signal is post_delete)
+    Task.objects.filter(pk__in={instance.task_id, instance.depends_on_id, *counters}).touch(counters)
+    apply_counters(instance, counters, 'task', 'depends_on')
+    user_ids = task_users(instance, 'task', 'depends_on', task_ids=counters)
+    bump_generations(user_ids)
+    if signal is post_delete:
+        Tombstone.objects.record(Tombstone.DEPENDENCY, [instance.pk], user_ids)
+    publish_change(change_type(sender, signal, created), instance.task_id, instance.pk, user_ids)
+
+
+@receiver(post_save, sender=User)
+def start_user_generation(sender, instance, created, **kwargs):
+    if created:
+        reset_generation(instance.pk)
@@ -0,0 +1,80 @@
+"""
+Dashboard aggregates behind ``GET /api/tasks/stats/``.
+
+Everything but the tag counts comes from a single GROUP BY over the
+requested tasks, one group per assignee, with the per-status and
+per-priority counts, overdue tasks and hours computed by conditional
+aggregation (``COUNT(...) FILTER (WHERE ...)``). The overall figures are the
+sums of the assignee groups. Tag counts need the TaskTag join, so they take
+a second grouped query.
+"""
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Task, TaskTag
+
+STATUSES = [value for value, _ in Task.STATUS_CHOICES]
+PRIORITIES = [value for value, _ in Task.PRIORITY_CHOICES]
+
+OPEN = ~Q(status='DONE')
+
+
+def _aggregates(now):
+    aggregates = {'total': Count('pk')}
+    for value in STATUSES:
+        aggregates[f'status_{value}'] = Count('pk', filter=Q(status=value))
+    for value in PRIORITIES:
+        aggregates[f'priority_{value}'] = Count('pk', filter=Q(priority=value))
+    aggregates['overdue'] = Count('pk', filter=OPEN & Q(due_date__lt=now))
+    aggregates['estimated_hours'] = Sum('duration')
+    aggregates['remaining_hours'] = Sum('duration', filter=OPEN)
+    return aggregates
+
+
+def _summary(row):
+    """The counts and hours of one group (or of the sum of all groups)."""
+    return {
+        'total': row['total'],
+        'by_status': {value: row[f'status_{value}'] for value in STATUSES},
+        'by_priority': {value: row[f'priority_{value}'] for value in PRIORITIES},
+        'overdue': row['overdue'],
+        'estimated_hours': round(row['estimated_hours'] or 0.0, 6),
+        'remaining_hours': round(row['remaining_hours'] or 0.0, 6),
+    }
+
+
+def task_stats(queryset, now=None):
+    """
+    Counts per status and priority, overdue tasks, estimated and remaining
+    hours, per-assignee workload and tag counts for the tasks in
+    ``queryset``. Tasks without a duration count as zero hours.
+    """
+    now = now or timezone.now()
+    groups = list(
+        queryset.order_by()
+        .values('assigned_to', 'assigned_to__username')
+        .annotate(**_aggregates(now))
+    )
+
+    keys = ['total', 'overdue', 'estimated_hours', 'remaining_hours']
+    keys += [f'status_{value}' for value in STATUSES] + [f'priority_{value}' for value in PRIORITIES]
+    totals = {key: sum(group[key] or 0 for group in groups) for key in keys}
+
+    workload = [
+        {'user': {'id': group['assigned_to'], 'username': group['assigned_to__username']}, **_summary(group)}
+        for group in groups
+    ]
+    # Busiest first
+    workload.sort(key=lambda entry: (-entry['remaining_hours'], -entry['total'], entry['user']['username']))
+
+    tags = (
+        TaskTag.objects.filter(task__in=queryset.order_by().values('pk'))
+        .values('tag__name')
+        .annotate(count=Count('task_id'))
+        .order_by('-count', 'tag__name')
+    )
+    return {
+        **_summary(totals),
+        'workload': workload,
+        'tags': [{'name': row['tag__name'], 'count': row['count']} for row in tags],
+    }
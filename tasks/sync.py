@@ -0,0 +1,131 @@
+"""
+Delta sync behind ``GET /api/sync/``.
+
+A client keeps a local copy of its tasks, checklist items and dependencies
+and polls with the opaque token returned by its previous sync. The response
+only holds what changed since then: tasks whose ``updated_at`` moved, and the
+checklist items and dependencies of those tasks (every child write touches
+its task, see tasks.signals), plus the ids of rows deleted or no longer
+visible, read from the Tombstone table. Dependencies are only sent when both
+of their tasks are visible; a task going out of view tombstones its
+dependencies too.
+
+Tokens are signed server timestamps. Since a transaction can commit rows
+stamped slightly before a token was issued, each sync looks back
+``TASK_SYNC_OVERLAP`` seconds before the token; clients apply the response as
+upserts, so rows seen twice are harmless. Tokens older than
+``TASK_SYNC_RETENTION_DAYS`` may have outlived the tombstones they need and
+are refused, and the client starts over with a full sync.
+"""
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from .fast_serializers import render_checklist_rows, render_dependency_rows, render_task_rows, task_rows
+from .models import Task, TaskDependency, Tombstone
+from .serializers import TaskSerializer
+
+TOKEN_SALT = 'tasks.sync'
+
+# Checklist items travel on their own, not nested in each task
+TASK_FIELDS = frozenset(
+    name for name, field in TaskSerializer().fields.items()
+    if not field.write_only and name != 'checklist_items'
+)
+
+DELETED_KEYS = {
+    Tombstone.TASK: 'tasks',
+    Tombstone.CHECKLIST_ITEM: 'checklist_items',
+    Tombstone.DEPENDENCY: 'dependencies',
+}
+
+
+class InvalidToken(Exception):
+    """The sync token was tampered with or isn't one of ours."""
+
+
+class ExpiredToken(Exception):
+    """The sync token is older than the tombstone retention period."""
+
+
+def get_overlap():
+    return datetime.timedelta(seconds=getattr(settings, 'TASK_SYNC_OVERLAP', 5))
+
+
+def get_retention():
+    return datetime.timedelta(days=getattr(settings, 'TASK_SYNC_RETENTION_DAYS', 30))
+
+
+def make_token(moment):
+    """Opaque token for a sync that saw every change up to ``moment``."""
+    return signing.dumps(int(moment.timestamp() * 1_000_000), salt=TOKEN_SALT)
+
+
+def read_token(token, now=None):
+    """Return the moment encoded in ``token``, raising InvalidToken or ExpiredToken."""
+    try:
+        microseconds = signing.loads(token, salt=TOKEN_SALT)
+        moment = datetime.datetime.fromtimestamp(microseconds / 1_000_000, tz=datetime.timezone.utc)
+    except (signing.BadSignature, TypeError, ValueError, OverflowError):
+        raise InvalidToken(token)
+    if moment < (now or timezone.now()) - get_retention():
+        raise ExpiredToken(token)
+    return moment
+
+
+def sync_changes(user, token=None):
+    """
+    Everything ``user`` needs to bring a local store up to date from
+    ``token`` (None for a full sync), with the token for the next call.
+    """
+    now = timezone.now()
+    since = None if token is None else read_token(token, now) - get_overlap()
+
+    tasks = Task.objects.visible_to(user).order_by('pk')
+    if since is not None:
+        tasks = tasks.filter(updated_at__gt=since)
+    rendered_tasks = render_task_rows(task_rows(tasks, TASK_FIELDS), TASK_FIELDS)
+    task_ids = [task['id'] for task in rendered_tasks]
+
+    checklists = render_checklist_rows(task_ids)
+    # Like the graph, only dependencies with both ends visible to the user
+    visible_ids = Task.objects.visible_to(user).values('pk')
+    dependencies = TaskDependency.objects.filter(
+        Q(task__in=tasks.values('pk')) | Q(depends_on__in=tasks.values('pk')),
+        task__in=visible_ids, depends_on__in=visible_ids,
+    ).order_by('pk')
+    rendered_dependencies = render_dependency_rows(dependencies)
+
+    deleted = {key: [] for key in DELETED_KEYS.values()}
+    if since is not None:
+        tombstones = Tombstone.objects.filter(user=user, deleted_at__gt=since).order_by('pk')
+        # Rows that came back into view since are sent instead
+        returned = {
+            Tombstone.TASK: set(task_ids),
+            Tombstone.DEPENDENCY: {dependency['id'] for dependency in rendered_dependencies},
+        }
+        seen = set()
+        for kind, object_id in tombstones.values_list('kind', 'object_id'):
+            if (kind, object_id) in seen or object_id in returned.get(kind, ()):
+                continue
+            seen.add((kind, object_id))
+            deleted[DELETED_KEYS[kind]].append(object_id)
+
+    return {
+        'token': make_token(now),
+        'full': since is None,
+        'tasks': rendered_tasks,
+        'checklist_items': [item for task_id in task_ids for item in checklists[task_id]],
+        'dependencies': rendered_dependencies,
+        'deleted': deleted,
+    }
+
+
+def prune_tombstones(now=None):
+    """Delete the tombstones no valid token can need any more; returns how many."""
+    cutoff = (now or timezone.now()) - get_retention() - get_overlap()
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,123 @@
+import datetime
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from tasks.models import Task, TaskComment, ChecklistItem, TaskDependency
+from tasks.views import TaskViewSet, ChecklistItemViewSet
+
+
+class AsyncReadPathTest(TestCase):
+    """ASGI requests to the hot read endpoints go through the async handlers and match WSGI."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='12345', email='reader@example.com')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.first = cls.make_task('Design', cls.user, priority='HIGH', tags='backend')
+        cls.second = cls.make_task('Build', cls.user)
+        cls.third = cls.make_task('Ship', cls.other, assigned_to=cls.user)
+        cls.hidden = cls.make_task('Hidden', cls.other)
+        for position, text in enumerate(['Sketch', 'Review'], start=1):
+            ChecklistItem.objects.create(task=cls.first, text=text, position=position)
+        TaskComment.objects.create(task=cls.first, author=cls.user, content='Looks good')
+        TaskComment.objects.create(task=cls.first, author=cls.other, content='Agreed')
+        TaskDependency.objects.create(task=cls.second, depends_on=cls.first, created_by=cls.user)
+        TaskDependency.objects.create(task=cls.third, depends_on=cls.second, created_by=cls.user)
+        TaskDependency.objects.create(task=cls.hidden, depends_on=cls.first, created_by=cls.other)
+
+    @classmethod
+    def make_task(cls, title, owner, assigned_to=None, **fields):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=owner,
+            assigned_to=assigned_to or owner,
+            duration=2.5,
+            **fields,
+        )
+
+    def setUp(self):
+        self.authorization = f'Bearer {AccessToken.for_user(self.user)}'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    async def assertSameResponse(self, url, query=None):
+        await sync_to_async(cache.clear)()
+        expected = await sync_to_async(self.client.get)(url, query)
+        await sync_to_async(cache.clear)()
+        response = await self.async_client.get(url, query, headers={'Authorization': self.authorization})
+        self.assertEqual(response.status_code, expected.status_code, url)
+        self.assertEqual(response.content, expected.content, url)
+        self.assertEqual(response.get('ETag'), expected.get('ETag'), url)
+        return response
+
+    async def test_responses_match_the_sync_path(self):
+        cases = [
+            (reverse('task-list'), None),
+            (reverse('task-list'), {'status': 'TODO', 'ordering': 'due_date'}),
+            (reverse('task-list'), {'owner': self.other.pk}),
+            (reverse('task-list'), {'tag': 'backend'}),
+            (reverse('task-list'), {'fields': 'id,title', 'expand': 'checklist_items'}),
+            (reverse('task-list'), {'page_size': 2}),
+            (reverse('task-detail', args=[self.first.pk]), None),
+            (reverse('task-detail', args=[self.first.pk]), {'fields': 'id,status'}),
+            (reverse('task-detail', args=[self.hidden.pk]), None),
+            (reverse('task-blockers', args=[self.second.pk]), None),
+            (reverse('task-blockers', args=[self.third.pk]), {'depth': 'all'}),
+            (reverse('task-blocked', args=[self.first.pk]), None),
+            (reverse('task-blocked', args=[self.first.pk]), {'depth': 1}),
+            (reverse('task-blocked', args=[self.first.pk]), {'depth': 'none'}),
+            (reverse('task-blocked', args=[self.hidden.pk]), None),
+            (reverse('task-comment-list', args=[self.first.pk]), None),
+            (reverse('task-comment-list', args=[self.first.pk]), {'page_size': 1}),
+            (reverse('task-checklist-list', args=[self.first.pk]), None),
+            (reverse('task-checklist-list', args=[self.hidden.pk]), None),
+            (reverse('task-checklist-list', args=[9999]), None),
+        ]
+        for url, query in cases:
+            with self.subTest(url=url, query=query):
+                await self.assertSameResponse(url, query)
+
+    async def test_async_handlers_serve_asgi_requests(self):
+        with mock.patch.object(TaskViewSet, 'aretrieve', autospec=True, side_effect=TaskViewSet.aretrieve) as handler:
+            response = await self.assertSameResponse(reverse('task-detail', args=[self.first.pk]))
+        self.assertEqual(response.status_code, 200)
+        handler.assert_called_once()
+
+        with mock.patch.object(ChecklistItemViewSet, 'alist', autospec=True, side_effect=ChecklistItemViewSet.alist) as handler:
+            await self.assertSameResponse(reverse('task-checklist-list', args=[self.first.pk]))
+        handler.assert_called_once()
+
+    async def test_writes_and_conditional_requests(self):
+        url = reverse('task-detail', args=[self.first.pk])
+        headers = {'Authorization': self.authorization}
+        response = await self.async_client.get(url, headers=headers)
+        response = await self.async_client.get(url, headers={**headers, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+        response = await self.async_client.patch(
+            url, {'status': 'DONE'}, content_type='application/json', headers=headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        await self.first.arefresh_from_db()
+        self.assertEqual(self.first.status, 'DONE')
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('task-list'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_list_cache(self):
+        url = reverse('task-list')
+        headers = {'Authorization': self.authorization}
+        await sync_to_async(cache.clear)()
+        first = await self.async_client.get(url, headers=headers)
+        second = await self.async_client.get(url, headers=headers)
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(first.content, second.content)
@@ -0,0 +1,144 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from tasks.models import ChecklistItem, Task
+
+
+class BatchEndpointTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='batcher', password='12345')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.task = Task.objects.create(title='Batched', due_date=timezone.now(), owner=cls.user, assigned_to=cls.user)
+        cls.hidden = Task.objects.create(title='Hidden', due_date=timezone.now(), owner=cls.other, assigned_to=cls.other)
+        cls.items = [
+            ChecklistItem.objects.create(task=cls.task, text=f'Step {index}', position=index * 1024)
+            for index in range(1, 4)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('batch')
+
+    def batch(self, *requests, atomic=False):
+        return self.client.post(self.url, {'requests': list(requests), 'atomic': atomic}, format='json')
+
+    def item_url(self, item, suffix=''):
+        return f'/api/tasks/{self.task.pk}/checklist/{item.pk}/{suffix}'
+
+    def test_sub_requests_run_in_order(self):
+        response = self.batch(
+            {'method': 'PATCH', 'path': self.item_url(self.items[0], 'complete/')},
+            {'method': 'POST', 'path': f'/api/tasks/{self.task.pk}/comments/', 'body': {'content': 'Done'}},
+            {'method': 'GET', 'path': f'/api/tasks/{self.task.pk}/?fields=id,checklist_completion'},
+            {'method': 'DELETE', 'path': self.item_url(self.items[2])},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['responses']
+        self.assertEqual([result['status'] for result in results], [200, 201, 200, 204])
+        self.assertTrue(results[0]['body']['is_completed'])
+        self.assertEqual(results[1]['body']['author'], self.user.pk)
+        # The GET sees the write before it
+        self.assertEqual(results[2]['body'], {'id': self.task.pk, 'checklist_completion': 33})
+        self.assertIsNone(results[3]['body'])
+        self.assertFalse(ChecklistItem.objects.filter(pk=self.items[2].pk).exists())
+
+    def test_failures_are_per_request_unless_atomic(self):
+        response = self.batch(
+            {'method': 'PATCH', 'path': self.item_url(self.items[0], 'complete/')},
+            {'method': 'GET', 'path': f'/api/tasks/{self.hidden.pk}/'},
+            {'method': 'PATCH', 'path': self.item_url(self.items[1], 'complete/')},
+        )
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 404, 200])
+        self.assertEqual(ChecklistItem.objects.filter(is_completed=True).count(), 2)
+
+    def test_atomic_rolls_back_on_the_first_failure(self):
+        response = self.batch(
+            {'method': 'PATCH', 'path': self.item_url(self.items[0], 'complete/')},
+            {'method': 'PATCH', 'path': f'/api/tasks/{self.task.pk}/', 'body': {'status': 'NOPE'}},
+            {'method': 'PATCH', 'path': self.item_url(self.items[1], 'complete/')},
+            atomic=True,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data['responses']
+        self.assertEqual([result['status'] for result in results], [200, 400, 424])
+        self.assertIn('status', results[1]['body'])
+        self.assertFalse(ChecklistItem.objects.filter(is_completed=True).exists())
+
+    def test_rolled_back_writes_are_not_served_from_the_cache(self):
+        cache.clear()
+        response = self.batch(
+            {'method': 'PATCH', 'path': f'/api/tasks/{self.task.pk}/', 'body': {'title': 'phantom'}},
+            {'path': '/api/tasks/'},
+            {'method': 'PATCH', 'path': f'/api/tasks/{self.task.pk}/', 'body': {'status': 'BOGUS'}},
+            atomic=True,
+        )
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 200, 400])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Batched')
+
+        response = self.client.get(reverse('task-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual([task['title'] for task in response.data], ['Batched'])
+
+    def test_authenticates_once(self):
+        calls = []
+        authenticate = JWTAuthentication.authenticate
+
+        def counting(authentication, request):
+            calls.append(request.path)
+            return authenticate(authentication, request)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        with mock.patch.object(JWTAuthentication, 'authenticate', counting):
+            response = client.post(self.url, {'requests': [
+                {'path': f'/api/tasks/{self.task.pk}/'},
+                {'path': f'/api/tasks/{self.task.pk}/checklist/'},
+            ]}, format='json')
+        self.assertEqual([result['status'] for result in response.data['responses']], [200, 200])
+        self.assertEqual(calls, [self.url])
+
+    async def test_under_asgi(self):
+        # TaskViewSet is served by an async view there; batches call its sync view
+        response = await self.async_client.post(
+            self.url, {'requests': [{'path': '/api/tasks/?fields=id'}]}, content_type='application/json',
+            headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['responses'], [{'status': 200, 'body': [{'id': self.task.pk}]}])
+
+    def test_unbatchable_paths(self):
+        response = self.batch(
+            {'path': '/api/nothing-here/'},
+            {'path': '/api/events/'},
+            {'method': 'POST', 'path': '/api/batch/', 'body': {'requests': []}},
+            {'path': '/api/tasks/export/?format=ndjson'},
+        )
+        self.assertEqual([result['status'] for result in response.data['responses']], [404, 400, 400, 400])
+
+    def test_invalid_batches(self):
+        for payload in (
+            {},
+            {'requests': []},
+            {'requests': [{'method': 'TRACE', 'path': '/api/tasks/'}]},
+            {'requests': [{'path': '/admin/'}]},
+            {'requests': [{'path': '/api/tasks/'}] * 51},
+        ):
+            response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+            self.assertIn('requests', response.data)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.batch({'path': '/api/tasks/'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,136 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, ChecklistItem
+import datetime
+
+
+class TaskBulkEndpointTest(TestCase):
+    """POST /api/tasks/bulk/"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='mover', password='12345')
+        cls.teammate = User.objects.create_user(username='teammate', password='12345')
+        cls.stranger = User.objects.create_user(username='stranger', password='12345')
+        cls.due = timezone.now() + datetime.timedelta(days=5)
+        cls.task = cls.make_task('Existing', cls.user)
+        cls.foreign = cls.make_task('Not mine', cls.stranger)
+
+    @classmethod
+    def make_task(cls, title, owner, **kwargs):
+        return Task.objects.create(title=title, due_date=cls.due, owner=owner, assigned_to=owner, **kwargs)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task-bulk')
+
+    def post(self, operations):
+        return self.client.post(self.url, {'operations': operations}, format='json')
+
+    def new_task(self, title, **extra):
+        return {'title': title, 'due_date': self.due.isoformat(), 'assigned_to': self.teammate.id, **extra}
+
+    def test_mixed_operations(self):
+        response = self.post([
+            {'op': 'create', 'data': self.new_task('Fresh', tags_list=['ops', 'Infra'])},
+            {'op': 'update', 'id': self.task.id, 'data': {'status': 'DONE'}},
+            {'op': 'delete', 'id': self.task.id + 1000},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            [424, 424, 404],
+        )
+        self.assertFalse(Task.objects.filter(title='Fresh').exists())
+
+        doomed = self.make_task('Doomed', self.user)
+        response = self.post([
+            {'op': 'create', 'data': self.new_task('Fresh', tags_list=['ops', 'Infra'])},
+            {'op': 'update', 'id': self.task.id, 'data': {'status': 'DONE'}},
+            {'op': 'delete', 'id': doomed.id},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        created, updated, deleted = response.data['results']
+
+        self.assertEqual(created['status'], 201)
+        self.assertEqual(created['data']['title'], 'Fresh')
+        self.assertEqual(created['data']['owner'], self.user.id)
+        fresh = Task.objects.get(pk=created['id'])
+        self.assertEqual(fresh.assigned_to, self.teammate)
+        self.assertEqual(sorted(fresh.tag_set.values_list('name', flat=True)), ['infra', 'ops'])
+
+        self.assertEqual(updated, {**updated, 'op': 'update', 'id': self.task.id, 'status': 200})
+        self.assertEqual(updated['data']['status'], 'DONE')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'DONE')
+        self.assertGreater(self.task.updated_at, self.task.created_at)
+
+        self.assertEqual(deleted, {'op': 'delete', 'id': doomed.id, 'status': 204})
+        self.assertFalse(Task.objects.filter(pk=doomed.id).exists())
+
+    def test_permission_checked_in_batch(self):
+        response = self.post([
+            {'op': 'update', 'id': self.foreign.id, 'data': {'status': 'DONE'}},
+            {'op': 'delete', 'id': self.task.id},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['results'][0]['status'], 404)
+        self.assertEqual(response.data['results'][1]['status'], 424)
+        self.assertTrue(Task.objects.filter(pk=self.task.id).exists())
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'TODO')
+
+    def test_validation_errors_per_item(self):
+        response = self.post([
+            {'op': 'create', 'data': {'title': 'No due date', 'assigned_to': self.teammate.id}},
+            {'op': 'create', 'data': self.new_task('Bad user', assigned_to=999)},
+            {'op': 'update', 'id': self.task.id, 'data': {'priority': 'URGENT'}},
+            {'op': 'archive', 'id': self.task.id},
+            {'op': 'delete'},
+            'delete everything',
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        results = response.data['results']
+        self.assertIn('due_date', results[0]['errors'])
+        self.assertIn('assigned_to', results[1]['errors'])
+        self.assertIn('priority', results[2]['errors'])
+        self.assertIn('op', results[3]['errors'])
+        self.assertIn('id', results[4]['errors'])
+        self.assertIn('non_field_errors', results[5]['errors'])
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_duplicate_ids_rejected(self):
+        response = self.post([
+            {'op': 'update', 'id': self.task.id, 'data': {'status': 'DONE'}},
+            {'op': 'delete', 'id': self.task.id},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', response.data['results'][1]['errors'])
+
+    def test_payload_shape(self):
+        self.assertEqual(self.client.post(self.url, {'operations': []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, [{'op': 'delete', 'id': 1}], format='json').status_code, 400)
+
+    def test_status_move_is_constant_queries(self):
+        def move(count, new_status):
+            tasks = [self.make_task(f'Card {i}', self.user) for i in range(count)]
+            ChecklistItem.objects.create(task=tasks[0], text='Step', position=1)
+            operations = [{'op': 'update', 'id': task.id, 'data': {'status': new_status}} for task in tasks]
+            with CaptureQueriesContext(connection) as context:
+                response = self.post(operations)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(Task.objects.filter(status=new_status).count(), count)
+            return len(context.captured_queries)
+
+        small = move(5, 'IN_PROGRESS')
+        large = move(200, 'DONE')
+        # Only bulk_update batches grow with the number of rows
+        self.assertLessEqual(large, small + 1)
+        self.assertLessEqual(large, 8)
@@ -0,0 +1,92 @@
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import ChecklistItem, Task, TaskComment, TaskDependency
+import datetime
+
+
+class TaskBundleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='12345', email='p@example.com')
+        cls.other = User.objects.create_user(username='other', password='12345')
+
+        def make(title, days, owner=cls.user):
+            return Task.objects.create(
+                title=title, due_date=timezone.now() + datetime.timedelta(days=days), owner=owner, assigned_to=owner,
+            )
+
+        cls.design = make('Design', 1)
+        cls.build = make('Build', 2)
+        cls.spec = make('Spec', 0)
+        cls.parked = make('Parked', 3)
+        cls.deploy = make('Deploy', 4)
+        cls.audit = make('Audit', 5, owner=cls.other)
+        TaskDependency.objects.create(task=cls.build, depends_on=cls.design, created_by=cls.user)
+        TaskDependency.objects.create(task=cls.build, depends_on=cls.spec, created_by=cls.user, notes='Needs sign-off')
+        TaskDependency.objects.create(task=cls.build, depends_on=cls.parked, created_by=cls.user, active=False)
+        TaskDependency.objects.create(task=cls.deploy, depends_on=cls.build, created_by=cls.user)
+        # Hidden tasks are left out, like from /blockers/ and /blocked/
+        TaskDependency.objects.create(task=cls.audit, depends_on=cls.build, created_by=cls.other)
+        cls.secret = make('Secret', 6, owner=cls.other)
+        TaskDependency.objects.create(task=cls.build, depends_on=cls.secret, created_by=cls.other)
+        ChecklistItem.objects.create(task=cls.build, text='Compile', position=2048)
+        ChecklistItem.objects.create(task=cls.build, text='Link', position=1024, is_completed=True)
+        ChecklistItem.objects.create(task=cls.spec, text='Review', position=1024)
+        TaskComment.objects.create(task=cls.build, author=cls.user, content='Starting')
+        TaskComment.objects.create(task=cls.build, author=cls.other, content='Ping me')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, name, **kwargs):
+        response = self.client.get(reverse(name, kwargs=kwargs))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_matches_the_separate_endpoints(self):
+        task_id = self.build.pk
+        bundle = self.get('task-bundle', pk=task_id)
+        self.assertEqual(bundle, {
+            'task': self.get('task-detail', pk=task_id),
+            'checklist_items': self.get('task-checklist-list', task_pk=task_id),
+            'comments': self.get('task-comment-list', task_pk=task_id),
+            'dependencies': self.get('task-dependency-list', task_pk=task_id),
+            'blockers': self.get('task-blockers', pk=task_id),
+            'blocked': self.get('task-blocked', pk=task_id),
+        })
+        self.assertEqual([item['text'] for item in bundle['checklist_items']], ['Link', 'Compile'])
+        self.assertEqual({task['title'] for task in bundle['blockers']}, {'Design', 'Spec'})
+        self.assertEqual({task['title'] for task in bundle['blocked']}, {'Deploy'})
+
+    def test_hidden_blocker(self):
+        bundle = self.get('task-bundle', pk=self.build.pk)
+        self.assertNotIn(self.secret.pk, [task['id'] for task in bundle['blockers']])
+        dependency, = [dep for dep in bundle['dependencies'] if dep['depends_on'] == self.secret.pk]
+        self.assertIsNone(dependency['depends_on_details'])
+        self.assertEqual(dependency['task_details']['id'], self.build.pk)
+
+    def test_task_without_relations(self):
+        bundle = self.get('task-bundle', pk=self.design.pk)
+        self.assertEqual(bundle['dependencies'], [])
+        self.assertEqual(bundle['comments'], [])
+        self.assertEqual([task['title'] for task in bundle['blocked']], ['Build'])
+
+    def test_fixed_number_of_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get('task-bundle', pk=self.build.pk)
+        # Dependencies, blocked ids, tasks, checklist items, comments
+        self.assertEqual(len(queries), 5)
+
+    def test_hidden_or_missing_task(self):
+        for task_id in (self.audit.pk, 999999):
+            response = self.client.get(reverse('task-bundle', kwargs={'pk': task_id}))
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
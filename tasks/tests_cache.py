@@ -0,0 +1,136 @@
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.cache import GENERATION_KEY, invalidate_tasks, task_list_cache
+from tasks.models import Task, TaskComment, ChecklistItem, TaskDependency
+import datetime
+
+
+class TaskListCacheTest(TestCase):
+    """Per-user task list cache and its signal-based invalidation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='12345')
+        cls.assignee = User.objects.create_user(username='assignee', password='12345')
+        cls.outsider = User.objects.create_user(username='outsider', password='12345')
+        cls.task = cls.make_task('Plan sprint', cls.owner, cls.assignee)
+        cls.other_task = cls.make_task('Review', cls.owner, cls.owner)
+
+    @classmethod
+    def make_task(cls, title, owner, assigned_to):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=2),
+            owner=owner,
+            assigned_to=assigned_to,
+        )
+
+    def setUp(self):
+        cache.clear()
+        task_list_cache.reset_stats()
+        self.client = APIClient()
+
+    def get_list(self, user, query=''):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(f"{reverse('task-list')}{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def assertInvalidates(self, change, *users):
+        for user in users:
+            self.get_list(user)
+            self.assertEqual(self.get_list(user)['X-Cache'], 'HIT')
+        change()
+        for user in users:
+            self.assertEqual(self.get_list(user)['X-Cache'], 'MISS')
+
+    def test_hit_skips_query_and_serialization(self):
+        first = self.get_list(self.owner)
+        # Only the ETag validator query runs on a hit
+        with self.assertNumQueries(1):
+            second = self.get_list(self.owner)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(task_list_cache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_query_params_are_normalized(self):
+        self.get_list(self.owner, '?status=TODO&priority=MEDIUM')
+        self.assertEqual(self.get_list(self.owner, '?priority=MEDIUM&status=TODO')['X-Cache'], 'HIT')
+        self.assertEqual(self.get_list(self.owner, '?status=DONE')['X-Cache'], 'MISS')
+
+    def test_users_are_isolated(self):
+        self.get_list(self.owner)
+        response = self.get_list(self.outsider)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data, [])
+
+    def test_invalidation_reaches_other_workers(self):
+        # A fresh backend instance stands in for another worker process
+        other_worker = caches.create_connection('default')
+        self.get_list(self.owner)
+        key = GENERATION_KEY % self.owner.pk
+        before = other_worker.get(key)
+        self.assertEqual(before, cache.get(key))
+        self.task.save()
+        self.assertNotEqual(other_worker.get(key), before)
+
+    def test_tests_use_a_private_cache(self):
+        # Clearing the shared file cache would empty a running server's
+        self.assertIsInstance(caches['default'], LocMemCache)
+
+    def test_task_save_invalidates_owner_and_assignee(self):
+        def change():
+            self.task.status = 'IN_PROGRESS'
+            self.task.save()
+        self.assertInvalidates(change, self.owner, self.assignee)
+        self.assertEqual(self.get_list(self.outsider)['X-Cache'], 'MISS')
+
+    def test_reassignment_invalidates_previous_assignee(self):
+        def change():
+            task = Task.objects.get(pk=self.task.pk)
+            task.assigned_to = self.outsider
+            task.save()
+        self.assertInvalidates(change, self.assignee)
+        self.assertEqual(self.get_list(self.assignee).data, [])
+
+    def test_task_delete(self):
+        self.assertInvalidates(self.task.delete, self.owner, self.assignee)
+
+    def test_child_changes(self):
+        self.assertInvalidates(
+            lambda: ChecklistItem.objects.create(task=self.task, text='Estimate', position=1),
+            self.owner, self.assignee,
+        )
+        self.assertInvalidates(
+            lambda: TaskComment.objects.create(task=self.task, author=self.owner, content='Go'),
+            self.owner, self.assignee,
+        )
+        self.assertInvalidates(
+            lambda: TaskDependency.objects.create(task=self.other_task, depends_on=self.task, created_by=self.owner),
+            self.owner, self.assignee,
+        )
+
+    def test_invalidate_tasks_for_bulk_writes(self):
+        def change():
+            Task.objects.filter(pk=self.task.pk).update(priority='HIGH')
+            invalidate_tasks([self.task.pk])
+        self.assertInvalidates(change, self.owner, self.assignee)
+
+    def test_cache_stats_endpoint(self):
+        url = reverse('task-cache-stats')
+        self.client.force_authenticate(user=self.owner)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create_user(username='staff', password='12345', is_staff=True)
+        self.get_list(self.owner)
+        self.get_list(self.owner)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['task_list']['hits'], 1)
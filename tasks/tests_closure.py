@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskDependency, DependencyPath
+from tasks.serializers import TaskDependencySerializer
+import datetime
+
+
+class DependencyClosureTest(TestCase):
+    """Transitive closure of active dependencies, maintained incrementally."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='closure', password='12345')
+        # a <- b <- c <- d: each task depends on the previous one
+        cls.a, cls.b, cls.c, cls.d = (cls.make_task(title) for title in 'abcd')
+
+    @classmethod
+    def make_task(cls, title):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=cls.user,
+            assigned_to=cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def depend(self, task, depends_on, **kwargs):
+        return TaskDependency.objects.create(task=task, depends_on=depends_on, created_by=self.user, **kwargs)
+
+    def closure(self):
+        return set(DependencyPath.objects.values_list('ancestor__title', 'descendant__title'))
+
+    def assertClosureConsistent(self):
+        stored = self.closure()
+        call_command('rebuild_dependency_closure', stdout=StringIO())
+        self.assertEqual(stored, self.closure())
+
+    def test_chain(self):
+        self.depend(self.b, self.a)
+        self.depend(self.c, self.b)
+        self.depend(self.d, self.c)
+        self.assertEqual(self.closure(), {
+            ('a', 'b'), ('b', 'c'), ('c', 'd'), ('a', 'c'), ('b', 'd'), ('a', 'd'),
+        })
+        self.assertEqual(set(Task.objects.upstream_of(self.d).values_list('title', flat=True)), {'a', 'b', 'c'})
+        self.assertEqual(set(Task.objects.downstream_of(self.b).values_list('title', flat=True)), {'c', 'd'})
+
+    def test_removing_one_of_several_paths(self):
+        # d depends on a through b and through c
+        self.depend(self.b, self.a)
+        self.depend(self.c, self.a)
+        through_b = self.depend(self.d, self.b)
+        self.depend(self.d, self.c)
+        self.assertIn(('a', 'd'), self.closure())
+
+        through_b.delete()
+        self.assertIn(('a', 'd'), self.closure())
+        self.assertNotIn(self.b.pk, Task.objects.upstream_of(self.d).values_list('pk', flat=True))
+        self.assertClosureConsistent()
+
+    def test_toggle_and_task_deletion(self):
+        self.depend(self.b, self.a)
+        middle = self.depend(self.c, self.b)
+        self.depend(self.d, self.c)
+
+        url = reverse('task-dependency-toggle', kwargs={'task_pk': self.c.id, 'pk': middle.id})
+        self.client.patch(url)
+        self.assertEqual(self.closure(), {('a', 'b'), ('c', 'd')})
+        self.client.patch(url)
+        self.assertEqual(len(self.closure()), 6)
+
+        self.b.delete()
+        self.assertEqual(self.closure(), {('c', 'd')})
+        self.assertClosureConsistent()
+
+    def test_many_chains_between_two_tasks(self):
+        # 70 stacked diamonds: 2**70 chains from the bottom task to the top
+        # one, more than a 64-bit count of them can hold
+        bottom = top = self.a
+        layers = []
+        for layer in range(70):
+            left, right, joined = (self.make_task(f'{side}{layer}') for side in ('l', 'r', 'j'))
+            layers.append([
+                self.depend(side, top) for side in (left, right)
+            ] + [self.depend(joined, side) for side in (left, right)])
+            top = joined
+        self.assertTrue(TaskDependency.creates_cycle(bottom, top))
+
+        # Cutting one side of every diamond keeps the chain through the other
+        for left_in, _, left_out, _ in layers:
+            left_in.delete()
+        self.assertTrue(TaskDependency.creates_cycle(bottom, top))
+        self.assertClosureConsistent()
+        # Cutting both sides of the middle one separates them
+        middle = layers[35]
+        middle[1].delete()
+        self.assertFalse(TaskDependency.creates_cycle(bottom, top))
+        self.assertTrue(TaskDependency.creates_cycle(bottom, middle[1].depends_on))
+        self.assertClosureConsistent()
+
+    def test_cycle_check_is_one_query(self):
+        self.depend(self.b, self.a)
+        self.depend(self.c, self.b)
+        self.depend(self.d, self.c)
+        serializer = TaskDependencySerializer(data={'task': self.a.id, 'depends_on': self.d.id})
+        with CaptureQueriesContext(connection) as queries:
+            valid = serializer.is_valid()
+        self.assertFalse(valid)
+        self.assertIn('circular dependency', str(serializer.errors))
+        # The two primary key lookups, the unique_together check and the
+        # closure lookup, however long the chain
+        self.assertEqual(len(queries), 4)
+
+        # Inactive dependencies don't count towards cycles
+        TaskDependency.objects.get(task=self.c).delete()
+        serializer = TaskDependencySerializer(data={'task': self.a.id, 'depends_on': self.d.id})
+        self.assertTrue(serializer.is_valid())
+
+    def test_reactivating_into_a_cycle_is_rejected(self):
+        back = self.depend(self.a, self.b, active=False)
+        self.depend(self.b, self.a)
+        url = reverse('task-dependency-toggle', kwargs={'task_pk': self.a.id, 'pk': back.id})
+        response = self.client.patch(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        back.refresh_from_db()
+        self.assertFalse(back.active)
@@ -0,0 +1,136 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskComment, ChecklistItem, TaskDependency
+import datetime
+import time
+
+
+class ConditionalGetTest(TestCase):
+    """ETag / Last-Modified validators and 304 responses on the task endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='12345')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.task = cls.make_task('Write report')
+        cls.blocker = cls.make_task('Collect numbers')
+        cls.item = ChecklistItem.objects.create(task=cls.task, text='Outline', position=1)
+        TaskComment.objects.create(task=cls.task, author=cls.user, content='Started')
+        TaskDependency.objects.create(task=cls.task, depends_on=cls.blocker, created_by=cls.user)
+
+    @classmethod
+    def make_task(cls, title):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=1),
+            owner=cls.user,
+            assigned_to=cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def assertNotModifiedUntil(self, url, change):
+        """``url`` answers 304 until ``change()`` runs, then 200 with a new ETag."""
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        change()
+        second = self.revalidate(url, etag)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(second['ETag'], etag)
+
+    def test_unchanged_list_is_one_query(self):
+        url = reverse('task-list')
+        response = self.client.get(url)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('private', response['Cache-Control'])
+        with self.assertNumQueries(1):
+            response = self.revalidate(url, response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        url = reverse('task-detail', args=[self.task.id])
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_ignores_if_modified_since_after_a_delete(self):
+        stale = self.make_task('Old notes')
+        Task.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - datetime.timedelta(days=1))
+        url = reverse('task-list')
+        response = self.client.get(url)
+        # The newest updated_at doesn't move when an older task goes away
+        self.assertNotIn('Last-Modified', response)
+        since = http_date(time.time())
+        stale.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(stale.id, [task['id'] for task in response.data])
+
+    def test_etag_depends_on_query_and_user(self):
+        url = reverse('task-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(f'{url}?status=TODO')['ETag'], etag)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.revalidate(url, etag).status_code, status.HTTP_200_OK)
+
+    def test_task_edit_changes_list(self):
+        def change():
+            self.task.title = 'Write the report'
+            self.task.save()
+        self.assertNotModifiedUntil(reverse('task-list'), change)
+
+    def test_task_delete_changes_list(self):
+        self.assertNotModifiedUntil(reverse('task-list'), self.blocker.delete)
+
+    def test_checklist_change_touches_task(self):
+        def change():
+            self.item.is_completed = True
+            self.item.save()
+        self.assertNotModifiedUntil(reverse('task-detail', args=[self.task.id]), change)
+
+    def test_comment_list(self):
+        url = reverse('task-comment-list', kwargs={'task_pk': self.task.id})
+        self.assertNotModifiedUntil(
+            url, lambda: TaskComment.objects.create(task=self.task, author=self.user, content='Done')
+        )
+
+    def test_checklist_list(self):
+        url = reverse('task-checklist-list', kwargs={'task_pk': self.task.id})
+        self.assertNotModifiedUntil(url, self.item.delete)
+
+    def test_dependency_list_follows_depends_on_task(self):
+        def change():
+            self.blocker.status = 'DONE'
+            self.blocker.save()
+        url = reverse('task-dependency-list', kwargs={'task_pk': self.task.id})
+        self.assertNotModifiedUntil(url, change)
+
+    def test_missing_and_hidden_tasks(self):
+        response = self.client.get(reverse('task-detail', args=[999]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.other)
+        url = reverse('task-checklist-list', kwargs={'task_pk': self.task.id})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+        self.assertNotIn('ETag', response)
+
+    def test_writes_are_not_conditional(self):
+        response = self.client.patch(
+            reverse('task-detail', args=[self.task.id]), {'priority': 'HIGH'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', response)
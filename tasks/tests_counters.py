@@ -0,0 +1,126 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, ChecklistItem, TaskDependency
+from tasks.serializers import TaskSerializer
+import datetime
+
+
+class TaskCounterTest(TestCase):
+    """Denormalized checklist and dependency counters on Task."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='counter', password='12345')
+        cls.task = cls.make_task('Launch')
+        cls.other = cls.make_task('Prepare')
+
+    @classmethod
+    def make_task(cls, title):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=cls.user,
+            assigned_to=cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def counters(self, task):
+        return Task.objects.values_list(*Task.COUNTER_FIELDS).get(pk=task.pk)
+
+    def test_checklist_paths(self):
+        url = reverse('task-checklist-list', kwargs={'task_pk': self.task.id})
+        first = self.client.post(url, {'text': 'Write notes', 'task': self.task.id}, format='json').data['id']
+        second = self.client.post(url, {'text': 'Ship', 'task': self.task.id}, format='json').data['id']
+        self.assertEqual(self.counters(self.task), (2, 0, 0, 0))
+
+        def item_url(name, pk):
+            return reverse(f'task-checklist-{name}', kwargs={'task_pk': self.task.id, 'pk': pk})
+
+        self.client.patch(item_url('complete', first))
+        # Completing twice doesn't count twice
+        self.client.patch(item_url('complete', first))
+        self.assertEqual(self.counters(self.task), (2, 1, 0, 0))
+        self.client.patch(item_url('incomplete', first))
+        self.assertEqual(self.counters(self.task), (2, 0, 0, 0))
+
+        self.client.patch(item_url('complete', second))
+        self.client.delete(item_url('detail', second))
+        self.assertEqual(self.counters(self.task), (1, 0, 0, 0))
+
+        # Moving an item to another task moves its count too
+        self.client.patch(item_url('detail', first), {'task': self.other.id, 'is_completed': True}, format='json')
+        self.assertEqual(self.counters(self.task), (0, 0, 0, 0))
+        self.assertEqual(self.counters(self.other), (1, 1, 0, 0))
+
+    def test_dependency_paths(self):
+        url = reverse('task-dependency-list', kwargs={'task_pk': self.task.id})
+        response = self.client.post(url, {'task': self.task.id, 'depends_on': self.other.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # The nested task details render the counts written by this request
+        self.assertEqual(response.data['task_details']['blocked_by_count'], 1)
+        self.assertEqual(response.data['depends_on_details']['blocks_count'], 1)
+        self.assertEqual(self.counters(self.task), (0, 0, 1, 0))
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 1))
+
+        detail = {'task_pk': self.task.id, 'pk': response.data['id']}
+        self.client.patch(reverse('task-dependency-toggle', kwargs=detail))
+        self.assertEqual(self.counters(self.task), (0, 0, 0, 0))
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 0))
+        self.client.patch(reverse('task-dependency-toggle', kwargs=detail))
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 1))
+
+        self.client.delete(reverse('task-dependency-detail', kwargs=detail))
+        self.assertEqual(self.counters(self.task), (0, 0, 0, 0))
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 0))
+
+    def test_cascade_from_deleted_task(self):
+        blocker = self.make_task('Blocker')
+        TaskDependency.objects.create(task=self.task, depends_on=blocker, created_by=self.user)
+        self.assertEqual(self.counters(self.task), (0, 0, 1, 0))
+        blocker.delete()
+        self.assertEqual(self.counters(self.task), (0, 0, 0, 0))
+
+    def test_saving_stale_task_keeps_counters(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        ChecklistItem.objects.create(task=self.task, text='Concurrent', position=1)
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counters(self.task), (1, 0, 0, 0))
+
+    def test_serializer_reads_columns(self):
+        ChecklistItem.objects.create(task=self.task, text='Done', is_completed=True, position=1)
+        ChecklistItem.objects.create(task=self.task, text='Open', position=2)
+        task = Task.objects.get(pk=self.task.pk)
+        fields = {'checklist_completion', 'blocked_by_count', 'blocks_count'}
+        with self.assertNumQueries(0):
+            data = TaskSerializer(task, fields=fields).data
+        self.assertEqual(data, {'checklist_completion': 50, 'blocked_by_count': 0, 'blocks_count': 0})
+
+    def test_repair_command(self):
+        ChecklistItem.objects.create(task=self.task, text='Counted', position=1)
+        Task.objects.filter(pk=self.task.pk).update(checklist_total=7, active_dependents=2)
+
+        out = StringIO()
+        call_command('repair_task_counters', stdout=out)
+        self.assertIn(f'Task {self.task.pk}: ', out.getvalue())
+        self.assertIn('checklist_total 7 -> 1', out.getvalue())
+        self.assertEqual(self.counters(self.task), (7, 0, 0, 2))
+        with self.assertRaises(CommandError):
+            call_command('repair_task_counters', strict=True, stdout=StringIO())
+
+        call_command('repair_task_counters', repair=True, stdout=StringIO())
+        self.assertEqual(self.counters(self.task), (1, 0, 0, 0))
+        out = StringIO()
+        call_command('repair_task_counters', strict=True, stdout=out)
+        self.assertIn('consistent', out.getvalue())
@@ -0,0 +1,184 @@
+import asyncio
+import datetime
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from tasks.events import Broker, SQLiteBackend, format_event, stream_events
+from tasks.models import Task, ChecklistItem, TaskComment, TaskDependency
+
+
+class BrokerTest(TestCase):
+    """In-process fan-out of events to per-connection queues."""
+
+    async def test_dispatch_reaches_only_the_event_users(self):
+        broker = Broker()
+        first, second, stranger = broker.subscribe(1), broker.subscribe(2), broker.subscribe(3)
+        broker.dispatch({'type': 'task.updated', 'task': 7, 'id': 7, 'users': [1, 2]})
+        await asyncio.sleep(0)
+
+        expected = {'type': 'task.updated', 'task': 7, 'id': 7}
+        self.assertEqual(first.queue.get_nowait(), expected)
+        self.assertEqual(second.queue.get_nowait(), expected)
+        self.assertTrue(stranger.queue.empty())
+
+    async def test_unsubscribe(self):
+        broker = Broker()
+        subscription = broker.subscribe(1)
+        self.assertEqual(broker.subscriber_count(), 1)
+        broker.unsubscribe(subscription)
+        self.assertEqual(broker.subscriber_count(), 0)
+        broker.dispatch({'type': 'task.updated', 'task': 7, 'id': 7, 'users': [1]})
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_connection_is_told_to_resync(self):
+        broker = Broker()
+        subscription = broker.subscribe(1)
+        for task_id in range(3):
+            broker.dispatch({'type': 'task.updated', 'task': task_id, 'id': task_id, 'users': [1]})
+        await asyncio.sleep(0)
+
+        self.assertEqual(subscription.queue.get_nowait(), {'type': 'resync'})
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_stream_unsubscribes_when_closed(self):
+        broker = Broker()
+        with mock.patch('tasks.events.broker', broker):
+            stream = stream_events(1)
+            self.assertEqual(await anext(stream), 'retry: 5000\n\n')
+            broker.dispatch({'type': 'comment.created', 'task': 7, 'id': 3, 'users': [1]})
+            self.assertEqual(await anext(stream), format_event({'type': 'comment.created', 'task': 7, 'id': 3}))
+            await stream.aclose()
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_sqlite_backend_shares_events(self):
+        path = Path(tempfile.mkdtemp()) / 'events.sqlite3'
+        publisher, listener = SQLiteBackend(Broker(), path), SQLiteBackend(Broker(), path)
+        last_id, events = listener.read_since(None)
+        self.assertEqual(events, [])
+
+        event = {'type': 'task.updated', 'task': 7, 'id': 7, 'users': [1]}
+        publisher.publish(event)
+        self.assertEqual(listener.read_since(last_id)[1], [event])
+
+
+class PublishChangeTest(TestCase):
+    """Model writes publish events to the users of the task, after commit."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='12345')
+        cls.assignee = User.objects.create_user(username='assignee', password='12345')
+        cls.task = cls.make_task('First')
+        cls.other = cls.make_task('Second')
+
+    @classmethod
+    def make_task(cls, title):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=cls.owner,
+            assigned_to=cls.assignee,
+        )
+
+    def published(self, write):
+        backend = mock.Mock()
+        with mock.patch('tasks.events.get_backend', return_value=backend):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                write()
+                # Nothing goes out before the transaction commits
+                backend.publish.assert_not_called()
+        self.assertTrue(callbacks)
+        return [call.args[0] for call in backend.publish.call_args_list]
+
+    def test_child_writes(self):
+        users = sorted([self.owner.pk, self.assignee.pk])
+        events = self.published(lambda: ChecklistItem.objects.create(task=self.task, text='Step'))
+        self.assertEqual(events, [
+            {'type': 'checklist_item.created', 'task': self.task.pk, 'id': mock.ANY, 'users': users},
+        ])
+
+        comment = TaskComment.objects.create(task=self.task, author=self.owner, content='Hi')
+        events = self.published(comment.delete)
+        self.assertEqual([event['type'] for event in events], ['comment.deleted'])
+
+        events = self.published(lambda: TaskDependency.objects.create(
+            task=self.other, depends_on=self.task, created_by=self.owner,
+        ))
+        self.assertEqual(events[0]['type'], 'dependency.created')
+        self.assertEqual(events[0]['task'], self.other.pk)
+
+    def test_reassignment_tells_the_previous_assignee(self):
+        stranger = User.objects.create_user(username='stranger', password='12345')
+
+        def reassign():
+            self.task.assigned_to = stranger
+            self.task.save()
+
+        events = self.published(reassign)
+        self.assertIn(
+            {'type': 'task.updated', 'task': self.task.pk, 'id': self.task.pk,
+             'users': sorted([self.owner.pk, stranger.pk])},
+            events,
+        )
+        self.assertIn(
+            {'type': 'task.deleted', 'task': self.task.pk, 'id': self.task.pk, 'users': [self.assignee.pk]},
+            events,
+        )
+
+    def test_rolled_back_writes_publish_nothing(self):
+        backend = mock.Mock()
+        with mock.patch('tasks.events.get_backend', return_value=backend):
+            with self.captureOnCommitCallbacks(execute=False):
+                ChecklistItem.objects.create(task=self.task, text='Step')
+        backend.publish.assert_not_called()
+
+
+class EventStreamViewTest(TestCase):
+    """GET /api/events/ served as Server-Sent Events."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='listener', password='12345')
+
+    def setUp(self):
+        self.url = reverse('events')
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_requires_a_valid_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(self.url, {'token': 'not-a-token'})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('detail', json.loads(response.content))
+
+    async def test_streams_the_user_events(self):
+        broker = Broker()
+        with mock.patch('tasks.events.broker', broker):
+            response = await self.async_client.get(self.url, headers={'Authorization': f'Bearer {self.token}'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertEqual(response['Cache-Control'], 'no-cache')
+
+            content = aiter(response.streaming_content)
+            self.assertEqual(await anext(content), b'retry: 5000\n\n')
+            self.assertEqual(broker.subscriber_count(), 1)
+            broker.dispatch({'type': 'task.updated', 'task': 5, 'id': 5, 'users': [self.user.pk]})
+            self.assertEqual(
+                await anext(content),
+                b'event: task.updated\ndata: {"type":"task.updated","task":5,"id":5}\n\n',
+            )
+
+    async def test_token_in_query_string(self):
+        broker = Broker()
+        with mock.patch('tasks.events.broker', broker):
+            response = await self.async_client.get(self.url, {'token': self.token})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(await anext(aiter(response.streaming_content)), b'retry: 5000\n\n')
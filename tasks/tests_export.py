@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskComment, ChecklistItem
+from tasks.serializers import ChecklistItemSerializer, TaskCommentSerializer
+import datetime
+
+
+class TaskExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='exporter', password='12345', email='e@example.com')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.tasks = [
+            Task.objects.create(
+                title=f'Task {index}',
+                description='Line one\nline "two", with commas',
+                due_date=timezone.now() + datetime.timedelta(days=index),
+                status='DONE' if index % 2 else 'TODO',
+                owner=cls.user,
+                assigned_to=cls.user,
+                duration=index,
+            )
+            for index in range(5)
+        ]
+        Task.objects.create(title='Hidden', due_date=timezone.now(), owner=cls.other, assigned_to=cls.other)
+        cls.item = ChecklistItem.objects.create(task=cls.tasks[0], text='Step', position=1)
+        cls.comment = TaskComment.objects.create(task=cls.tasks[0], author=cls.other, content='Nice')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task-export')
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('filename="tasks.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual([row['title'] for row in rows], [f'Task {index}' for index in range(4, -1, -1)])
+        self.assertEqual(rows[-1]['description'], 'Line one\nline "two", with commas')
+        self.assertNotIn('checklist_items', rows[0])
+
+    def test_csv_is_the_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+
+    def test_ndjson_with_children_matches_the_serializers(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'include': 'checklist_items,comments', 'status': 'TODO'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        tasks = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([task['title'] for task in tasks], ['Task 4', 'Task 2', 'Task 0'])
+        first = tasks[-1]
+        self.assertEqual(first['checklist_items'], [ChecklistItemSerializer(self.item).data])
+        self.assertEqual(first['comments'], [TaskCommentSerializer(self.comment).data])
+        self.assertEqual(tasks[0]['comments'], [])
+        self.assertNotIn('owner_details', first)
+
+    def test_children_are_loaded_per_chunk(self):
+        with mock.patch('tasks.export.EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(self.url, {'format': 'ndjson', 'include': 'comments'})
+            with CaptureQueriesContext(connection) as queries:
+                lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 5)
+        # The task rows, then one comments query for each of the three chunks
+        comment_queries = [query for query in queries if 'tasks_taskcomment' in query['sql']]
+        self.assertEqual(len(comment_queries), 3)
+        self.assertEqual(len(queries), 4)
+
+    def test_unknown_include(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'include': 'attachments'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('include', json.loads(response.content))
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
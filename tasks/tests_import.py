@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import ChecklistItem, DependencyPath, Task, TaskDependency, TaskTag
+
+
+def ndjson(*lines):
+    return ''.join(json.dumps(line) + '\n' for line in lines).encode('utf-8')
+
+
+class TaskImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='importer', password='12345')
+        cls.helper = User.objects.create_user(username='helper', password='12345')
+        cls.stranger = User.objects.create_user(username='stranger', password='12345')
+        cls.existing = Task.objects.create(
+            title='Existing', due_date='2030-01-01T00:00:00Z', owner=cls.user, assigned_to=cls.user,
+        )
+        cls.hidden = Task.objects.create(
+            title='Hidden', due_date='2030-01-01T00:00:00Z', owner=cls.stranger, assigned_to=cls.stranger,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task-import')
+
+    def task(self, title, **fields):
+        return {'title': title, 'due_date': '2030-02-01T00:00:00Z', 'assigned_to': self.user.pk, **fields}
+
+    def post(self, body, content_type='application/x-ndjson', **params):
+        url = self.url + ('?' + '&'.join(f'{key}={value}' for key, value in params.items()) if params else '')
+        return self.client.post(url, body, content_type=content_type)
+
+    def test_ndjson_with_checklists_tags_and_dependencies(self):
+        body = ndjson(
+            self.task('Deploy', ref='deploy', depends_on=['build', self.existing.pk], tags_list=['ops']),
+            self.task('Build', ref='build', assigned_to=self.helper.pk, checklist_items=[
+                'Compile', {'text': 'Test', 'is_completed': True},
+            ]),
+        )
+        response = self.post(body)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data, {'created': 2, 'checklist_items': 2, 'dependencies': 2, 'errors': []})
+
+        deploy = Task.objects.get(title='Deploy')
+        build = Task.objects.get(title='Build')
+        self.assertEqual(deploy.owner, self.user)
+        self.assertEqual(build.assigned_to, self.helper)
+        self.assertEqual(list(TaskTag.objects.filter(task=deploy).values_list('tag__name', flat=True)), ['ops'])
+        self.assertEqual(
+            list(build.checklist_items.values_list('text', 'is_completed')), [('Compile', False), ('Test', True)]
+        )
+        self.assertEqual(
+            set(deploy.dependencies.values_list('depends_on_id', flat=True)), {build.pk, self.existing.pk}
+        )
+        self.assertTrue(TaskDependency.creates_cycle(build, deploy))
+        self.assertTrue(DependencyPath.objects.filter(ancestor=build, descendant=deploy).exists())
+
+        # The counters match what the model signals would have stored
+        self.existing.refresh_from_db()
+        self.assertEqual((deploy.active_blockers, build.active_dependents, self.existing.active_dependents), (2, 1, 1))
+        self.assertEqual((build.checklist_total, build.checklist_completed), (2, 1))
+        drifted = [
+            task for task in Task.objects.with_live_counts()
+            if any(getattr(task, name) != getattr(task, f'live_{name}') for name in Task.COUNTER_FIELDS)
+        ]
+        self.assertEqual(drifted, [])
+
+    def test_csv(self):
+        body = (
+            'title,due_date,assigned_to,priority,tags,checklist_items,depends_on,ref\n'
+            f'"Write, review",2030-02-01T00:00:00Z,{self.user.pk},HIGH,"docs, api","[""Draft""]",,w\n'
+            f'Publish,2030-02-02T00:00:00Z,{self.user.pk},,,,"[""w""]",\n'
+        ).encode('utf-8')
+        response = self.post(body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        write = Task.objects.get(title='Write, review')
+        self.assertEqual((write.priority, write.get_tags_list()), ('HIGH', ['docs', 'api']))
+        self.assertEqual(Task.objects.get(title='Publish').priority, 'MEDIUM')
+        self.assertEqual(write.checklist_items.get().text, 'Draft')
+        self.assertEqual(write.active_dependents, 1)
+
+    def test_any_failing_line_writes_nothing(self):
+        body = ndjson(
+            self.task('Fine', checklist_items=['Step']),
+            {'title': 'No due date', 'assigned_to': self.user.pk},
+            self.task('Bad user', assigned_to=999999),
+        ) + b'not json\n'
+        response = self.post(body)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3, 4])
+        self.assertIn('due_date', response.data['errors'][0]['errors'])
+        self.assertIn('assigned_to', response.data['errors'][1]['errors'])
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertFalse(ChecklistItem.objects.exists())
+
+    def test_dependency_errors(self):
+        body = ndjson(
+            self.task('A', ref='a', depends_on=['c']),
+            self.task('B', ref='b', depends_on=['a']),
+            self.task('C', ref='c', depends_on=['b']),
+            self.task('After the cycle', depends_on=['c']),
+            self.task('Unknown', depends_on=['nope', self.hidden.pk]),
+            self.task('Self', ref='self', depends_on=['self']),
+        )
+        response = self.post(body)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = {error['line']: error['errors'] for error in response.data['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 5, 6])
+        self.assertEqual(errors[1], {'depends_on': ['Creates a dependency cycle.']})
+        self.assertIn('depends_on', errors[5])
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_duplicate_ref(self):
+        response = self.post(ndjson(self.task('One', ref='x'), self.task('Two', ref='x')))
+        self.assertEqual(response.data['errors'], [{'line': 2, 'errors': {'ref': ['Already used on line 1.']}}])
+
+    def test_dry_run(self):
+        response = self.post(ndjson(self.task('Maybe', checklist_items=['Step'])), dry_run=1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(Task.objects.filter(title='Maybe').exists())
+
+    def test_queries_per_chunk(self):
+        lines = [self.task(f'Task {index}', checklist_items=['Step']) for index in range(6)]
+        with mock.patch('tasks.imports.IMPORT_CHUNK_SIZE', 3):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(ndjson(*lines))
+        self.assertEqual(response.data['created'], 6)
+        task_inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tasks_task"')]
+        item_inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "tasks_checklistitem"')]
+        self.assertEqual((len(task_inserts), len(item_inserts)), (2, 2))
+
+    def test_unsupported_media_type(self):
+        response = self.client.post(self.url, {'title': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.ndjson', delete=False) as upload:
+            upload.write(ndjson(self.task('From a file', checklist_items=['Step'])))
+        self.addCleanup(os.unlink, upload.name)
+        out = StringIO()
+        call_command('import_tasks', upload.name, user='importer', stdout=out)
+        self.assertIn('Imported 1 tasks, 1 checklist items and 0 dependencies', out.getvalue())
+        self.assertTrue(Task.objects.filter(title='From a file', owner=self.user).exists())
+
+        with open(upload.name, 'wb') as broken:
+            broken.write(b'{"title": "Half"}\n')
+        with self.assertRaises(CommandError):
+            call_command('import_tasks', upload.name, user='importer', stdout=StringIO(), stderr=StringIO())
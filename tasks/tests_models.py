@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from tasks.models import Task, ChecklistItem, TaskDependency
+from tasks.models import Task, ChecklistItem, TaskDependency, Tag, TaskTag
 import datetime
 
 class TaskModelTest(TestCase):
@@ -122,6 +122,52 @@ class TaskModelTest(TestCase):
         self.assertEqual(task.tags, "")
         self.assertEqual(task.get_tags_list(), [])
 
+class TagModelTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='tagger', password='12345')
+    
+    def make_task(self, tags):
+        return Task.objects.create(
+            title='Tagged task',
+            due_date=timezone.now() + timezone.timedelta(days=1),
+            owner=self.user,
+            assigned_to=self.user,
+            tags=tags
+        )
+    
+    def tag_names(self, task):
+        return set(task.tag_set.values_list('name', flat=True))
+    
+    def test_tags_mirrored_on_create(self):
+        task = self.make_task('Backend, API ,,urgent')
+        self.assertEqual(self.tag_names(task), {'backend', 'api', 'urgent'})
+    
+    def test_tags_resynced_on_change(self):
+        task = self.make_task('backend,api')
+        task.set_tags_list(['api', 'frontend'])
+        task.save()
+        self.assertEqual(self.tag_names(task), {'api', 'frontend'})
+        
+        task.set_tags_list([])
+        task.save()
+        self.assertEqual(self.tag_names(task), set())
+        self.assertEqual(Tag.objects.filter(name='backend').count(), 1)
+    
+    def test_unchanged_tags_skip_sync(self):
+        task = self.make_task('backend')
+        task = Task.objects.get(pk=task.pk)
+        task.title = 'Renamed'
+        with self.assertNumQueries(1):
+            task.save()
+    
+    def test_tags_shared_between_tasks(self):
+        self.make_task('api')
+        self.make_task('API')
+        self.assertEqual(Tag.objects.filter(name='api').count(), 1)
+        self.assertEqual(TaskTag.objects.filter(tag__name='api').count(), 2)
+
+
 class ChecklistItemModelTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -0,0 +1,87 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskComment, ChecklistItem
+import datetime
+
+
+class KeysetPaginationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pager', password='12345', email='pager@example.com')
+        now = timezone.now()
+        cls.tasks = []
+        for i in range(7):
+            cls.tasks.append(Task.objects.create(
+                title=f'Task {i}',
+                due_date=now + datetime.timedelta(days=i % 3),
+                priority=['LOW', 'MEDIUM', 'HIGH'][i % 3],
+                duration=None if i % 2 else float(i),
+                owner=cls.user,
+                assigned_to=cls.user,
+            ))
+        # Identical timestamps must still page deterministically on the id tie-breaker
+        Task.objects.filter(id__in=[t.id for t in cls.tasks[:4]]).update(created_at=now)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def collect(self, url):
+        """Follow ``next`` links and return the ids of every page."""
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_unpaginated_by_default(self):
+        response = self.client.get(reverse('task-list'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_pages_match_unpaginated_order(self):
+        for ordering in ['', '-created_at', 'due_date', '-priority', 'duration', '-duration']:
+            query = f'?ordering={ordering}' if ordering else ''
+            expected = [row['id'] for row in self.client.get(reverse('task-list') + query).data]
+            sep = '&' if query else '?'
+            paged = self.collect(f"{reverse('task-list')}{query}{sep}page_size=3")
+            self.assertEqual(sorted(paged), sorted(expected), ordering)
+            self.assertEqual(len(paged), len(set(paged)), ordering)
+            if ordering in ('', '-created_at'):
+                self.assertEqual(paged, sorted(expected, key=lambda pk: (
+                    -Task.objects.get(pk=pk).created_at.timestamp(), -pk)))
+
+    def test_cursor_survives_inserts(self):
+        first = self.client.get(f"{reverse('task-list')}?page_size=3")
+        seen = [row['id'] for row in first.data['results']]
+        Task.objects.create(
+            title='Newest', due_date=timezone.now(), owner=self.user, assigned_to=self.user
+        )
+        rest = self.collect(first.data['next'])
+        self.assertEqual(len(seen) + len(rest), 7)
+        self.assertFalse(set(seen) & set(rest))
+
+    def test_cursor_bound_to_ordering(self):
+        first = self.client.get(f"{reverse('task-list')}?page_size=3")
+        cursor = first.data['next'].split('cursor=')[1]
+        response = self.client.get(f"{reverse('task-list')}?ordering=due_date&cursor={cursor}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f"{reverse('task-list')}?cursor=garbage")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_nested_collections(self):
+        task = self.tasks[0]
+        for i in range(5):
+            TaskComment.objects.create(task=task, author=self.user, content=f'Comment {i}')
+            ChecklistItem.objects.create(task=task, text=f'Item {i}', position=5 - i)
+        comments = self.collect(f"{reverse('task-comment-list', kwargs={'task_pk': task.id})}?page_size=3")
+        self.assertEqual(comments, list(task.comments.values_list('id', flat=True)))
+        items = self.collect(f"{reverse('task-checklist-list', kwargs={'task_pk': task.id})}?page_size=3")
+        self.assertEqual(items, list(task.checklist_items.values_list('id', flat=True)))
@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskComment, ChecklistItem, TaskDependency
+import datetime
+
+
+class QueryCountRegressionTest(TestCase):
+    """
+    Guards against N+1 regressions: every list endpoint must issue the same
+    number of queries no matter how many rows it returns.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', password='12345', email='owner@example.com')
+        cls.other = User.objects.create_user(username='other', password='12345', email='other@example.com')
+        cls.root = cls.make_task('Root task')
+
+    @classmethod
+    def make_task(cls, title):
+        return Task.objects.create(
+            title=title,
+            description='Query count test',
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=cls.user,
+            assigned_to=cls.other,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def add_rows(self, count):
+        """Add ``count`` tasks wired to the root task through every relation."""
+        for i in range(count):
+            task = self.make_task(f'Task {Task.objects.count()}')
+            ChecklistItem.objects.create(task=task, text='Step', position=1, is_completed=bool(i % 2))
+            ChecklistItem.objects.create(task=task, text='Step', position=2)
+            ChecklistItem.objects.create(task=self.root, text=f'Root step {i}', position=i)
+            TaskComment.objects.create(task=self.root, author=self.user, content=f'Comment {i}')
+            TaskDependency.objects.create(task=self.root, depends_on=task, created_by=self.user)
+            blocked = self.make_task(f'Blocked {i}')
+            TaskDependency.objects.create(task=blocked, depends_on=self.root, created_by=self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, url, max_queries):
+        # max_queries includes the ETag validator query (see tasks.conditional)
+        self.add_rows(2)
+        small = self.count_queries(url)
+        self.add_rows(10)
+        large = self.count_queries(url)
+        self.assertEqual(small, large, f'{url} issues queries per row')
+        self.assertLessEqual(large, max_queries)
+
+    def test_task_list(self):
+        self.assertConstantQueries(reverse('task-list'), 3)
+
+    def test_task_detail(self):
+        self.assertConstantQueries(reverse('task-detail', args=[self.root.id]), 3)
+
+    def test_task_blockers(self):
+        self.assertConstantQueries(reverse('task-blockers', args=[self.root.id]), 3)
+
+    def test_task_blocked(self):
+        self.assertConstantQueries(reverse('task-blocked', args=[self.root.id]), 3)
+
+    def test_task_blockers_transitive(self):
+        # One more than the direct list: the recursive walk
+        self.assertConstantQueries(reverse('task-blockers', args=[self.root.id]) + '?depth=all', 4)
+
+    def test_comment_list(self):
+        self.assertConstantQueries(reverse('task-comment-list', kwargs={'task_pk': self.root.id}), 3)
+
+    def test_checklist_list(self):
+        self.assertConstantQueries(reverse('task-checklist-list', kwargs={'task_pk': self.root.id}), 3)
+
+    def test_dependency_list(self):
+        self.assertConstantQueries(reverse('task-dependency-list', kwargs={'task_pk': self.root.id}), 7)
+
+
+class QueryPlanTest(TestCase):
+    """The task API's querysets must be served from indexes, never full scans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='12345')
+        for i in range(3):
+            Task.objects.create(
+                title=f'Release step {i}',
+                due_date=timezone.now() + datetime.timedelta(days=i),
+                owner=cls.user,
+                assigned_to=cls.user,
+                tags='backend',
+            )
+
+    def test_no_full_table_scans(self):
+        out = StringIO()
+        call_command('explain_task_queries', user='planner', strict=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn('No full table scans', output)
+        self.assertIn('task_owner_status_idx', output)
+        self.assertIn('task_assignee_status_idx', output)
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.graph import DependencyCycleError, schedule
+from tasks.models import Task, TaskDependency
+import datetime
+
+
+class CriticalPathTest(SimpleTestCase):
+    def test_diamond(self):
+        # 1 -> 2 -> 4 and 1 -> 3 -> 4, with 3 the longer branch
+        durations = {1: 2.0, 2: 1.0, 3: 4.0, 4: 0.5}
+        timings, path, total = schedule(durations, [(1, 2), (1, 3), (2, 4), (3, 4)])
+        self.assertEqual(total, 6.5)
+        self.assertEqual(path, [1, 3, 4])
+        self.assertEqual(timings[2], (2.0, 3.0, 5.0, 6.0, 3.0))
+        self.assertEqual(timings[4], (6.0, 6.5, 6.0, 6.5, 0.0))
+        self.assertEqual(list(timings), [1, 2, 3, 4])
+
+    def test_independent_tasks(self):
+        timings, path, total = schedule({1: 3.0, 2: 1.0}, [])
+        self.assertEqual(total, 3.0)
+        self.assertEqual(path, [1])
+        self.assertEqual(timings[2][4], 2.0)
+
+    def test_empty(self):
+        self.assertEqual(schedule({}, []), ({}, [], 0.0))
+
+    def test_cycle(self):
+        with self.assertRaises(DependencyCycleError) as raised:
+            schedule({1: 1.0, 2: 1.0, 3: 1.0}, [(1, 2), (2, 3), (3, 2)])
+        self.assertEqual(sorted(raised.exception.task_ids), [2, 3])
+
+
+class ScheduleEndpointTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', password='12345')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.design = cls.make_task('Design', 3, cls.user)
+        cls.build = cls.make_task('Build', 5, cls.user)
+        cls.docs = cls.make_task('Docs', 1, cls.user)
+        cls.hidden = cls.make_task('Hidden', 100, cls.other)
+        for task, depends_on in ((cls.build, cls.design), (cls.docs, cls.design), (cls.build, cls.hidden)):
+            TaskDependency.objects.create(task=task, depends_on=depends_on, created_by=cls.user)
+
+    @classmethod
+    def make_task(cls, title, duration, user):
+        return Task.objects.create(
+            title=title,
+            duration=duration,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=user,
+            assigned_to=user,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get_schedule(self):
+        response = self.client.get(reverse('task-schedule'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_schedule(self):
+        data = self.get_schedule().data
+        # Dependencies on tasks the user can't see are left out
+        self.assertEqual(data['total_duration'], 8.0)
+        self.assertEqual(data['critical_path'], [self.design.id, self.build.id])
+        docs = next(row for row in data['tasks'] if row['id'] == self.docs.id)
+        self.assertEqual(
+            (docs['earliest_start'], docs['latest_start'], docs['slack']), (3.0, 7.0, 4.0)
+        )
+
+    def test_completed_tasks_take_no_time(self):
+        Task.objects.filter(pk=self.design.pk).update(status='DONE')
+        data = self.get_schedule().data
+        self.assertEqual(data['total_duration'], 5.0)
+
+    def test_cached_until_durations_change(self):
+        self.assertEqual(self.get_schedule()['X-Cache'], 'MISS')
+        self.assertEqual(self.get_schedule()['X-Cache'], 'HIT')
+        self.build.duration = 10
+        self.build.save()
+        response = self.get_schedule()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['total_duration'], 13.0)
+        TaskDependency.objects.get(task=self.build, depends_on=self.design).delete()
+        response = self.get_schedule()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['critical_path'], [self.build.id])
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, TaskComment
+from tasks.search import FTS_TABLE, build_match_query
+import datetime
+import io
+
+
+class FullTextSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='searcher', password='12345')
+        cls.other = User.objects.create_user(username='stranger', password='12345')
+        due = timezone.now() + datetime.timedelta(days=1)
+        cls.title_hit = Task.objects.create(
+            title='Deploy pipeline', description='CI work', due_date=due, owner=cls.user, assigned_to=cls.user
+        )
+        cls.body_hit = Task.objects.create(
+            title='Cleanup', description='Remove the old deployment scripts', due_date=due,
+            owner=cls.user, assigned_to=cls.user
+        )
+        cls.tagged = Task.objects.create(
+            title='Metrics', description='Dashboards', due_date=due, owner=cls.user, assigned_to=cls.user,
+            tags='observability,grafana'
+        )
+        cls.hidden = Task.objects.create(
+            title='Deploy secrets', due_date=due, owner=cls.other, assigned_to=cls.other
+        )
+        TaskComment.objects.create(task=cls.tagged, author=cls.user, content='Needs a kubernetes exporter')
+    
+    def setUp(self):
+        # Rolled-back writes from other tests don't bump cache generations
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+    
+    def search(self, query):
+        response = self.client.get(f"{reverse('task-list')}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_ranked_prefix_search(self):
+        results = self.search('search=deploy')
+        self.assertEqual([task['id'] for task in results], [self.title_hit.id, self.body_hit.id])
+        self.assertIn('<mark>Deploy</mark>', results[0]['search_snippet'])
+    
+    def test_snippet_escapes_the_task_text(self):
+        task = Task.objects.create(
+            title='<script>alert(1)</script> rollout', due_date=self.title_hit.due_date,
+            owner=self.user, assigned_to=self.user
+        )
+        results = self.search('search=rollout')
+        self.assertEqual([t['id'] for t in results], [task.id])
+        self.assertEqual(
+            results[0]['search_snippet'], '&lt;script&gt;alert(1)&lt;/script&gt; <mark>rollout</mark>'
+        )
+    
+    def test_all_terms_must_match(self):
+        self.assertEqual([t['id'] for t in self.search('search=remove deploy')], [self.body_hit.id])
+        self.assertEqual(self.search('search=remove grafana'), [])
+    
+    def test_tags_and_comments(self):
+        self.assertEqual([t['id'] for t in self.search('search=grafana')], [self.tagged.id])
+        self.assertEqual(self.search('search=kubernetes'), [])
+        self.assertEqual([t['id'] for t in self.search('search=kubernetes&search_comments=1')], [self.tagged.id])
+    
+    def test_explicit_ordering_wins(self):
+        results = self.search('search=deploy&ordering=created_at')
+        self.assertEqual([task['id'] for task in results], [self.title_hit.id, self.body_hit.id])
+        results = self.search('search=deploy&ordering=-created_at')
+        self.assertEqual([task['id'] for task in results], [self.body_hit.id, self.title_hit.id])
+    
+    def test_paginated_search(self):
+        page = self.client.get(f"{reverse('task-list')}?search=deploy&page_size=1").data
+        self.assertEqual(page['results'][0]['id'], self.title_hit.id)
+        page = self.client.get(page['next']).data
+        self.assertEqual(page['results'][0]['id'], self.body_hit.id)
+        self.assertIsNone(page['next'])
+    
+    def test_index_follows_writes(self):
+        self.title_hit.title = 'Release train'
+        self.title_hit.save()
+        self.assertEqual([t['id'] for t in self.search('search=deploy')], [self.body_hit.id])
+        TaskComment.objects.filter(task=self.tagged).delete()
+        self.assertEqual(self.search('search=kubernetes&search_comments=1'), [])
+        self.body_hit.delete()
+        self.assertEqual(self.search('search=deploy'), [])
+    
+    def test_operators_in_input_are_literal(self):
+        self.assertEqual(self.search('search="deploy" OR NOT -*'), self.search('search=deploy OR NOT'))
+        self.assertEqual(self.search('search=*'), [])
+        self.assertIsNone(build_match_query(['*', '"']))
+    
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.search('search=deploy'), [])
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 4 tasks', out.getvalue())
+        self.assertEqual(len(self.search('search=deploy')), 2)
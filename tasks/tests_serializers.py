@@ -436,4 +436,67 @@ class TaskDependencySerializerTest(TestCase):
         
         serializer = TaskSerializer(self.task1)
         self.assertEqual(serializer.data['blocked_by_count'], 0)
-        self.assertEqual(serializer.data['blocks_count'], 1) 
\ No newline at end of file
+        self.assertEqual(serializer.data['blocks_count'], 1) 
+
+class FastSerializerParityTest(TestCase):
+    """The values()-based list renderer must match TaskSerializer byte for byte."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user1 = User.objects.create_user(username='parity1', password='12345', email='p1@example.com')
+        cls.user2 = User.objects.create_user(username='parity2', password='12345', email='p2@example.com')
+        first = Task.objects.create(
+            title='With everything',
+            description='Has tags, duration, checklist and dependencies',
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            status='IN_PROGRESS',
+            priority='HIGH',
+            owner=cls.user1,
+            assigned_to=cls.user2,
+            tags='backend,api',
+            duration=2.5,
+        )
+        second = Task.objects.create(
+            title='Bare',
+            due_date=timezone.now(),
+            owner=cls.user2,
+            assigned_to=cls.user1,
+            duration=3,
+        )
+        Task.objects.create(
+            title='Nulls',
+            due_date=timezone.now(),
+            owner=cls.user1,
+            assigned_to=cls.user1,
+            tags=None,
+        )
+        ChecklistItem.objects.create(task=first, text='One', position=2, is_completed=True)
+        ChecklistItem.objects.create(task=first, text='Two', position=1)
+        ChecklistItem.objects.create(task=first, text='Three', position=3)
+        TaskDependency.objects.create(task=first, depends_on=second, created_by=cls.user1)
+        TaskDependency.objects.create(task=second, depends_on=first, created_by=cls.user1, active=False)
+
+    def render_both(self, fields=None):
+        from rest_framework.renderers import JSONRenderer
+        from tasks.fast_serializers import task_rows, render_task_rows
+
+        queryset = Task.objects.order_by('id')
+        slow = TaskSerializer(queryset.for_serializer(fields), many=True, fields=fields).data
+        fast = render_task_rows(task_rows(queryset, fields), fields)
+        renderer = JSONRenderer()
+        return renderer.render(slow), renderer.render(fast)
+
+    def test_full_representation(self):
+        slow, fast = self.render_both()
+        self.assertEqual(slow, fast)
+        self.assertIn(b'"checklist_completion": 33', fast)
+
+    def test_sparse_representation(self):
+        for fields in [
+            {'id', 'title', 'status'},
+            {'due_date', 'duration', 'blocks_count', 'blocked_by_count'},
+            {'owner_details', 'checklist_items'},
+            {'title', 'checklist_completion', 'assigned_to_details', 'created_at'},
+        ]:
+            slow, fast = self.render_both(fields)
+            self.assertEqual(slow, fast, fields)
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task
+import datetime
+
+
+class TaskStatsEndpointTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='lead', password='12345')
+        cls.helper = User.objects.create_user(username='helper', password='12345')
+        cls.stranger = User.objects.create_user(username='stranger', password='12345')
+        now = timezone.now()
+        cls.make_task('Overdue', cls.user, cls.user, now - datetime.timedelta(days=1), 'TODO', 'HIGH', 3, 'backend')
+        cls.make_task('Late but done', cls.user, cls.user, now - datetime.timedelta(days=2), 'DONE', 'LOW', 2, 'backend, docs')
+        cls.make_task('Delegated', cls.user, cls.helper, now + datetime.timedelta(days=2), 'IN_PROGRESS', 'HIGH', 5, 'ops')
+        cls.make_task('Unestimated', cls.helper, cls.user, now + datetime.timedelta(days=5), 'TODO', 'MEDIUM', None, '')
+        cls.make_task('Hidden', cls.stranger, cls.stranger, now - datetime.timedelta(days=1), 'TODO', 'HIGH', 40, 'backend')
+
+    @classmethod
+    def make_task(cls, title, owner, assigned_to, due_date, task_status, priority, duration, tags):
+        task = Task.objects.create(
+            title=title,
+            owner=owner,
+            assigned_to=assigned_to,
+            due_date=due_date,
+            status=task_status,
+            priority=priority,
+            duration=duration,
+        )
+        if tags:
+            task.set_tags_list([tag.strip() for tag in tags.split(',')])
+            task.save()
+        return task
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task-stats')
+
+    def test_stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(data['by_status'], {'TODO': 2, 'IN_PROGRESS': 1, 'DONE': 1})
+        self.assertEqual(data['by_priority'], {'LOW': 1, 'MEDIUM': 1, 'HIGH': 2})
+        self.assertEqual(data['overdue'], 1)
+        self.assertEqual(data['estimated_hours'], 10.0)
+        self.assertEqual(data['remaining_hours'], 8.0)
+        self.assertEqual(data['tags'], [
+            {'name': 'backend', 'count': 2},
+            {'name': 'docs', 'count': 1},
+            {'name': 'ops', 'count': 1},
+        ])
+
+        helper, lead = data['workload']
+        self.assertEqual(helper['user'], {'id': self.helper.pk, 'username': 'helper'})
+        self.assertEqual(helper['remaining_hours'], 5.0)
+        self.assertEqual(lead['user']['username'], 'lead')
+        self.assertEqual(lead['total'], 3)
+        self.assertEqual(lead['by_status'], {'TODO': 2, 'IN_PROGRESS': 0, 'DONE': 1})
+        self.assertEqual(lead['overdue'], 1)
+
+    def test_filters_and_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'priority': 'HIGH'})
+        # The user row for authentication is skipped by force_authenticate
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(response.data['by_priority']['HIGH'], 2)
+
+    def test_cached_until_a_task_changes(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+        Task.objects.filter(title='Overdue').get().delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['overdue'], 0)
+
+    def test_no_tasks(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='new', password='12345'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 0)
+        self.assertEqual(response.data['estimated_hours'], 0.0)
+        self.assertEqual(response.data['workload'], [])
+        self.assertEqual(response.data['tags'], [])
@@ -0,0 +1,142 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from tasks.models import Task, ChecklistItem, TaskDependency, Tombstone
+from tasks.sync import make_token
+
+
+@override_settings(TASK_SYNC_OVERLAP=0)
+class DeltaSyncTest(TestCase):
+    """GET /api/sync/ and the tombstones behind it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='syncer', password='12345')
+        cls.other = User.objects.create_user(username='other', password='12345')
+        cls.first = cls.make_task('First')
+        cls.second = cls.make_task('Second')
+        cls.item = ChecklistItem.objects.create(task=cls.first, text='Step')
+        cls.dependency = TaskDependency.objects.create(task=cls.second, depends_on=cls.first, created_by=cls.user)
+
+    @classmethod
+    def make_task(cls, title, owner=None):
+        return Task.objects.create(
+            title=title,
+            due_date=timezone.now() + datetime.timedelta(days=3),
+            owner=owner or cls.user,
+            assigned_to=owner or cls.user,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, token=None, expected=status.HTTP_200_OK):
+        query = {'since': token} if token else {}
+        response = self.client.get(reverse('sync'), query)
+        self.assertEqual(response.status_code, expected)
+        return response.data
+
+    def test_full_sync(self):
+        data = self.sync()
+        self.assertTrue(data['full'])
+        self.assertEqual({task['title'] for task in data['tasks']}, {'First', 'Second'})
+        self.assertNotIn('checklist_items', data['tasks'][0])
+        self.assertEqual([item['id'] for item in data['checklist_items']], [self.item.id])
+        self.assertEqual([dependency['id'] for dependency in data['dependencies']], [self.dependency.id])
+        self.assertEqual(data['deleted'], {'tasks': [], 'checklist_items': [], 'dependencies': []})
+
+    def test_only_changes_since_token(self):
+        token = self.sync()['token']
+        data = self.sync(token)
+        self.assertFalse(data['full'])
+        self.assertEqual((data['tasks'], data['checklist_items'], data['dependencies']), ([], [], []))
+
+        self.item.is_completed = True
+        self.item.save()
+        data = self.sync(token)
+        # The item's task is touched, and sent along with its items
+        self.assertEqual([task['id'] for task in data['tasks']], [self.first.id])
+        self.assertEqual([item['is_completed'] for item in data['checklist_items']], [True])
+        self.assertEqual([dependency['id'] for dependency in data['dependencies']], [self.dependency.id])
+
+        self.assertEqual(self.sync(data['token'])['tasks'], [])
+
+    def test_deletions(self):
+        token = self.sync()['token']
+        item_id, second_id = self.item.id, self.second.id
+        self.item.delete()
+        self.second.delete()
+        data = self.sync(token)
+        self.assertEqual(data['deleted'], {
+            'tasks': [second_id],
+            'checklist_items': [item_id],
+            'dependencies': [self.dependency.id],
+        })
+        self.assertEqual([task['id'] for task in data['tasks']], [self.first.id])
+
+    def test_reassigned_away(self):
+        token = self.sync()['token']
+        self.second.owner = self.second.assigned_to = self.other
+        self.second.save()
+        self.assertEqual(self.sync(token)['deleted']['tasks'], [self.second.id])
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual([task['id'] for task in self.sync()['tasks']], [self.second.id])
+
+    def test_dependencies_need_both_ends_visible(self):
+        hidden = self.make_task('Hidden', owner=self.other)
+        TaskDependency.objects.create(task=self.first, depends_on=hidden, created_by=self.other, notes='Secret')
+        data = self.sync()
+        self.assertEqual([dependency['id'] for dependency in data['dependencies']], [self.dependency.id])
+
+        token = data['token']
+        self.second.owner = self.second.assigned_to = self.other
+        self.second.save()
+        data = self.sync(token)
+        self.assertEqual(data['dependencies'], [])
+        self.assertEqual(data['deleted']['dependencies'], [self.dependency.id])
+
+        # Coming back into view sends it again instead
+        self.second.assigned_to = self.user
+        self.second.save()
+        data = self.sync(token)
+        self.assertEqual([dependency['id'] for dependency in data['dependencies']], [self.dependency.id])
+        self.assertEqual(data['deleted'], {'tasks': [], 'checklist_items': [], 'dependencies': []})
+
+    def test_reassigned_away_in_bulk(self):
+        token = self.sync()['token']
+        response = self.client.post(reverse('task-bulk'), {'operations': [
+            {'op': 'update', 'id': self.second.id, 'data': {'assigned_to': self.other.id}},
+            {'op': 'update', 'id': self.first.id, 'data': {'assigned_to': self.other.id}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Still the owner of both
+        self.assertEqual(self.sync(token)['deleted']['tasks'], [])
+        self.client.force_authenticate(user=self.other)
+        token = self.sync()['token']
+        self.client.force_authenticate(user=self.user)
+        self.client.post(reverse('task-bulk'), {'operations': [
+            {'op': 'update', 'id': self.second.id, 'data': {'assigned_to': self.user.id}},
+        ]}, format='json')
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.sync(token)['deleted']['tasks'], [self.second.id])
+
+    def test_bad_tokens(self):
+        self.sync('not-a-token', status.HTTP_400_BAD_REQUEST)
+        expired = make_token(timezone.now() - datetime.timedelta(days=31))
+        self.sync(expired, status.HTTP_410_GONE)
+
+    def test_prune_tombstones(self):
+        self.item.delete()
+        later = timezone.now() + datetime.timedelta(days=31)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            call_command('prune_tombstones', stdout=StringIO())
+        self.assertFalse(Tombstone.objects.exists())
@@ -1,4 +1,6 @@
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -245,8 +247,8 @@ class ChecklistItemViewSetTest(TestCase):
         self.assertEqual(response.data['text'], 'New checklist item')
         self.assertEqual(response.data['is_completed'], False)
         
-        # Check that position is automatically set to 3 (after existing items)
-        self.assertEqual(response.data['position'], 3)
+        # Check that position is automatically set one gap after the last item
+        self.assertEqual(response.data['position'], 2 + ChecklistItem.POSITION_GAP)
         
         # Verify it's in the database
         self.assertTrue(ChecklistItem.objects.filter(id=response.data['id']).exists())
@@ -332,14 +334,73 @@ class ChecklistItemViewSetTest(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         
-        # Verify the new order in the database
+        # Verify the new order in the database (positions are spaced POSITION_GAP apart)
+        gap = ChecklistItem.POSITION_GAP
         items = ChecklistItem.objects.filter(task=self.task).order_by('position')
         self.assertEqual(items[0].id, item3.id)
-        self.assertEqual(items[0].position, 1)
+        self.assertEqual(items[0].position, gap)
         self.assertEqual(items[1].id, self.item1.id)
-        self.assertEqual(items[1].position, 2)
+        self.assertEqual(items[1].position, 2 * gap)
         self.assertEqual(items[2].id, self.item2.id)
-        self.assertEqual(items[2].position, 3)
+        self.assertEqual(items[2].position, 3 * gap)
+    
+    def test_reorder_is_one_update(self):
+        """Test that reordering writes every moved item in a single UPDATE."""
+        for i in range(20):
+            ChecklistItem.objects.create(task=self.task, text=f'Step {i}', position=10 + i)
+        ids = list(ChecklistItem.objects.filter(task=self.task).values_list('id', flat=True))
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('task-checklist-reorder', kwargs={'task_pk': self.task.id})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, {'order': list(reversed(ids))}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data], list(reversed(ids)))
+        updates = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE "tasks_checklistitem"')]
+        self.assertEqual(len(updates), 1)
+    
+    def test_move_checklist_item(self):
+        """Test that moving an item between two others writes only that item."""
+        item3 = ChecklistItem.objects.create(task=self.task, text='Third step', position=3000)
+        self.item1.position, self.item2.position = 1000, 2000
+        ChecklistItem.objects.bulk_update([self.item1, self.item2], ['position'])
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('task-checklist-move', kwargs={'task_pk': self.task.id, 'pk': item3.id})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, {'after': self.item1.id}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['position'], 1500)
+        updates = [q['sql'] for q in context.captured_queries if q['sql'].startswith('UPDATE "tasks_checklistitem"')]
+        self.assertEqual(len(updates), 1)
+        order = list(ChecklistItem.objects.filter(task=self.task).values_list('id', flat=True))
+        self.assertEqual(order, [self.item1.id, item3.id, self.item2.id])
+        
+        # To the top
+        response = self.client.post(url, {'after': None}, format='json')
+        self.assertEqual(response.data['position'], 500)
+    
+    def test_move_renumbers_when_out_of_room(self):
+        """Test that adjacent positions are re-spaced when there is no gap left."""
+        item3 = ChecklistItem.objects.create(task=self.task, text='Third step', position=3)
+        
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('task-checklist-move', kwargs={'task_pk': self.task.id, 'pk': item3.id})
+        response = self.client.post(url, {'after': self.item1.id}, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        gap = ChecklistItem.POSITION_GAP
+        positions = list(ChecklistItem.objects.filter(task=self.task).values_list('id', 'position'))
+        self.assertEqual(positions, [(self.item1.id, gap), (item3.id, 2 * gap), (self.item2.id, 3 * gap)])
+    
+    def test_move_requires_known_anchor(self):
+        """Test that moving after a missing item is rejected."""
+        self.client.force_authenticate(user=self.user1)
+        url = reverse('task-checklist-move', kwargs={'task_pk': self.task.id, 'pk': self.item1.id})
+        self.assertEqual(self.client.post(url, {'after': self.item1.id}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
     
     def test_unauthenticated_access(self):
         """Test that unauthenticated users cannot access checklist items."""
@@ -577,4 +638,238 @@ class TaskDependencyViewSetTest(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['id'], self.task2.id) 
\ No newline at end of file
+        self.assertEqual(response.data[0]['id'], self.task2.id) 
+
+class TaskSparseFieldsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='sparse', password='12345', email='sparse@example.com')
+        cls.task = Task.objects.create(
+            title='Board task',
+            due_date=timezone.now() + datetime.timedelta(days=2),
+            owner=cls.user,
+            assigned_to=cls.user
+        )
+        ChecklistItem.objects.create(task=cls.task, text='Step', position=1)
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+    
+    def test_default_response_unchanged(self):
+        response = self.client.get(reverse('task-list'))
+        self.assertIn('owner_details', response.data[0])
+        self.assertIn('checklist_items', response.data[0])
+    
+    def test_fields_selects_columns(self):
+        url = f"{reverse('task-list')}?fields=id,title,status,priority,due_date"
+        # The ETag validator aggregate, then the narrow SELECT
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'title', 'status', 'priority', 'due_date'})
+    
+    def test_expand_adds_relations(self):
+        response = self.client.get(f"{reverse('task-list')}?fields=id,checklist_completion&expand=checklist_items")
+        self.assertEqual(set(response.data[0]), {'id', 'checklist_completion', 'checklist_items'})
+        self.assertEqual(len(response.data[0]['checklist_items']), 1)
+    
+    def test_expand_without_fields_is_lean(self):
+        response = self.client.get(f"{reverse('task-detail', args=[self.task.id])}?expand=owner_details")
+        self.assertIn('owner_details', response.data)
+        self.assertIn('blocks_count', response.data)
+        self.assertNotIn('assigned_to_details', response.data)
+        self.assertNotIn('checklist_items', response.data)
+    
+    def test_unknown_fields_rejected(self):
+        response = self.client.get(f"{reverse('task-list')}?fields=id,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f"{reverse('task-list')}?expand=title")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_writes_ignore_fields(self):
+        url = f"{reverse('task-detail', args=[self.task.id])}?fields=id"
+        response = self.client.patch(url, {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['title'], 'Renamed')
+
+
+class TaskTagFilterTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='tagfilter', password='12345')
+        due = timezone.now() + datetime.timedelta(days=1)
+        cls.api = Task.objects.create(title='API', due_date=due, owner=cls.user, assigned_to=cls.user, tags='api,backend')
+        cls.rapid = Task.objects.create(title='Rapid', due_date=due, owner=cls.user, assigned_to=cls.user, tags='rapid')
+        cls.both = Task.objects.create(title='Both', due_date=due, owner=cls.user, assigned_to=cls.user, tags='API, frontend')
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+    
+    def titles(self, query):
+        response = self.client.get(f"{reverse('task-list')}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {task['title'] for task in response.data}
+    
+    def test_exact_match(self):
+        self.assertEqual(self.titles('tag=api'), {'API', 'Both'})
+        self.assertEqual(self.titles('tag=rap'), set())
+    
+    def test_any_and_all(self):
+        self.assertEqual(self.titles('tag=backend&tag=frontend'), {'API', 'Both'})
+        self.assertEqual(self.titles('tag=api&tag=frontend&tag_mode=all'), {'Both'})
+    
+    def test_tags_list_write(self):
+        response = self.client.patch(
+            reverse('task-detail', args=[self.rapid.id]), {'tags_list': ['api', 'ops']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['tags'], 'api,ops')
+        self.assertEqual(self.titles('tag=ops'), {'Rapid'})
+
+
+class TransitiveDependencyViewTest(TestCase):
+    """?depth= on the blockers/blocked endpoints."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='walker', password='12345')
+        due = timezone.now() + datetime.timedelta(days=1)
+        # deploy depends on test and docs, test depends on build
+        cls.build, cls.test, cls.docs, cls.deploy = (
+            Task.objects.create(title=title, due_date=due, owner=cls.user, assigned_to=cls.user)
+            for title in ('Build', 'Test', 'Docs', 'Deploy')
+        )
+        for task, depends_on in ((cls.test, cls.build), (cls.deploy, cls.test), (cls.deploy, cls.docs)):
+            TaskDependency.objects.create(task=task, depends_on=depends_on, created_by=cls.user)
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+    
+    def walk(self, name, task, query=''):
+        response = self.client.get(f"{reverse(f'task-{name}', args=[task.id])}?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_direct_neighbours_by_default(self):
+        data = self.walk('blockers', self.deploy)
+        self.assertEqual({task['title'] for task in data}, {'Test', 'Docs'})
+        self.assertNotIn('depth', data[0])
+    
+    def test_all_levels(self):
+        data = self.walk('blockers', self.deploy, 'depth=all&fields=id,title')
+        self.assertEqual(
+            [(task['title'], task['depth'], task['path']) for task in data],
+            [
+                ('Test', 1, [self.deploy.id, self.test.id]),
+                ('Docs', 1, [self.deploy.id, self.docs.id]),
+                ('Build', 2, [self.deploy.id, self.test.id, self.build.id]),
+            ],
+        )
+        data = self.walk('blocked', self.build, 'depth=all')
+        self.assertEqual([(task['title'], task['depth']) for task in data], [('Test', 1), ('Deploy', 2)])
+    
+    def test_depth_limit(self):
+        data = self.walk('blocked', self.build, 'depth=1')
+        self.assertEqual([(task['title'], task['path']) for task in data], [('Test', [self.build.id, self.test.id])])
+    
+    def test_inactive_dependencies_are_not_followed(self):
+        TaskDependency.objects.filter(task=self.test).update(active=False)
+        data = self.walk('blockers', self.deploy, 'depth=all')
+        self.assertEqual({task['title'] for task in data}, {'Test', 'Docs'})
+    
+    def test_walk_stops_at_hidden_tasks(self):
+        other = User.objects.create_user(username='stranger', password='12345')
+        due = timezone.now() + datetime.timedelta(days=1)
+        hidden = Task.objects.create(title='Hidden', due_date=due, owner=other, assigned_to=other)
+        beyond = Task.objects.create(title='Beyond', due_date=due, owner=self.user, assigned_to=self.user)
+        # build -> hidden -> beyond, upstream
+        TaskDependency.objects.create(task=self.build, depends_on=hidden, created_by=other)
+        TaskDependency.objects.create(task=hidden, depends_on=beyond, created_by=other)
+        data = self.walk('blockers', self.deploy, 'depth=all')
+        self.assertEqual({task['title'] for task in data}, {'Test', 'Docs', 'Build'})
+        self.assertNotIn(hidden.id, [task_id for task in data for task_id in task['path']])
+        self.assertEqual([task['title'] for task in self.walk('blocked', beyond, 'depth=all')], [])
+    
+    def test_depth_one_matches_the_direct_listing(self):
+        other = User.objects.create_user(username='stranger', password='12345')
+        hidden = Task.objects.create(
+            title='Hidden', due_date=self.build.due_date, owner=other, assigned_to=other
+        )
+        TaskDependency.objects.create(task=self.deploy, depends_on=hidden, created_by=other)
+        TaskDependency.objects.create(task=hidden, depends_on=self.build, created_by=other)
+        for name, task in (('blockers', self.deploy), ('blocked', self.build)):
+            direct = {row['id'] for row in self.walk(name, task)}
+            self.assertEqual({row['id'] for row in self.walk(name, task, 'depth=1')}, direct)
+            self.assertNotIn(hidden.id, direct)
+    
+    def test_diamond_lattice_is_walked_once_per_task(self):
+        # 40 stacked diamonds: 2**40 chains from the bottom task to the top one
+        due = timezone.now() + datetime.timedelta(days=1)
+        make = lambda title: Task.objects.create(title=title, due_date=due, owner=self.user, assigned_to=self.user)
+        bottom = top = make('Bottom')
+        for layer in range(40):
+            left, right, joined = make(f'Left {layer}'), make(f'Right {layer}'), make(f'Join {layer}')
+            for side in (left, right):
+                TaskDependency.objects.create(task=side, depends_on=top, created_by=self.user)
+                TaskDependency.objects.create(task=joined, depends_on=side, created_by=self.user)
+            top = joined
+        with CaptureQueriesContext(connection) as queries:
+            data = self.walk('blocked', bottom, 'depth=all&fields=id')
+        self.assertEqual(len(data), 120)
+        self.assertEqual(data[-1]['id'], top.id)
+        self.assertEqual(data[-1]['depth'], 80)
+        self.assertLess(len(queries), 10)
+    
+    def test_invalid_depth(self):
+        for depth in ('0', 'deep'):
+            response = self.client.get(f"{reverse('task-blockers', args=[self.deploy.id])}?depth={depth}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DependencyGraphViewTest(TestCase):
+    """GET /api/tasks/graph/"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='grapher', password='12345')
+        cls.other = User.objects.create_user(username='outsider', password='12345')
+        due = timezone.now() + datetime.timedelta(days=1)
+        cls.first = Task.objects.create(title='First', due_date=due, owner=cls.user, assigned_to=cls.user)
+        cls.second = Task.objects.create(title='Second ✓', due_date=due, owner=cls.other, assigned_to=cls.user)
+        cls.hidden = Task.objects.create(title='Hidden', due_date=due, owner=cls.other, assigned_to=cls.other)
+        cls.dependency = TaskDependency.objects.create(task=cls.second, depends_on=cls.first, created_by=cls.user)
+        TaskDependency.objects.create(task=cls.second, depends_on=cls.hidden, created_by=cls.other, active=False)
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+    
+    def get_graph(self, **headers):
+        return self.client.get(reverse('task-graph'), headers=headers)
+    
+    def test_nodes_and_edges(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_graph()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            data = json.loads(b''.join(response.streaming_content))
+        # The ETag validator plus one query for the nodes and one for the edges
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(data, {
+            'nodes': [
+                {'id': self.first.id, 'title': 'First', 'status': 'TODO'},
+                {'id': self.second.id, 'title': 'Second ✓', 'status': 'TODO'},
+            ],
+            'edges': [[self.second.id, self.first.id, True]],
+        })
+    
+    def test_etag(self):
+        etag = self.get_graph()['ETag']
+        self.assertEqual(self.get_graph(if_none_match=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.dependency.active = False
+        self.dependency.save()
+        response = self.get_graph(if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['edges'], [[self.second.id, self.first.id, False]])
@@ -1,13 +1,35 @@
 from django.shortcuts import render, get_object_or_404
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from authentication.backends import ClaimsJWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework import viewsets, filters, status
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, SAFE_METHODS
+from rest_framework.exceptions import PermissionDenied, UnsupportedMediaType, ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
 from .models import Task, TaskComment, ChecklistItem, TaskDependency
 from .serializers import TaskSerializer, TaskCommentSerializer, ChecklistItemSerializer, TaskDependencySerializer
+from .fast_serializers import task_rows, render_task_rows, arender_task_rows
+from .search import FullTextSearchFilter
+from .conditional import ConditionalGetMixin
+from .async_views import AsyncReadMixin, not_found
+from .cache import ResponseCache, schedule_cache, stats_cache, task_list_cache
+from .bulk import MAX_OPERATIONS, run_bulk
+from .batch import parse_requests, run_batch
+from .signals import tasks_changed
+from .sync import ExpiredToken, InvalidToken, sync_changes
+from .events import stream_events
+from .stats import task_stats
+from .bundle import task_bundle
+from .imports import run_import
+from .export import CHILDREN, CSVRenderer, NDJSONRenderer, stream_csv, stream_ndjson
+from .graph import DOWNSTREAM, UPSTREAM, DependencyCycleError, schedule, stream_graph, walk_dependencies
 import logging
 
 # Set up logger
@@ -15,68 +37,496 @@ logger = logging.getLogger(__name__)
 
 # Create your views here.
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(AsyncReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # Full-text search goes last so it can order by relevance when no ?ordering= is given
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['status', 'priority', 'owner', 'assigned_to']
     search_fields = ['title', 'description', 'tags']
     ordering_fields = ['created_at', 'due_date', 'priority', 'duration']
     ordering = ['-created_at']
+    conditional_actions = ('list', 'retrieve', 'graph')
+    async_actions = {'list': 'alist', 'retrieve': 'aretrieve', 'blockers': 'ablockers', 'blocked': 'ablocked'}
 
     def get_queryset(self):
-        queryset = Task.objects.filter(
-            Q(owner=self.request.user) | Q(assigned_to=self.request.user)
-        )
+        queryset = Task.objects.visible_to(self.request.user)
+        if self.action == 'retrieve' or self.request.method not in SAFE_METHODS:
+            queryset = queryset.for_serializer(self.get_requested_fields())
+        # list renders through the fast path and the other actions only use
+        # this queryset for the permission check, so nothing is preloaded
         
-        # Filter by tag if provided in query params
-        tag = self.request.query_params.get('tag', None)
-        if tag is not None:
-            queryset = queryset.filter(tags__contains=tag)
+        # Filter by tag(s): ?tag=a&tag=b matches any of them, or all with ?tag_mode=all
+        tags = self.request.query_params.getlist('tag')
+        if tags:
+            match_all = self.request.query_params.get('tag_mode') == 'all'
+            queryset = queryset.with_tags(tags, match_all=match_all)
             
         return queryset
 
+    def get_conditional_queryset(self):
+        """
+        The requested tasks, whose latest ``updated_at`` and row count make
+        the conditional state. Checklist and dependency changes touch their
+        tasks, so this covers the counters and nested items too.
+        """
+        if self.action == 'retrieve':
+            return Task.objects.visible_to(self.request.user).filter(pk=self.kwargs['pk'])
+        if self.action == 'graph':
+            return Task.objects.visible_to(self.request.user)
+        return super().get_conditional_queryset()
+
+    def get_requested_fields(self):
+        """
+        Return the set of serializer fields selected by ``?fields=`` and
+        ``?expand=``, or None to render every field.
+
+        Either parameter switches the response to sparse mode: ``fields`` picks
+        the plain fields (all of them when omitted) and nested relations are
+        only included when named in ``expand``.
+        """
+        params = self.request.query_params
+        if self.request.method not in SAFE_METHODS or ('fields' not in params and 'expand' not in params):
+            return None
+        
+        expandable = TaskSerializer.EXPANDABLE_FIELDS
+        readable = [
+            name for name, field in TaskSerializer().fields.items() if not field.write_only
+        ]
+        fields = [name for name in params.get('fields', '').split(',') if name]
+        expand = [name for name in params.get('expand', '').split(',') if name]
+        
+        unknown = [name for name in fields if name not in readable]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            raise ValidationError({'expand': f"Cannot expand: {', '.join(unknown)}"})
+        
+        if not fields:
+            fields = [name for name in readable if name not in expandable]
+        return set(fields) | set(expand)
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        """
+        List tasks through the values()-based fast path, which renders the
+        same JSON as TaskSerializer without instantiating models. Rendered
+        lists are cached per user until one of their tasks changes.
+        """
+        cache_key = task_list_cache.make_key(request)
+        data = task_list_cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        fields = self.get_requested_fields()
+        rows = task_rows(self.filter_queryset(self.get_queryset()), fields)
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(render_task_rows(page, fields))
+        else:
+            response = Response(render_task_rows(rows, fields))
+        task_list_cache.set(cache_key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+    
+    async def alist(self, request, *args, **kwargs):
+        """list() for ASGI requests, through the async ORM."""
+        cache_key = task_list_cache.make_key(request)
+        data = task_list_cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        fields = self.get_requested_fields()
+        queryset = await self.afilter_queryset(self.get_queryset())
+        rows, paginated = await self.apaginate(task_rows(queryset, fields))
+        data = await arender_task_rows(rows, fields)
+        response = self.get_paginated_response(data) if paginated else Response(data)
+        task_list_cache.set(cache_key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+    
+    async def aretrieve(self, request, *args, **kwargs):
+        """
+        retrieve() for ASGI requests, rendered through the fast path with the
+        task row and its checklist items loaded concurrently.
+        """
+        try:
+            pk = int(self.kwargs['pk'])
+        except ValueError:
+            raise Http404
+        fields = self.get_requested_fields()
+        # Nothing to prefetch for values() rows
+        queryset = await self.afilter_queryset(self.get_queryset().prefetch_related(None))
+        data = await arender_task_rows(task_rows(queryset.filter(pk=pk), fields), fields, task_ids=[pk])
+        if not data:
+            raise not_found(Task)
+        return Response(data[0])
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create, update and delete many tasks in one transaction.
+        
+        Expects ``{"operations": [{"op": "create", "data": {...}},
+        {"op": "update", "id": 1, "data": {...}}, {"op": "delete", "id": 2}]}``
+        and returns one result per operation, in order.
+        """
+        operations = request.data.get('operations') if isinstance(request.data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({'operations': 'Expected a non-empty list of operations.'})
+        if len(operations) > MAX_OPERATIONS:
+            raise ValidationError({'operations': f'At most {MAX_OPERATIONS} operations per request.'})
+        
+        status_code, results = run_bulk(operations, request.user, self.get_serializer_context())
+        return Response({'results': results}, status=status_code)
+    
+    @action(detail=False, methods=['get'])
+    def graph(self, request):
+        """
+        The whole dependency graph visible to the user, streamed as
+        ``{"nodes": [{"id", "title", "status"}, ...], "edges": [[task_id,
+        depends_on_id, active], ...]}`` from two queries. Only dependencies
+        between visible tasks are included. Both ends of a dependency are
+        touched when it changes, so the ETag covers the edges too.
+        """
+        visible = Task.objects.visible_to(request.user)
+        nodes = visible.order_by('pk').values_list('id', 'title', 'status')
+        edges = TaskDependency.objects.filter(
+            task__in=visible.values('pk'), depends_on__in=visible.values('pk')
+        ).order_by('pk').values_list('task_id', 'depends_on_id', 'active')
+        return StreamingHttpResponse(
+            stream_graph(nodes.iterator(chunk_size=2000), edges.iterator(chunk_size=2000)),
+            content_type='application/json',
+        )
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream every task matching the list filters as CSV (the default) or,
+        with ``?format=ndjson``, newline-delimited JSON, without holding the
+        whole result in memory (see tasks.export). ``?include=checklist_items,comments``
+        adds those children to each task.
+        """
+        include = [name for name in request.query_params.get('include', '').split(',') if name]
+        unknown = [name for name in include if name not in CHILDREN]
+        if unknown:
+            raise ValidationError({'include': f"Cannot include: {', '.join(unknown)}"})
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        renderer = request.accepted_renderer
+        stream = stream_ndjson if renderer.format == 'ndjson' else stream_csv
+        response = StreamingHttpResponse(
+            stream(queryset, include), content_type=f'{renderer.media_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="tasks.{renderer.format}"'
+        return response
+    
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_tasks(self, request):
+        """
+        Create many tasks from a CSV (``text/csv``) or NDJSON
+        (``application/x-ndjson``) upload, read and written in chunks without
+        loading the whole body (see tasks.imports). Nothing is written if
+        any line fails; ``?dry_run=1`` checks every line without writing.
+        """
+        media_type = request.content_type.split(';')[0].strip()
+        formats = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+        if media_type not in formats:
+            raise UnsupportedMediaType(media_type)
+        
+        dry_run = request.query_params.get('dry_run') in ('1', 'true')
+        # request.stream is the unread body; request.data would buffer all of it
+        lines = request.stream or []
+        result = run_import(lines, formats[media_type], request.user, dry_run=dry_run)
+        if result['errors']:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'])
+    def schedule(self, request):
+        """
+        Critical-path schedule of every task visible to the user.
+        
+        Tasks start as soon as their active blockers (among those tasks) are
+        done and take ``duration`` hours; completed or unestimated tasks take
+        none. Times are hours from the start of the schedule. Cached per user
+        until one of their tasks or dependencies changes.
+        """
+        cache_key = schedule_cache.make_key(request)
+        data = schedule_cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        visible = Task.objects.visible_to(request.user)
+        tasks = {
+            task_id: (title, task_status, duration)
+            for task_id, title, task_status, duration in visible.order_by('pk').values_list(
+                'id', 'title', 'status', 'duration'
+            )
+        }
+        edges = TaskDependency.objects.filter(
+            active=True, task__in=visible.values('pk'), depends_on__in=visible.values('pk')
+        ).values_list('depends_on_id', 'task_id')
+        durations = {
+            task_id: 0.0 if task_status == 'DONE' else duration or 0.0
+            for task_id, (_, task_status, duration) in tasks.items()
+        }
+        try:
+            timings, critical_path, total = schedule(durations, edges)
+        except DependencyCycleError as exc:
+            return Response(
+                {'detail': 'The dependencies form a cycle.', 'tasks': exc.task_ids},
+                status=status.HTTP_409_CONFLICT,
+            )
+        
+        rows = []
+        for task_id, (earliest_start, earliest_finish, latest_start, latest_finish, slack) in timings.items():
+            title, task_status, duration = tasks[task_id]
+            rows.append({
+                'id': task_id,
+                'title': title,
+                'status': task_status,
+                'duration': duration,
+                'earliest_start': round(earliest_start, 6),
+                'earliest_finish': round(earliest_finish, 6),
+                'latest_start': round(latest_start, 6),
+                'latest_finish': round(latest_finish, 6),
+                'slack': round(slack, 6),
+            })
+        data = {'total_duration': round(total, 6), 'critical_path': critical_path, 'tasks': rows}
+        schedule_cache.set(cache_key, data)
+        return Response(data, headers={'X-Cache': 'MISS'})
+    
+    @action(detail=False, methods=['get'], filter_backends=[DjangoFilterBackend])
+    def stats(self, request):
+        """
+        Dashboard aggregates over the user's tasks: counts per status and
+        priority, overdue tasks, estimated hours, per-assignee workload and
+        tag counts (see tasks.stats). Takes the same filters as the list,
+        except search and ordering. Cached per user until one of their tasks
+        changes.
+        """
+        cache_key = stats_cache.make_key(request)
+        data = stats_cache.get(cache_key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        
+        data = task_stats(self.filter_queryset(self.get_queryset()))
+        stats_cache.set(cache_key, data)
+        return Response(data, headers={'X-Cache': 'MISS'})
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats', permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the response caches in this process (staff only).
+        """
+        return Response(ResponseCache.all_stats())
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
     
+    def get_walk_depth(self):
+        """
+        Return the ``?depth=`` limit for the blockers/blocked walks: None
+        without the parameter (direct neighbours only), a positive number of
+        levels, or ``'all'`` for the whole chain.
+        """
+        depth = self.request.query_params.get('depth')
+        if depth is None or depth == 'all':
+            return depth
+        try:
+            depth = int(depth)
+        except ValueError:
+            depth = 0
+        if depth < 1:
+            raise ValidationError({'depth': "Expected a positive number of levels or 'all'."})
+        return depth
+    
+    def render_walk(self, task, direction, neighbours):
+        """
+        Render the tasks ``direction`` of ``task``: its direct ``neighbours``
+        queryset by default, or with ``?depth=`` every task within that many
+        levels, walked from one query and annotated with its ``depth`` and
+        the ``path`` of task ids leading to it. Tasks hidden from the user
+        are left out either way, and the walk doesn't pass through them.
+        """
+        fields = self.get_requested_fields()
+        depth = self.get_walk_depth()
+        if depth is None:
+            neighbours = neighbours.visible_to(self.request.user)
+            return Response(render_task_rows(task_rows(neighbours, fields), fields))
+        
+        visible = Task.objects.visible_to(self.request.user)
+        walk = walk_dependencies(task.pk, direction, None if depth == 'all' else depth, visible)
+        rows = task_rows(visible.filter(pk__in=list(walk)), fields)
+        return Response(self.annotate_walk(walk, render_task_rows(rows, fields)))
+    
+    async def arender_walk(self, direction, neighbours):
+        """
+        render_walk() for ASGI requests. The task lookup (which 404s for a
+        hidden task) runs concurrently with the neighbours or walk query.
+        """
+        fields = self.get_requested_fields()
+        depth = self.get_walk_depth()
+        if depth is None:
+            neighbours = neighbours.visible_to(self.request.user)
+            _, data = await self.gather(
+                self.aget_object(), arender_task_rows(task_rows(neighbours, fields), fields)
+            )
+            return Response(data)
+        
+        try:
+            pk = int(self.kwargs['pk'])
+        except ValueError:
+            raise Http404
+        visible = Task.objects.visible_to(self.request.user)
+        _, walk = await self.gather(
+            self.aget_object(),
+            sync_to_async(walk_dependencies)(pk, direction, None if depth == 'all' else depth, visible),
+        )
+        rows = task_rows(visible.filter(pk__in=list(walk)), fields)
+        return Response(self.annotate_walk(walk, await arender_task_rows(rows, fields)))
+    
+    @staticmethod
+    def annotate_walk(walk, rendered_rows):
+        """Rendered walk rows in walk order, with their ``depth`` and ``path``."""
+        rendered = {row['id']: row for row in rendered_rows}
+        data = []
+        for task_id, (task_depth, path) in walk.items():
+            row = rendered.get(task_id)
+            if row is not None:
+                data.append({**row, 'depth': task_depth, 'path': path})
+        return data
+    
     @action(detail=True, methods=['get'])
     def blockers(self, request, pk=None):
         """
         Get all tasks that are blocking the specified task (tasks this task depends on).
+        With ``?depth=N|all``, include the tasks blocking those, transitively.
         """
         task = self.get_object()
-        # Get all active dependencies
-        dependencies = task.dependencies.filter(active=True)
-        # Extract the tasks that this task depends on
-        blocking_tasks = [dep.depends_on for dep in dependencies]
-        
-        # Serialize these tasks
-        serializer = self.get_serializer(blocking_tasks, many=True)
-        return Response(serializer.data)
+        # Tasks referenced by this task's active dependencies
+        blocking_tasks = Task.objects.filter(
+            dependent_tasks__task=task, dependent_tasks__active=True
+        )
+        return self.render_walk(task, UPSTREAM, blocking_tasks)
+    
+    async def ablockers(self, request, pk=None):
+        blocking_tasks = Task.objects.filter(dependent_tasks__task=pk, dependent_tasks__active=True)
+        return await self.arender_walk(UPSTREAM, blocking_tasks)
     
     @action(detail=True, methods=['get'])
     def blocked(self, request, pk=None):
         """
         Get all tasks that are blocked by the specified task (tasks that depend on this task).
+        With ``?depth=N|all``, include the tasks blocked by those, transitively.
         """
         task = self.get_object()
-        # Get all active dependencies where this task is the one that others depend on
-        dependencies = task.dependent_tasks.filter(active=True)
-        # Extract the tasks that depend on this task
-        blocked_tasks = [dep.task for dep in dependencies]
-        
-        # Serialize these tasks
-        serializer = self.get_serializer(blocked_tasks, many=True)
-        return Response(serializer.data)
+        # Tasks whose active dependencies point at this task
+        blocked_tasks = Task.objects.filter(
+            dependencies__depends_on=task, dependencies__active=True
+        )
+        return self.render_walk(task, DOWNSTREAM, blocked_tasks)
+    
+    async def ablocked(self, request, pk=None):
+        blocked_tasks = Task.objects.filter(dependencies__depends_on=pk, dependencies__active=True)
+        return await self.arender_walk(DOWNSTREAM, blocked_tasks)
+    
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """
+        The task with its checklist, comments, dependencies, blockers and
+        blocked tasks, as returned by their own endpoints, in one response
+        from a fixed number of queries (see tasks.bundle).
+        """
+        try:
+            task_id = int(pk)
+        except ValueError:
+            raise Http404
+        data = task_bundle(task_id, request.user)
+        if data is None:
+            raise not_found(Task)
+        return Response(data)
+
+
+class TaskChildConditionalMixin(ConditionalGetMixin):
+    """
+    Conditional GETs for the viewsets nested under /tasks/{task_pk}/.
+
+    The state is read from the parent task row in one query: its
+    ``updated_at`` (bumped by every child write), the number of children and
+    the latest ``conditional_timestamp`` reachable through them. Requests for
+    a hidden or missing task skip the check and fail in the handler as usual.
+    """
+    conditional_relation = None
+    conditional_timestamp = None
+
+    def get_conditional_state(self):
+        relation = self.conditional_relation
+        queryset = Task.objects.visible_to(self.request.user).filter(pk=self.kwargs['task_pk'])
+        if self.action == 'retrieve':
+            queryset = queryset.filter(**{f'{relation}__pk': self.kwargs['pk']})
+        state = queryset.values('updated_at').annotate(
+            count=Count(relation), last_modified=Max(self.conditional_timestamp)
+        ).order_by('updated_at').first()
+        if state is None:
+            return None
+        last_modified = max(filter(None, [state['updated_at'], state['last_modified']]))
+        return last_modified, state['count']
 
 
-class TaskCommentViewSet(viewsets.ModelViewSet):
+class TaskChildAsyncListMixin(AsyncReadMixin):
+    """
+    Async list() for the viewsets nested under /tasks/{task_pk}/, used for
+    ASGI requests: the parent task's visibility check and the children query
+    run concurrently. Subclasses set ``child_queryset`` to the children of
+    every task, which get_child_queryset() narrows to the requested one.
+    """
+    async_actions = {'list': 'alist'}
+    child_queryset = None
+
+    def get_child_queryset(self, task_id):
+        """The children of ``task_id``, before any visibility check."""
+        return self.child_queryset.filter(task_id=task_id)
+
+    async def alist(self, request, *args, **kwargs):
+        try:
+            task_id = int(self.kwargs['task_pk'])
+        except ValueError:
+            raise Http404
+
+        async def load_children():
+            return await self.apaginate(await self.afilter_queryset(self.get_child_queryset(task_id)))
+
+        task, (children, paginated) = await self.gather(
+            Task.objects.only('owner', 'assigned_to').filter(pk=task_id).afirst(), load_children()
+        )
+        if task is None:
+            raise not_found(Task)
+        if not task.is_visible_to(request.user):
+            # The sync path renders the (possibly paginated) empty list
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+        data = self.get_serializer(children, many=True).data
+        return self.get_paginated_response(data) if paginated else Response(data)
+
+
+class TaskCommentViewSet(TaskChildAsyncListMixin, TaskChildConditionalMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing comments on a specific task.
     """
     serializer_class = TaskCommentSerializer
     permission_classes = [IsAuthenticated]
     ordering = ['created_at']
+    child_queryset = TaskComment.objects.select_related('author')
+    conditional_relation = 'comments'
+    conditional_timestamp = 'comments__updated_at'
     
     def get_queryset(self):
         """
@@ -87,10 +537,10 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_id)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             return TaskComment.objects.none()
             
-        return TaskComment.objects.filter(task=task)
+        return self.get_child_queryset(task.pk)
     
     def perform_create(self, serializer):
         """
@@ -100,7 +550,7 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_id)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             # This should be prevented by permissions, but check anyway
             raise PermissionDenied("You don't have permission to comment on this task")
         
@@ -115,13 +565,16 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
             raise ValidationError(f"Error creating comment: {str(e)}")
 
 
-class ChecklistItemViewSet(viewsets.ModelViewSet):
+class ChecklistItemViewSet(TaskChildAsyncListMixin, TaskChildConditionalMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing checklist items on a specific task.
     """
     serializer_class = ChecklistItemSerializer
     permission_classes = [IsAuthenticated]
     ordering = ['position', 'created_at']
+    child_queryset = ChecklistItem.objects.all()
+    conditional_relation = 'checklist_items'
+    conditional_timestamp = 'checklist_items__updated_at'
     
     def get_queryset(self):
         """
@@ -132,10 +585,10 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_id)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             return ChecklistItem.objects.none()
             
-        return ChecklistItem.objects.filter(task=task)
+        return self.get_child_queryset(task.pk)
     
     def perform_create(self, serializer):
         """
@@ -143,18 +596,17 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         Also set the position to be the highest position + 1.
         """
         task_id = self.kwargs.get('task_pk')
-        task = get_object_or_404(Task, pk=task_id)
+        # The current last position comes back with the task itself
+        task = get_object_or_404(
+            Task.objects.annotate(last_position=Max('checklist_items__position')), pk=task_id
+        )
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             raise PermissionDenied("You don't have permission to add checklist items to this task")
         
-        # Get the highest position and add 1
-        highest_position = ChecklistItem.objects.filter(task=task).order_by('-position').first()
-        position = 1
-        if highest_position:
-            position = highest_position.position + 1
-            
+        # Append one gap after the last item
+        position = (task.last_position or 0) + ChecklistItem.POSITION_GAP
         serializer.save(task=task, position=position)
     
     @action(detail=True, methods=['patch'])
@@ -164,7 +616,7 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         """
         checklist_item = self.get_object()
         checklist_item.is_completed = True
-        checklist_item.save()
+        checklist_item.save(update_fields=['is_completed', 'updated_at'])
         
         serializer = self.get_serializer(checklist_item)
         return Response(serializer.data)
@@ -176,7 +628,7 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         """
         checklist_item = self.get_object()
         checklist_item.is_completed = False
-        checklist_item.save()
+        checklist_item.save(update_fields=['is_completed', 'updated_at'])
         
         serializer = self.get_serializer(checklist_item)
         return Response(serializer.data)
@@ -190,7 +642,7 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_pk)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             raise PermissionDenied("You don't have permission to reorder checklist items for this task")
         
         # Get the IDs from the request data
@@ -198,31 +650,85 @@ class ChecklistItemViewSet(viewsets.ModelViewSet):
         if not items_order:
             return Response({"error": "No order provided"}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update the position of each item
-        checklist_items = {item.id: item for item in ChecklistItem.objects.filter(task=task)}
-        
-        for position, item_id in enumerate(items_order, 1):
+        # Listed items first, in the given order; unlisted ones keep their
+        # relative order after them
+        items = list(ChecklistItem.objects.filter(task=task))
+        rank = {}
+        for item_id in items_order:
             try:
-                item_id = int(item_id)
-                if item_id in checklist_items:
-                    item = checklist_items[item_id]
-                    item.position = position
-                    item.save()
-            except (ValueError, KeyError):
+                rank.setdefault(int(item_id), len(rank))
+            except (TypeError, ValueError):
                 pass
+        items.sort(key=lambda item: rank.get(item.id, len(rank)))
         
-        # Return the updated list
-        return Response(
-            self.get_serializer(ChecklistItem.objects.filter(task=task), many=True).data
-        )
+        self.renumber(task, items)
+        return Response(self.get_serializer(items, many=True).data)
+    
+    @action(detail=True, methods=['post'])
+    def move(self, request, task_pk=None, pk=None):
+        """
+        Move one checklist item to just after another one.
+        Expects ``{"after": <item id>}``, or ``{"after": null}`` to move it first.
+        
+        The item takes a position halfway between its new neighbours, so
+        only its own row is written; the list is renumbered only when there
+        is no room left between them.
+        """
+        if 'after' not in request.data:
+            return Response({"error": "No 'after' item provided"}, status=status.HTTP_400_BAD_REQUEST)
+        item = self.get_object()
+        siblings = list(ChecklistItem.objects.filter(task_id=item.task_id).exclude(pk=item.pk))
+        
+        after = request.data['after']
+        if after is None:
+            index = 0
+        else:
+            ids = [sibling.id for sibling in siblings]
+            try:
+                index = ids.index(int(after)) + 1
+            except (TypeError, ValueError):
+                return Response({"error": "Unknown 'after' item"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        previous = siblings[index - 1].position if index > 0 else 0
+        following = siblings[index].position if index < len(siblings) else previous + 2 * ChecklistItem.POSITION_GAP
+        if following - previous >= 2:
+            item.position = (previous + following) // 2
+            item.save(update_fields=['position', 'updated_at'])
+        else:
+            siblings.insert(index, item)
+            self.renumber(item.task, siblings)
+        return Response(self.get_serializer(item).data)
+    
+    @staticmethod
+    def renumber(task, items):
+        """
+        Re-space ``items`` (in their list order) POSITION_GAP apart, writing
+        the changed rows in a single UPDATE.
+        """
+        changed = []
+        now = timezone.now()
+        for index, item in enumerate(items, 1):
+            position = index * ChecklistItem.POSITION_GAP
+            if item.position != position:
+                item.position = position
+                item.updated_at = now
+                changed.append(item)
+        if changed:
+            with transaction.atomic():
+                ChecklistItem.objects.bulk_update(changed, ['position', 'updated_at'])
+                # bulk_update skips the model signals
+                tasks_changed([task])
 
 
-class TaskDependencyViewSet(viewsets.ModelViewSet):
+class TaskDependencyViewSet(TaskChildConditionalMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing task dependencies.
     """
     serializer_class = TaskDependencySerializer
     permission_classes = [IsAuthenticated]
+    conditional_relation = 'dependencies'
+    # Each dependency also renders the task it points at
+    conditional_timestamp = 'dependencies__depends_on__updated_at'
     
     def get_queryset(self):
         """
@@ -233,10 +739,18 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_id)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             return TaskDependency.objects.none()
             
-        return TaskDependency.objects.filter(task=task)
+        # The nested task details go through TaskSerializer, so load them
+        # with the same related objects and counters as the task list. A
+        # depends_on task the user can't see isn't loaded, so its details
+        # render as null.
+        related_tasks = Task.objects.for_serializer()
+        return TaskDependency.objects.filter(task=task).select_related('created_by').prefetch_related(
+            Prefetch('task', queryset=related_tasks),
+            Prefetch('depends_on', queryset=related_tasks.visible_to(self.request.user)),
+        )
     
     def perform_create(self, serializer):
         """
@@ -246,14 +760,13 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
         task = get_object_or_404(Task, pk=task_id)
         
         # Check if user is associated with the task
-        if not (task.owner == self.request.user or task.assigned_to == self.request.user):
+        if not task.is_visible_to(self.request.user):
             raise PermissionDenied("You don't have permission to add dependencies to this task")
         
         # Validate that the depends_on task is accessible to the user
-        depends_on_id = serializer.validated_data.get('depends_on').id
-        depends_on_task = get_object_or_404(Task, pk=depends_on_id)
+        depends_on_task = serializer.validated_data.get('depends_on')
         
-        if not (depends_on_task.owner == self.request.user or depends_on_task.assigned_to == self.request.user):
+        if not depends_on_task.is_visible_to(self.request.user):
             raise PermissionDenied("You don't have permission to use this task as a dependency")
             
         serializer.save(task=task, created_by=self.request.user)
@@ -265,9 +778,91 @@ class TaskDependencyViewSet(viewsets.ModelViewSet):
         """
         dependency = self.get_object()
         
+        # Reactivating must not close a cycle through dependencies added meanwhile
+        if not dependency.active and TaskDependency.creates_cycle(dependency.task_id, dependency.depends_on_id):
+            raise ValidationError("This would create a circular dependency chain")
+        
         # Toggle the active status
         dependency.active = not dependency.active
-        dependency.save()
+        dependency.save(update_fields=['active', 'updated_at'])
         
         serializer = self.get_serializer(dependency)
         return Response(serializer.data)
+
+
+class SyncView(APIView):
+    """
+    Delta sync of the user's tasks, checklist items and dependencies.
+    
+    ``GET /api/sync/`` returns everything with a ``token``; passing that back
+    as ``?since=<token>`` returns only what changed after it, plus the ids of
+    deleted rows under ``deleted`` (see tasks.sync).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        token = request.query_params.get('since') or None
+        try:
+            data = sync_changes(request.user, token)
+        except InvalidToken:
+            raise ValidationError({'since': 'Invalid sync token.'})
+        except ExpiredToken:
+            return Response(
+                {'detail': 'Sync token expired; sync again without since.'}, status=status.HTTP_410_GONE
+            )
+        return Response(data)
+
+
+class BatchView(APIView):
+    """
+    Several API calls in one round trip.
+    
+    ``POST /api/batch/`` takes ``{"requests": [{"method": "PATCH", "path":
+    "/api/tasks/1/", "body": {...}}, ...], "atomic": false}`` and returns one
+    ``{"status", "body"}`` per sub-request, in order (see tasks.batch).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        requests = parse_requests(data.get('requests'))
+        ok, results = run_batch(request, requests, atomic=bool(data.get('atomic')))
+        return Response(
+            {'responses': results}, status=status.HTTP_200_OK if ok else status.HTTP_400_BAD_REQUEST
+        )
+
+
+def authenticate_stream(request):
+    """
+    The user and access token expiry for an event stream request. EventSource
+    can't send headers, so the JWT may also come as ``?token=``.
+    """
+    authentication = ClaimsJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token', '').encode()
+    if not raw_token:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    validated_token = authentication.get_validated_token(raw_token)
+    return authentication.get_user(validated_token), validated_token['exp']
+
+
+async def event_stream(request):
+    """
+    ``GET /api/events/``: Server-Sent Events for changes to the tasks the
+    user owns or is assigned, and their comments, checklist items and
+    dependencies (see tasks.events). The stream ends when the access token
+    expires, so the client reconnects with a fresh one.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user, expires = await sync_to_async(authenticate_stream)(request)
+    except AuthenticationFailed as error:
+        # Same body as DRF's exception handler would render
+        data = error.detail if isinstance(error.detail, dict) else {'detail': error.detail}
+        return JsonResponse(data, status=401)
+    response = StreamingHttpResponse(stream_events(user.pk, until=expires), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response